@@ -0,0 +1,123 @@
+"""
+Facets of the blog and events index pages: the values of each filter, with their number of entries.
+
+All the facets are counted in a single query (a UNION of one aggregation per facet).
+The count of each facet respects the other active filters, but not its own,
+so that the other values of a filter stay visible.
+
+The results are cached per index page and filter combination, and invalidated when
+an entry is published or unpublished (see blog/signals.py).
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.db.models import CharField, Count, F, Model, QuerySet, Value
+from django.utils.translation import get_language
+
+from content_manager.cache import (
+    FRAGMENTS_CACHE,
+    bump_generation,
+    cache_get_or_set,
+    get_generations,
+    page_site_id,
+    site_key,
+)
+
+ALL_FACETS_NAMESPACE = "facets"
+
+
+def index_facets_namespace(page_id) -> str:
+    return f"facets-page-{page_id}"
+
+
+class Facet:
+    """
+    A filter of an index page.
+
+    - `lookup` is the field path of the value on the entries (an id or a year)
+    - `model` is the model of the values, if any, which are then sorted by `order_by`
+    """
+
+    def __init__(self, name: str, lookup: str, model: type[Model] | None = None, order_by: str = "name"):
+        self.name = name
+        self.lookup = lookup
+        self.model = model
+        self.order_by = order_by
+
+    def get_values(self, counts: dict) -> list:
+        if self.model is None:
+            return [{"value": value, "count": count} for value, count in sorted(counts.items(), reverse=True)]
+
+        values = list(self.model.objects.filter(pk__in=counts.keys()).order_by(self.order_by))
+        for value in values:
+            value.facet_count = counts[value.pk]
+        return values
+
+
+def count_facets(entries: QuerySet, facets: list[Facet], filters: dict) -> dict:
+    """
+    Returns the counts of each facet value, as a dict of dicts: {facet name: {value: count}}
+
+    `filters` are the active filters, as a dict {facet name: lookup kwargs}
+    """
+    queries = []
+    for facet in facets:
+        facet_entries = entries
+        for name, lookup_kwargs in filters.items():
+            if name != facet.name:
+                facet_entries = facet_entries.filter(**lookup_kwargs)
+
+        queries.append(
+            facet_entries.order_by()
+            .values(value=F(facet.lookup))
+            .filter(value__isnull=False)
+            .annotate(count=Count("pk", distinct=True), facet=Value(facet.name, output_field=CharField()))
+            .values_list("facet", "value", "count")
+        )
+
+    counts = {facet.name: {} for facet in facets}
+    if queries:
+        for name, value, count in queries[0].union(*queries[1:], all=True):
+            counts[name][value] = count
+
+    return counts
+
+
+def get_facets(index_page, entries: QuerySet, facets: list[Facet], filters: dict, key_parts: tuple = ()) -> dict:
+    """
+    Returns the values of each facet of an index page, with their count in a `facet_count` attribute
+    (or as a dict {"value": …, "count": …} for the facets without model), from the cache when possible.
+
+    `key_parts` are added to the cache key, for the parameters which change the entries.
+    """
+    active_filters = sorted(
+        (name, sorted((lookup, str(getattr(value, "pk", value))) for lookup, value in lookup_kwargs.items()))
+        for name, lookup_kwargs in filters.items()
+    )
+    facet_names = [facet.name for facet in facets]
+    filters_hash = hashlib.sha256(repr((facet_names, active_filters, key_parts)).encode()).hexdigest()
+    generations = get_generations(FRAGMENTS_CACHE, [ALL_FACETS_NAMESPACE, index_facets_namespace(index_page.pk)])
+    key = site_key(
+        page_site_id(index_page),
+        "facets",
+        index_page.pk,
+        get_language(),
+        "-".join(map(str, generations)),
+        filters_hash,
+    )
+
+    def build():
+        counts = count_facets(entries, facets, filters)
+        return {facet.name: facet.get_values(counts[facet.name]) for facet in facets}
+
+    return cache_get_or_set(FRAGMENTS_CACHE, key, build, timeout=settings.SF_CACHE_TIMEOUT)
+
+
+def invalidate_index_facets(page_ids) -> None:
+    for page_id in page_ids:
+        bump_generation(FRAGMENTS_CACHE, index_facets_namespace(page_id))
+
+
+def invalidate_all_facets() -> None:
+    bump_generation(FRAGMENTS_CACHE, ALL_FACETS_NAMESPACE)
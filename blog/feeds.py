@@ -0,0 +1,59 @@
+"""
+Cache of the RSS and Atom feeds of the blog index pages.
+
+The feeds are generated once per index page, feed type, category and limit, and cached with
+their ETag and last modification date (the latest publication of a post of the blog),
+so that the feed readers can use conditional requests.
+
+They are invalidated when a page under the index page is saved, published or unpublished (see blog/signals.py).
+"""
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.utils.translation import get_language
+
+from content_manager.cache import FRAGMENTS_CACHE, bump_generation, cache_get_or_set, get_generations
+
+ALL_FEEDS_NAMESPACE = "feeds"
+
+# Hard cap on the `limit` parameter of the feeds, the same as the maximum of BlogIndexPage.feed_posts_limit
+FEED_POSTS_LIMIT_MAX = 100
+
+
+def index_feeds_namespace(page_id) -> str:
+    return f"feeds-page-{page_id}"
+
+
+def get_feed(index_page, request: HttpRequest, feed_class, feed_url_name: str) -> dict:
+    """
+    Returns a feed of an index page as a dict with its content, ETag and last modification timestamp,
+    from the cache when possible.
+    """
+    generations = get_generations(FRAGMENTS_CACHE, [ALL_FEEDS_NAMESPACE, index_feeds_namespace(index_page.pk)])
+    key = ":".join(
+        [
+            "feed",
+            str(index_page.pk),
+            feed_url_name,
+            get_language(),
+            request.GET.get("category", ""),
+            str(index_page.get_feed_limit(request)),
+            "-".join(map(str, generations)),
+        ]
+    )
+
+    return cache_get_or_set(
+        FRAGMENTS_CACHE,
+        key,
+        lambda: index_page.build_feed(request, feed_class, feed_url_name),
+        timeout=settings.SF_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_index_feeds(page_ids) -> None:
+    for page_id in page_ids:
+        bump_generation(FRAGMENTS_CACHE, index_feeds_namespace(page_id))
+
+
+def invalidate_all_feeds() -> None:
+    bump_generation(FRAGMENTS_CACHE, ALL_FEEDS_NAMESPACE)
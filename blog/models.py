@@ -1,14 +1,17 @@
+import hashlib
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.core.paginator import Paginator
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models import BooleanField, Count, QuerySet
+from django.db.models import BooleanField, Count, Max, QuerySet
 from django.db.models.expressions import F
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.template.defaultfilters import slugify
 from django.utils import feedgenerator, timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.utils.translation import gettext_lazy as _
 from modelcluster.fields import ParentalKey, ParentalManyToManyField
 from modelcluster.tags import ClusterTaggableManager
@@ -26,10 +29,14 @@ from wagtail.search import index
 from wagtail.snippets.models import register_snippet
 
 from blog.blocks import COLOPHON_BLOCKS
+from blog.facets import Facet, get_facets
+from blog.feeds import FEED_POSTS_LIMIT_MAX, get_feed
 from blog.managers import CategoryManager
 from content_manager.abstract import SitesFacilesBasePage
 from content_manager.constants import LIMITED_RICHTEXTFIELD_FEATURES
+from content_manager.managers import for_listing
 from content_manager.models import Tag
+from content_manager.pagination import paginate
 
 User = get_user_model()
 
@@ -238,14 +245,15 @@ class BlogIndexPage(RoutablePageMixin, SitesFacilesBasePage):
     def posts(self):
         # Get list of blog pages that are descendants of this page
         posts = BlogEntryPage.objects.descendant_of(self).live()
-        posts = (
-            posts.order_by("-date").select_related("owner").prefetch_related("tags", "blog_categories", "date__year")
-        )
+        posts = for_listing(
+            posts.order_by("-date"), "owner", template_name="blog/blocks/blog_index_posts_list.html"
+        ).prefetch_related("tags", "blog_categories")
         return posts
 
     def get_context(self, request, *args, **kwargs):
         context = super(BlogIndexPage, self).get_context(request, *args, **kwargs)
         posts = self.posts
+        filters = {}
 
         extra_breadcrumbs = None
         extra_title = ""
@@ -253,6 +261,7 @@ class BlogIndexPage(RoutablePageMixin, SitesFacilesBasePage):
         tag = request.GET.get("tag")
         if tag:
             tag = get_object_or_404(Tag, slug=tag)
+            filters["tag"] = {"tags": tag}
             posts = posts.filter(tags=tag)
             extra_breadcrumbs = {
                 "links": [
@@ -269,6 +278,7 @@ class BlogIndexPage(RoutablePageMixin, SitesFacilesBasePage):
         category = request.GET.get("category")
         if category:
             category = get_object_or_404(Category, slug=category, locale=self.locale)
+            filters["category"] = {"blog_categories": category}
             posts = posts.filter(blog_categories=category)
 
             extra_breadcrumbs = {
@@ -286,6 +296,7 @@ class BlogIndexPage(RoutablePageMixin, SitesFacilesBasePage):
         source = request.GET.get("source")
         if source:
             source = get_object_or_404(Organization, slug=source)
+            filters["source"] = {"authors__organization": source}
             posts = posts.filter(authors__organization=source)
             extra_breadcrumbs = {
                 "links": [
@@ -305,20 +316,18 @@ class BlogIndexPage(RoutablePageMixin, SitesFacilesBasePage):
                 ],
                 "current": _("Posts written by") + f" {author.name}",
             }
+            filters["author"] = {"authors": author}
             posts = posts.filter(authors=author)
             extra_title = _("Posts written by") + f" {author.name}"
 
         year = request.GET.get("year")
         if year:
+            filters["year"] = {"date__year": year}
             posts = posts.filter(date__year=year)
             extra_title = _("Posts published in %(year)s") % {"year": year}
 
         # Pagination
-        page_number = request.GET.get("page")
-        page_size = self.posts_per_page
-
-        paginator = Paginator(posts, page_size)  # Show <page_size> posts per page
-        posts = paginator.get_page(page_number)
+        paginator, posts = paginate(request, posts, self.posts_per_page, ordering=["-date", "-pk"])
 
         context["posts"] = posts
         context["current_category"] = category
@@ -330,16 +339,36 @@ class BlogIndexPage(RoutablePageMixin, SitesFacilesBasePage):
         context["extra_title"] = extra_title
 
         # Filters
-        context["categories"] = self.get_categories()
-        context["authors"] = self.get_authors()
-        context["sources"] = self.get_sources()
-        context["tags"] = self.get_tags()
+        facets = self.get_facets(filters)
+        context["categories"] = facets.get("category", [])
+        context["authors"] = facets.get("author", [])
+        context["sources"] = facets.get("source", [])
+        context["tags"] = facets.get("tag", [])
+        context["years"] = facets["year"]
 
         if extra_breadcrumbs:
             context["extra_breadcrumbs"] = extra_breadcrumbs
 
         return context
 
+    def get_facets(self, filters: dict, names: list[str] | None = None) -> dict:
+        """
+        Returns the values of the enabled filters (or of the filters listed in `names`),
+        with their number of posts
+        """
+        facets = [
+            facet
+            for facet, enabled in [
+                (Facet("category", "blog_categories", Category), self.filter_by_category),
+                (Facet("tag", "tags", Tag), self.filter_by_tag),
+                (Facet("author", "authors", Person), self.filter_by_author),
+                (Facet("source", "authors__organization", Organization), self.filter_by_source),
+                (Facet("year", "date__year"), True),
+            ]
+            if (enabled if names is None else facet.name in names)
+        ]
+        return get_facets(self, self.posts, facets, filters)
+
     def get_authors(self) -> QuerySet:
         ids = self.posts.specific().values_list("authors", flat=True)
         return Person.objects.filter(id__in=ids).order_by("name")
@@ -392,8 +421,7 @@ class BlogIndexPage(RoutablePageMixin, SitesFacilesBasePage):
             category = get_object_or_404(Category, slug=category, locale=self.locale)
             posts = posts.filter(blog_categories=category)
 
-        limit = int(request.GET.get("limit", self.feed_posts_limit))
-        posts = posts[:limit]
+        posts = posts[: self.get_feed_limit(request)]
 
         for post in posts:
             feed.add_item(
@@ -405,51 +433,72 @@ class BlogIndexPage(RoutablePageMixin, SitesFacilesBasePage):
 
         return feed
 
-    @path("rss/", name="rss_feed")
-    def rss_view(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+    def get_feed_limit(self, request) -> int:
+        try:
+            limit = int(request.GET.get("limit", self.feed_posts_limit))
+        except ValueError:
+            limit = self.feed_posts_limit
+
+        return min(max(limit, 1), FEED_POSTS_LIMIT_MAX)
+
+    def build_feed(self, request: HttpRequest, feed_class, feed_url_name: str) -> dict:
         """
-        Return the current blog as a RSS feed
+        Returns a feed as a dict with its content, ETag and last modification timestamp
         """
-
         if self.seo_title:
             title = self.seo_title
         else:
             title = self.title
 
-        feed = feedgenerator.Rss201rev2Feed(
+        feed = feed_class(
             title=title,
             link=self.full_url,
             description=self.search_description,
             language=self.locale.language_code,
-            feed_url=f"{self.full_url}{self.reverse_subpage('rss_feed')}",
+            feed_url=f"{self.full_url}{self.reverse_subpage(feed_url_name)}",
         )
         feed = self.feed_posts(feed, request)
+        content = feed.writeString("UTF-8")
 
-        response = HttpResponse(feed.writeString("UTF-8"), content_type="application/xml")
-        return response
+        last_published_at = self.posts.aggregate(last_published_at=Max("last_published_at"))["last_published_at"]
+        return {
+            "content": content,
+            "etag": hashlib.sha1(content.encode(), usedforsecurity=False).hexdigest(),
+            "last_modified": int(last_published_at.timestamp()) if last_published_at else None,
+        }
 
-    @path("atom/", name="atom_feed")
-    def atom_view(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+    def serve_feed(self, request: HttpRequest, feed_class, feed_url_name: str) -> HttpResponse:
         """
-        Return the current blog as an Atom feed
+        Serves a feed from the cache, with support for conditional requests.
+
+        The feeds are cached by category and limit until a post of the blog is published or unpublished
+        (see blog/feeds.py).
         """
+        feed = get_feed(self, request, feed_class, feed_url_name)
 
-        if self.seo_title:
-            title = self.seo_title
-        else:
-            title = self.title
+        etag = f'"{feed["etag"]}"'
+        last_modified = feed["last_modified"]
 
-        feed = feedgenerator.Atom1Feed(
-            title=title,
-            link=self.full_url,
-            description=self.search_description,
-            language=self.locale.language_code,
-            feed_url=f"{self.full_url}{self.reverse_subpage('atom_feed')}",
-        )
-        feed = self.feed_posts(feed, request)
+        response = HttpResponse(feed["content"], content_type="application/xml")
+        response.headers["ETag"] = etag
+        if last_modified:
+            response.headers["Last-Modified"] = http_date(last_modified)
+
+        return get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
 
-        response = HttpResponse(feed.writeString("UTF-8"), content_type="application/xml")
-        return response
+    @path("rss/", name="rss_feed")
+    def rss_view(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        """
+        Return the current blog as a RSS feed
+        """
+        return self.serve_feed(request, feedgenerator.Rss201rev2Feed, "rss_feed")
+
+    @path("atom/", name="atom_feed")
+    def atom_view(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        """
+        Return the current blog as an Atom feed
+        """
+        return self.serve_feed(request, feedgenerator.Atom1Feed, "atom_feed")
 
     @path("categories/", name="categories_list")
     def categories_list(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
@@ -517,6 +566,15 @@ class BlogEntryPage(SitesFacilesBasePage):
     authors = ParentalManyToManyField(
         "blog.Person", blank=True, help_text=_("Author entries can be created in Snippets > Persons")
     )
+    card_category = models.ForeignKey(
+        "Category",
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        verbose_name=_("Card category"),
+    )
 
     parent_page_types = ["blog.BlogIndexPage"]
     subpage_types = []
@@ -549,6 +607,7 @@ class BlogEntryPage(SitesFacilesBasePage):
     api_fields = SitesFacilesBasePage.api_fields + [
         APIField("tags"),
         APIField("blog_categories", serializer=CategorySerializer(many=True)),
+        APIField("card_category", serializer=CategorySerializer()),
         APIField("authors", serializer=PersonSerializer(many=True)),
         APIField("go_live_at"),
         APIField("expire_at"),
@@ -557,5 +616,9 @@ class BlogEntryPage(SitesFacilesBasePage):
     def get_absolute_url(self):
         return self.url
 
+    def update_card_fields(self) -> None:
+        super().update_card_fields()
+        self.card_category = next(iter(self.blog_categories.all()), None)
+
     class Meta:
         verbose_name = _("Blog page")
@@ -0,0 +1,34 @@
+"""
+Invalidation of the facets and feeds caches (see blog/facets.py and blog/feeds.py)
+
+Connected in BlogConfig.ready()
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from taggit.models import Tag
+from wagtail.models import Page
+from wagtail.signals import post_page_move
+
+from blog.facets import invalidate_all_facets, invalidate_index_facets
+from blog.feeds import invalidate_all_feeds, invalidate_index_feeds
+from blog.models import Category, Organization, Person
+
+
+@receiver(post_page_move)
+def invalidate_moved_page_facets(sender, instance, **kwargs):
+    invalidate_all_facets()
+    invalidate_all_feeds()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_object_facets(sender, instance, **kwargs):
+    if isinstance(instance, Page):
+        # Saved on publication and unpublication, and also by the import scripts
+        ancestor_ids = list(Page.objects.ancestor_of(instance).values_list("pk", flat=True))
+        invalidate_index_facets(ancestor_ids)
+        invalidate_index_feeds(ancestor_ids)
+    elif isinstance(instance, (Category, Organization, Person, Tag)):
+        invalidate_all_facets()
+        invalidate_all_feeds()
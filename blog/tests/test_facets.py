@@ -0,0 +1,100 @@
+import zoneinfo
+from datetime import datetime
+
+from django.test import RequestFactory
+from wagtail.models import Page
+from wagtail.test.utils import WagtailPageTestCase
+
+from blog.models import BlogEntryPage, BlogIndexPage, Category, Organization, Person
+from content_manager.blocks.related_entries import BlogRecentEntriesBlock
+
+
+class BlogFacetsTestCase(WagtailPageTestCase):
+    def setUp(self):
+        home = Page.objects.get(slug="home")
+        self.blog_index_page = home.add_child(
+            instance=BlogIndexPage(title="Actualités", slug="actualites", filter_by_author=True, filter_by_source=True)
+        )
+
+        self.novels = Category.objects.create(name="Romans", slug="romans")
+        self.press = Category.objects.create(name="Presse", slug="presse")
+        self.aurore = Organization.objects.create(name="L’Aurore", slug="aurore")
+        self.emile = Person.objects.create(name="Émile Zola", role="Écrivain", organization=self.aurore)
+
+        paris_tz = zoneinfo.ZoneInfo("Europe/Paris")
+        for i, (year, categories, tags) in enumerate(
+            [
+                (1898, [self.press], ["affaire"]),
+                (1898, [self.press, self.novels], ["affaire", "justice"]),
+                (1871, [self.novels], []),
+            ]
+        ):
+            post = self.blog_index_page.add_child(
+                instance=BlogEntryPage(title=f"Article {i}", date=datetime(year, 1, 13, tzinfo=paris_tz))
+            )
+            post.blog_categories.set(categories)
+            post.tags.add(*tags)
+            post.authors.add(self.emile)
+            post.save()
+
+    def get_context(self, **params):
+        request = RequestFactory().get(self.blog_index_page.url, params)
+        request.user = None
+        return self.blog_index_page.get_context(request)
+
+    def test_facets_are_counted(self):
+        context = self.get_context()
+
+        self.assertEqual([(c.name, c.facet_count) for c in context["categories"]], [("Presse", 2), ("Romans", 2)])
+        self.assertEqual([(t.name, t.facet_count) for t in context["tags"]], [("affaire", 2), ("justice", 1)])
+        self.assertEqual([(a.name, a.facet_count) for a in context["authors"]], [("Émile Zola", 3)])
+        self.assertEqual([(s.name, s.facet_count) for s in context["sources"]], [("L’Aurore", 3)])
+        self.assertEqual(context["years"], [{"value": 1898, "count": 2}, {"value": 1871, "count": 1}])
+
+    def test_facets_respect_the_other_filters(self):
+        context = self.get_context(category="romans")
+
+        # The category filter does not restrict the categories themselves
+        self.assertEqual([(c.name, c.facet_count) for c in context["categories"]], [("Presse", 2), ("Romans", 2)])
+        self.assertEqual([(t.name, t.facet_count) for t in context["tags"]], [("affaire", 1), ("justice", 1)])
+        self.assertEqual(context["years"], [{"value": 1898, "count": 1}, {"value": 1871, "count": 1}])
+
+    def test_facets_are_computed_in_a_single_aggregation(self):
+        # The site root paths, which prefix the cache key, are cached once for all the pages
+        self.blog_index_page.get_url_parts()
+
+        # Aggregation, then the categories, tags, authors and sources
+        with self.assertNumQueries(5):
+            self.blog_index_page.get_facets({})
+
+        with self.assertNumQueries(0):
+            self.blog_index_page.get_facets({})
+
+    def test_facets_are_invalidated_on_publication(self):
+        self.get_context()
+
+        post = self.blog_index_page.get_children().first().specific
+        post.blog_categories.set([])
+        post.save_revision().publish()
+
+        context = self.get_context()
+        self.assertEqual([(c.name, c.facet_count) for c in context["categories"]], [("Presse", 1), ("Romans", 2)])
+
+    def test_recent_entries_block_uses_the_facets(self):
+        block = BlogRecentEntriesBlock()
+        value = block.to_python(
+            {"blog": self.blog_index_page.pk, "category_filter": self.novels.pk, "show_filters": True}
+        )
+        self.blog_index_page.get_facets({}, names=["category"])
+
+        with self.assertNumQueries(0):
+            facets = value.facets()
+
+        self.assertEqual([(c.name, c.facet_count) for c in facets["category"]], [("Presse", 2), ("Romans", 2)])
+        self.assertNotIn("tag", facets)
+
+    def test_index_page_shows_the_counts(self):
+        response = self.client.get(self.blog_index_page.url)
+
+        self.assertContains(response, "Presse (2)")
+        self.assertContains(response, "Émile Zola (3)")
@@ -0,0 +1,91 @@
+import zoneinfo
+from datetime import datetime
+
+from django.test import RequestFactory
+from django.utils import feedgenerator
+from wagtail.models import Page
+from wagtail.test.utils import WagtailPageTestCase
+
+from blog.feeds import get_feed
+from blog.models import BlogEntryPage, BlogIndexPage, Category
+
+
+class BlogFeedsTestCase(WagtailPageTestCase):
+    def setUp(self):
+        home = Page.objects.get(slug="home")
+        self.blog_index_page = home.add_child(instance=BlogIndexPage(title="Actualités", slug="actualites"))
+        self.novels = Category.objects.create(name="Romans", slug="romans")
+
+        paris_tz = zoneinfo.ZoneInfo("Europe/Paris")
+        for i in range(3):
+            post = self.blog_index_page.add_child(
+                instance=BlogEntryPage(title=f"Article {i}", date=datetime(1898, 1, 13 + i, tzinfo=paris_tz))
+            )
+            if i == 0:
+                post.blog_categories.set([self.novels])
+            post.save_revision().publish()
+
+        self.rss_url = self.blog_index_page.url + "rss/"
+
+    def test_feed_has_validators(self):
+        response = self.client.get(self.rss_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response.headers)
+        self.assertIn("Last-Modified", response.headers)
+        self.assertContains(response, "Article 2")
+
+    def test_feed_is_cached(self):
+        request = RequestFactory().get(self.rss_url)
+        get_feed(self.blog_index_page, request, feedgenerator.Rss201rev2Feed, "rss_feed")
+
+        with self.assertNumQueries(0):
+            feed = get_feed(self.blog_index_page, request, feedgenerator.Rss201rev2Feed, "rss_feed")
+        self.assertIn("Article 2", feed["content"])
+
+    def test_feed_returns_not_modified(self):
+        response = self.client.get(self.rss_url)
+
+        response = self.client.get(self.rss_url, headers={"if-none-match": response.headers["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(self.rss_url, headers={"if-modified-since": response.headers["Last-Modified"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_feed_is_filtered_by_category(self):
+        response = self.client.get(self.rss_url, {"category": "romans"})
+
+        self.assertContains(response, "Article 0")
+        self.assertNotContains(response, "Article 1")
+
+        response = self.client.get(self.blog_index_page.url + "atom/", {"category": "romans"})
+        self.assertContains(response, "Article 0")
+        self.assertNotContains(response, "Article 1")
+
+    def test_feed_limit_is_capped(self):
+        def get_limit(limit):
+            return self.blog_index_page.get_feed_limit(RequestFactory().get(self.rss_url, {"limit": limit}))
+
+        self.assertEqual(get_limit("1"), 1)
+        self.assertEqual(get_limit("100000"), 100)
+        self.assertEqual(get_limit("abc"), self.blog_index_page.feed_posts_limit)
+
+        response = self.client.get(self.rss_url, {"limit": "1"})
+        self.assertContains(response, "Article 2")
+        self.assertNotContains(response, "Article 1")
+
+    def test_feed_is_invalidated_on_publication(self):
+        response = self.client.get(self.rss_url)
+        etag = response.headers["ETag"]
+
+        post = self.blog_index_page.get_children().first().specific
+        post.title = "Article modifié"
+        post.save_revision().publish()
+
+        response = self.client.get(self.rss_url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Article modifié")
+
+        post.unpublish()
+        response = self.client.get(self.rss_url)
+        self.assertNotContains(response, "Article modifié")
@@ -1,10 +1,42 @@
+from types import SimpleNamespace
+
+from wagtail.api.v2.filters import FieldsFilter
 from wagtail.api.v2.router import WagtailAPIRouter
+from wagtail.api.v2.utils import BadRequestError
 from wagtail.api.v2.views import PagesAPIViewSet
 from wagtail.documents.api.v2.views import DocumentsAPIViewSet
 from wagtail.images.api.v2.views import ImagesAPIViewSet
 
+
+class IdListFieldsFilter(FieldsFilter):
+    """
+    Field filter which also accepts a comma-separated list of ids, e.g. ?id=5,7,8
+    so that several pages can be fetched in a single listing request.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ids = request.GET.get("id", "")
+        if "," not in ids:
+            return super().filter_queryset(request, queryset, view)
+
+        try:
+            id_list = [int(page_id) for page_id in ids.split(",") if page_id]
+        except ValueError as e:
+            raise BadRequestError(f"field filter error. '{ids}' is not a valid list of ids") from e
+
+        query = request.GET.copy()
+        del query["id"]
+        return super().filter_queryset(SimpleNamespace(GET=query), queryset.filter(id__in=id_list), view)
+
+
+class ContentPagesAPIViewSet(PagesAPIViewSet):
+    filter_backends = [
+        IdListFieldsFilter if backend is FieldsFilter else backend for backend in PagesAPIViewSet.filter_backends
+    ]
+
+
 api_router = WagtailAPIRouter("wagtailapi")
 
-api_router.register_endpoint("pages", PagesAPIViewSet)
+api_router.register_endpoint("pages", ContentPagesAPIViewSet)
 api_router.register_endpoint("images", ImagesAPIViewSet)
 api_router.register_endpoint("documents", DocumentsAPIViewSet)
@@ -0,0 +1,82 @@
+"""
+Build the Django ``CACHES`` setting from environment URLs.
+
+Supported URL schemes:
+
+- ``locmem://`` (or ``locmem://<name>``): per-process memory, the Django default
+- ``file:///absolute/path``: file-based cache, shared by the workers of a same host
+- ``db://<table_name>``: database table, created with ``python manage.py createcachetable``
+- ``redis://``, ``rediss://`` and ``valkey://``: any Redis-compatible server (requires ``redis``)
+- ``dummy://``: disables caching
+"""
+
+from urllib.parse import urlparse, urlunparse
+
+BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "db": "django.core.cache.backends.db.DatabaseCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "rediss": "django.core.cache.backends.redis.RedisCache",
+    "valkey": "django.core.cache.backends.redis.RedisCache",
+    "dummy": "django.core.cache.backends.dummy.DummyCache",
+}
+
+# Named caches used by the application, in addition to the "default" one.
+# "renditions" is also used by Wagtail for the image renditions lookups.
+CACHE_ALIASES = ["pages", "fragments", "renditions"]
+
+
+def parse_cache_url(url: str, alias: str = "default", key_prefix: str = "sf", timeout: int = 300) -> dict:
+    """
+    Returns the configuration of a single cache from its URL.
+
+    The alias is used to keep the caches sharing a same location (same Redis server,
+    same table, etc.) separated from each other.
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme
+
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unsupported cache URL scheme: {scheme!r} (supported: {', '.join(BACKENDS)})")
+
+    config = {
+        "BACKEND": BACKENDS[scheme],
+        "KEY_PREFIX": f"{key_prefix}:{alias}" if key_prefix else alias,
+        "TIMEOUT": timeout,
+    }
+
+    if scheme == "locmem":
+        name = parsed.netloc or "sites-faciles"
+        config["LOCATION"] = f"{name}-{alias}"
+    elif scheme == "file":
+        path = parsed.path.rstrip("/")
+        if not path:
+            raise ValueError("The file cache URL needs an absolute path, e.g. file:///var/tmp/django_cache")
+        config["LOCATION"] = f"{path}/{alias}"
+    elif scheme == "db":
+        table = parsed.netloc or parsed.path.strip("/")
+        config["LOCATION"] = table or "sf_cache_table"
+    elif scheme in ["redis", "rediss", "valkey"]:
+        if scheme == "valkey":
+            parsed = parsed._replace(scheme="redis")
+        config["LOCATION"] = urlunparse(parsed)
+
+    return config
+
+
+def caches_from_env(environ, key_prefix: str = "sf", timeout: int = 300) -> dict:
+    """
+    Returns the ``CACHES`` setting.
+
+    ``SF_CACHE_URL`` configures every cache, and each alias can be moved elsewhere
+    with its own variable (``SF_CACHE_URL_PAGES``, ``SF_CACHE_URL_FRAGMENTS``, ``SF_CACHE_URL_RENDITIONS``).
+    """
+    default_url = environ.get("SF_CACHE_URL", "") or "locmem://"
+
+    caches = {"default": parse_cache_url(default_url, "default", key_prefix, timeout)}
+    for alias in CACHE_ALIASES:
+        url = environ.get(f"SF_CACHE_URL_{alias.upper()}", "") or default_url
+        caches[alias] = parse_cache_url(url, alias, key_prefix, timeout)
+
+    return caches
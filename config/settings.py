@@ -20,6 +20,8 @@ from pathlib import Path
 import dj_database_url
 from dotenv import load_dotenv
 
+from config.cache import caches_from_env
+
 load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -201,6 +203,42 @@ if DATABASE_URL:
 else:
     raise ValueError("Please set the DATABASE_URL environment variable")
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Defaults to a per-process memory cache. Use a shared backend (Redis, database table, files)
+# through SF_CACHE_URL so that all the workers share their caches, see config/cache.py
+SF_CACHE_KEY_PREFIX = os.getenv("SF_CACHE_KEY_PREFIX", "sf")
+SF_CACHE_TIMEOUT = int(os.getenv("SF_CACHE_TIMEOUT", 300))
+SF_CACHE_STATS = getenv_bool("SF_CACHE_STATS", False)
+
+CACHES = caches_from_env(os.environ, key_prefix=SF_CACHE_KEY_PREFIX, timeout=SF_CACHE_TIMEOUT)
+
+# Full-page cache of the anonymous visits, see content_manager/page_cache.py
+SF_PAGE_CACHE = getenv_bool("SF_PAGE_CACHE", False)
+SF_PAGE_CACHE_TIMEOUT = int(os.getenv("SF_PAGE_CACHE_TIMEOUT", 600))
+
+# Cache of the rendered menus, see menus/cache.py
+# Requires a cache shared by all the workers (SF_CACHE_URL): with the per-process default,
+# a menu change is only seen by the worker which saved it until the timeout
+SF_MENU_CACHE = getenv_bool("SF_MENU_CACHE", False)
+SF_MENU_CACHE_TIMEOUT = int(os.getenv("SF_MENU_CACHE_TIMEOUT", SF_CACHE_TIMEOUT))
+
+# Cache of the rendered blocks of the pages, by page revision, see content_manager/block_cache.py
+# Requires a shared cache (SF_CACHE_URL), as for SF_MENU_CACHE
+SF_BLOCK_CACHE = getenv_bool("SF_BLOCK_CACHE", False)
+SF_BLOCK_CACHE_TIMEOUT = int(os.getenv("SF_BLOCK_CACHE_TIMEOUT", 3600))
+
+# Cache of the entries of the blog and events recent entries blocks, see content_manager/services/recent_entries.py
+SF_RECENT_ENTRIES_CACHE_TIMEOUT = int(os.getenv("SF_RECENT_ENTRIES_CACHE_TIMEOUT", 300))
+
+# Keyset (cursor) pagination of the listings, see content_manager/pagination.py
+SF_KEYSET_PAGINATION = getenv_bool("SF_KEYSET_PAGINATION", False)
+
+# Sitemap for search engines, see content_manager/services/xml_sitemap.py
+# SF_SITEMAP_LIMIT is the maximum number of URLs in each sitemap of the index
+SF_SITEMAP_LIMIT = int(os.getenv("SF_SITEMAP_LIMIT", 5000))
+SF_SITEMAP_CACHE_TIMEOUT = int(os.getenv("SF_SITEMAP_CACHE_TIMEOUT", 86400))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -242,6 +280,24 @@ WAGTAIL_CONTENT_LANGUAGES = LANGUAGES = [
 
 LOCALE_PATHS = ["locale"]
 
+# Full-text search
+# https://docs.wagtail.org/en/stable/topics/search/backends.html
+# On PostgreSQL, the pages are indexed in weighted tsvector columns with a GIN index, and ranked in the database.
+# The text search configuration (stemming, stop words) follows the main content language,
+# and can be changed with SF_SEARCH_CONFIG (e.g. "simple" for multilingual sites)
+# With SF_SEARCH_QUEUE, the changed objects are indexed in batches by the process_search_queue command
+# instead of during the requests, see content_manager/services/search_queue.py
+SF_SEARCH_QUEUE = getenv_bool("SF_SEARCH_QUEUE", False)
+SEARCH_CONFIGS = {"en": "english", "fr": "french"}
+WAGTAILSEARCH_BACKENDS = {
+    "default": {
+        "BACKEND": "wagtail.search.backends.database",
+        "SEARCH_CONFIG": os.getenv("SF_SEARCH_CONFIG") or SEARCH_CONFIGS.get(LANGUAGE_CODE, "simple"),
+        "AUTO_UPDATE": not SF_SEARCH_QUEUE,
+    }
+}
+SF_SEARCH_RESULTS_PER_PAGE = int(os.getenv("SF_SEARCH_RESULTS_PER_PAGE", 20))
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 STORAGES = {}
@@ -399,6 +455,20 @@ WAGTAILMENUS_MAIN_MENUS_EDITABLE_IN_WAGTAILADMIN = False
 WAGTAILIMAGES_EXTENSIONS = ["gif", "jpg", "jpeg", "png", "webp", "svg"]
 SF_SCHEME_DEPENDENT_SVGS = True if os.getenv("SF_SCHEME_DEPENDENT_SVGS", False) in ["1", "True"] else False
 
+# Responsive images: widths of the renditions in the srcset, and formats offered before the JPEG/PNG fallback
+SF_RESPONSIVE_IMAGE_WIDTHS = [
+    int(width) for width in os.getenv("SF_RESPONSIVE_IMAGE_WIDTHS", "400,800,1200,1600").replace(" ", "").split(",")
+]
+SF_RESPONSIVE_IMAGE_FORMATS = [
+    image_format
+    for image_format in os.getenv("SF_RESPONSIVE_IMAGE_FORMATS", "avif,webp").replace(" ", "").split(",")
+    if image_format
+]
+
+# With SF_RENDITIONS_QUEUE, the renditions of the images of the published pages are generated
+# in batches by `python manage.py warm_renditions --queue`
+SF_RENDITIONS_QUEUE = getenv_bool("SF_RENDITIONS_QUEUE", False)
+
 # Allows for complex Streamfields without completely removing checks
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
 
@@ -6,14 +6,15 @@ from django.views.defaults import page_not_found, server_error
 from django.views.generic.base import RedirectView, TemplateView
 from django.views.i18n import JavaScriptCatalog
 from wagtail.admin import urls as wagtailadmin_urls
-from wagtail.contrib.sitemaps.views import sitemap
 from wagtail.documents import urls as wagtaildocs_urls
 
 from config.api import api_router
+from content_manager.views import XmlSitemapSectionView, XmlSitemapView
 from proconnect import urls as oidc_urls
 
 urlpatterns = [
-    path("sitemap.xml", sitemap, name="xml_sitemap"),
+    path("sitemap.xml", XmlSitemapView.as_view(), name="xml_sitemap"),
+    path("sitemap-<str:section>.xml", XmlSitemapSectionView.as_view(), name="xml_sitemap_section"),
     path(settings.WAGTAILADMIN_PATH, include(wagtailadmin_urls)),
     path("documents/", include(wagtaildocs_urls)),
     path("api/v2/", api_router.urls),
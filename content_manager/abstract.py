@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils.text import Truncator
 from django.utils.translation import gettext_lazy as _
 from dsfr.constants import COLOR_CHOICES
 from wagtail.admin.panels import FieldPanel, MultiFieldPanel
@@ -6,13 +7,19 @@ from wagtail.api import APIField
 from wagtail.fields import RichTextField, StreamField
 from wagtail.images import get_image_model_string
 from wagtail.images.api.fields import ImageRenditionField
+from wagtail.images.models import AbstractImage
 from wagtail.models import Page
 from wagtail.search import index
 
 from content_manager.blocks.buttons_links import ButtonsHorizontalListBlock
 from content_manager.blocks.core import HERO_STREAMFIELD_BLOCKS, STREAMFIELD_COMMON_BLOCKS
+from content_manager.choosers import prime_chooser_values
+from content_manager.renditions import get_template_rendition_filters, prefetch_images_renditions
 from content_manager.utils import get_streamfield_raw_text
 
+# Same length as the truncatewords filter of the former card templates
+CARD_EXCERPT_WORDS = 20
+
 
 class SitesFacilesBasePage(Page):
     """
@@ -99,6 +106,18 @@ class SitesFacilesBasePage(Page):
         help_text=_("Image displayed as a preview when the page is shared on social media"),
     )
 
+    # Fields of the cards of the listings, computed on save (see update_card_fields)
+    card_image = models.ForeignKey(
+        get_image_model_string(),
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        verbose_name=_("Card image"),
+    )
+    card_excerpt = models.TextField(_("Card excerpt"), blank=True, default="", editable=False)
+
     content_panels = Page.content_panels + [
         FieldPanel(
             "hero",
@@ -124,8 +143,10 @@ class SitesFacilesBasePage(Page):
         FieldPanel("preview_image"),
     ]
 
+    # The boosts give the weights of the fields in the search ranking (title: 2, from Page.search_fields)
     search_fields = Page.search_fields + [
-        index.SearchField("body"),
+        index.SearchField("search_description", boost=1.5),
+        index.SearchField("body_text", boost=1),
     ]
 
     # Export fields over the API
@@ -144,6 +165,8 @@ class SitesFacilesBasePage(Page):
         APIField("public_child_pages"),
         APIField("preview_image"),
         APIField("preview_image_render", serializer=ImageRenditionField("fill-1200x630", source="preview_image")),
+        APIField("card_image"),
+        APIField("card_excerpt"),
     ]
 
     @property
@@ -200,11 +223,38 @@ class SitesFacilesBasePage(Page):
     def get_absolute_url(self):
         return self.url
 
+    def get_context(self, request, *args, **kwargs):
+        # Resolves the pages, documents, images and snippets of the blocks in bulk before rendering
+        prime_chooser_values(self)
+        prefetch_images_renditions(
+            [self.get_preview_image], get_template_rendition_filters("blocks/socialmedia_preview_image.html")
+        )
+        return super().get_context(request, *args, **kwargs)
+
+    def body_text(self) -> str:
+        """
+        Text of the body for the search index, extracted without rendering the blocks
+        """
+        return get_streamfield_raw_text(self.body)
+
+    def update_card_fields(self) -> None:
+        """
+        Computes the fields displayed by the cards of the listings, so that the listings
+        do not need to load the StreamFields (see content_manager.managers.for_listing)
+        """
+        cover = self.cover
+        self.card_image = cover if isinstance(cover, AbstractImage) else None
+        self.card_excerpt = Truncator(self.search_description or "").words(CARD_EXCERPT_WORDS, truncate=" …")
+
     def save(self, *args, **kwargs):
         if not self.search_description:
             search_description = get_streamfield_raw_text(self.body, max_words=20)
             if search_description:
                 self.search_description = search_description
+
+        # The partial saves (e.g. of the latest revision of a draft) keep the card of the live content
+        if kwargs.get("update_fields") is None:
+            self.update_card_fields()
         return super().save(*args, **kwargs)
 
     exclude_fields_in_copy = ["source_url"]
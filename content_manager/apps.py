@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ContentManagerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "content_manager"
+
+    def ready(self):
+        from content_manager import signals  # noqa: F401
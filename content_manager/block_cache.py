@@ -0,0 +1,118 @@
+"""
+Cache of the rendered blocks of the pages, by page revision, locale and host.
+
+It speeds up the pages which are not served from the full-page cache (logged-in visitors, pages
+with a form, SF_PAGE_CACHE disabled…): each top-level block of the hero and the body of a page
+is cached under its id and type and the live revision of the page. The blocks listing other
+content (recent entries, subpages), and the blocks which contain them, are rendered on each request.
+
+Enabled with the SF_BLOCK_CACHE setting. A new revision of a page gives new keys to its blocks,
+and the other changes (linked pages, images, documents, snippets, settings) invalidate all
+the blocks through the signal handlers in content_manager/signals.py.
+"""
+
+from django.conf import settings
+from django.template import Context
+from django.utils.translation import get_language
+from wagtail.blocks import BoundBlock
+from wagtail.blocks.stream_block import StreamValue
+from wagtail.models import Site
+
+from content_manager.cache import (
+    BLOCKS_STATS_GROUP,
+    FRAGMENTS_CACHE,
+    bump_generation,
+    cache_get,
+    cache_set,
+    get_generation,
+    site_key,
+)
+from content_manager.streamfield import walk_raw_blocks
+
+ALL_BLOCKS_NAMESPACE = "blocks"
+
+CACHED_STREAMFIELDS = ["hero", "body"]
+
+# Blocks whose content depends on other pages than the current one
+DYNAMIC_BLOCK_TYPES = {"blog_recent_entries", "events_recent_entries", "subpageslist"}
+
+
+def get_cacheable_block_ids(stream: StreamValue) -> set:
+    """
+    Returns the ids of the top-level blocks of a stream which contain no dynamic block.
+
+    Computed once per StreamValue.
+    """
+    try:
+        return stream._sf_cacheable_block_ids
+    except AttributeError:
+        pass
+
+    block_ids = set()
+    for item in stream.raw_data:
+        if not item.get("id"):
+            continue
+        if not any(
+            raw_block.name in DYNAMIC_BLOCK_TYPES for raw_block in walk_raw_blocks(stream.stream_block, [item])
+        ):
+            block_ids.add(item["id"])
+
+    stream._sf_cacheable_block_ids = block_ids
+    return block_ids
+
+
+def get_block_cache_key(context: Context, stream, block) -> str | None:
+    """
+    Returns the cache key of a top-level block of the current page, or None if it cannot be cached.
+    """
+    if not settings.SF_BLOCK_CACHE or not isinstance(stream, StreamValue) or not isinstance(block, BoundBlock):
+        return None
+
+    request = context.get("request", None)
+    page = context.get("page", None)
+    if request is None or page is None or getattr(request, "is_preview", False):
+        return None
+
+    # Only the streams of the page itself: their content is defined by its live revision
+    revision_id = getattr(page, "live_revision_id", None)
+    if not revision_id or not any(stream is getattr(page, name, None) for name in CACHED_STREAMFIELDS):
+        return None
+
+    if block.id not in get_cacheable_block_ids(stream):
+        return None
+
+    site = Site.find_for_request(request)
+    generation = get_generation(FRAGMENTS_CACHE, ALL_BLOCKS_NAMESPACE)
+
+    return site_key(
+        site.pk if site else 0,
+        "block",
+        page.pk,
+        revision_id,
+        get_language(),
+        request.get_host(),
+        block.block_type,
+        block.id,
+        generation,
+    )
+
+
+def render_cached_block(context: Context, stream, block, render) -> str:
+    """
+    Returns the HTML of a block, from the cache when possible, or computed with the `render` callable.
+    """
+    key = get_block_cache_key(context, stream, block)
+    if key is None:
+        return render()
+
+    html = cache_get(FRAGMENTS_CACHE, key, group=BLOCKS_STATS_GROUP)
+    if html is None:
+        html = render()
+        cache_set(FRAGMENTS_CACHE, key, html, timeout=settings.SF_BLOCK_CACHE_TIMEOUT)
+
+    return html
+
+
+def invalidate_all_blocks() -> None:
+    if settings.SF_BLOCK_CACHE:
+        bump_generation(FRAGMENTS_CACHE, ALL_BLOCKS_NAMESPACE)
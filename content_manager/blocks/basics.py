@@ -14,6 +14,7 @@ from content_manager.constants import (
     HEADING_CHOICES,
     LEVEL_CHOICES,
     LIMITED_RICHTEXTFIELD_FEATURES,
+    MEDIA_MAX_WIDTHS,
     MEDIA_WIDTH_CHOICES,
     TEXT_SIZE_CHOICES,
 )
@@ -196,6 +197,13 @@ class CenteredImageStructValue(StructValue):
         else:
             return "fr-responsive-img"
 
+    def image_sizes(self):
+        """
+        Define the sizes attribute of the responsive image from its width
+        """
+        max_width = MEDIA_MAX_WIDTHS.get(self.get("width") or "", MEDIA_MAX_WIDTHS[""])
+        return f"(min-width: 78em) {max_width}, 100vw"
+
 
 class CenteredImageBlock(blocks.StructBlock):
     title = blocks.CharBlock(label=_("Title"), required=False)
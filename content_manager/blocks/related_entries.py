@@ -6,6 +6,7 @@ from wagtail.snippets.blocks import SnippetChooserBlock
 from content_manager.constants import (
     HEADING_CHOICES_2_5,
 )
+from content_manager.services.recent_entries import get_recent_entries
 
 
 class RecentEntriesStructValue(blocks.StructValue):
@@ -13,7 +14,10 @@ class RecentEntriesStructValue(blocks.StructValue):
     Get and filter the recent entries for either a blog index or an events page index
     """
 
-    def posts(self):
+    def get_index_page(self):
+        return self.get("index_page") or self.get("blog")
+
+    def get_posts(self):
         index_page = self.get("index_page")
         is_blog = False
 
@@ -42,8 +46,36 @@ class RecentEntriesStructValue(blocks.StructValue):
         if source_filter:
             posts = posts.filter(authors__organization=source_filter)
 
-        entries_count = self.get("entries_count")
-        return posts[:entries_count]
+        return posts
+
+    def posts(self):
+        """
+        Returns the entries displayed by the cards, cached by index page and filters
+        """
+        index_page = self.get_index_page()
+        if not index_page:
+            return []
+
+        categories_field = "event_categories" if self.get("index_page") else "blog_categories"
+        key_parts = [
+            getattr(self.get(name), "pk", "")
+            for name in ["category_filter", "tag_filter", "author_filter", "source_filter"]
+        ]
+
+        return get_recent_entries(
+            index_page, self.get_posts(), self.get("entries_count"), categories_field, key_parts=key_parts
+        )
+
+    def facets(self) -> dict:
+        """
+        Returns the values of the filters shown by the block, from the cached facets of the index page
+        """
+        index_page = self.get_index_page()
+        names = [name for name in ["category", "tag", "author", "source"] if self.get(f"{name}_filter")]
+        if not index_page or not names or not self.get("show_filters"):
+            return {}
+
+        return index_page.get_facets({}, names=names)
 
     def current_filters(self) -> dict:
         filters = {}
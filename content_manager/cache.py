@@ -0,0 +1,169 @@
+"""
+Helpers around the named caches defined in config/cache.py
+
+- keys are prefixed by site, so that multiple sites can share the same caches
+- namespaces can be invalidated at once by bumping their generation number
+- hits and misses are counted per cache alias, and per group of keys for the groups listed
+  in STATS_GROUPS (see the `cache_stats` management command)
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, InvalidCacheBackendError, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+PAGES_CACHE = "pages"
+FRAGMENTS_CACHE = "fragments"
+RENDITIONS_CACHE = "renditions"
+
+CACHE_ALIASES = [DEFAULT_CACHE_ALIAS, PAGES_CACHE, FRAGMENTS_CACHE, RENDITIONS_CACHE]
+
+STATS_KEY = "sf-stats"
+BLOCKS_STATS_GROUP = "blocks"
+# Groups of keys with their own statistics, as (cache alias, group name)
+STATS_GROUPS = [(FRAGMENTS_CACHE, BLOCKS_STATS_GROUP)]
+GENERATION_KEY = "sf-gen"
+
+_MISSING = object()
+
+
+def get_cache(alias: str = DEFAULT_CACHE_ALIAS) -> BaseCache:
+    """
+    Returns the cache for an alias, or the default cache if the alias is not configured.
+    """
+    try:
+        return caches[alias]
+    except InvalidCacheBackendError:
+        return caches[DEFAULT_CACHE_ALIAS]
+
+
+def site_key(site, *parts) -> str:
+    """
+    Builds a cache key prefixed by the site (or site id).
+    """
+    site_id = getattr(site, "pk", site) or 0
+    return ":".join(["site", str(site_id), *[str(part) for part in parts]])
+
+
+def page_site_id(page) -> int:
+    """
+    Returns the id of the site of a page, from the cached site root paths (0 if it is not routable).
+    """
+    url_parts = page.get_url_parts()
+    return url_parts[0] if url_parts else 0
+
+
+def _incr(cache: BaseCache, key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def _stats_prefix(group: str | None = None) -> str:
+    return f"{STATS_KEY}:{group}" if group else STATS_KEY
+
+
+def record_access(alias: str, hit: bool, group: str | None = None) -> None:
+    if not getattr(settings, "SF_CACHE_STATS", False):
+        return
+
+    counter = "hits" if hit else "misses"
+    _incr(get_cache(alias), f"{STATS_KEY}:{counter}")
+    if group:
+        _incr(get_cache(alias), f"{_stats_prefix(group)}:{counter}")
+
+
+def cache_get(alias: str, key: str, default=None, group: str | None = None):
+    """
+    Gets a value from a cache, and counts the hit or miss (also for the `group` of the key, if any).
+    """
+    value = get_cache(alias).get(key, _MISSING)
+    record_access(alias, hit=value is not _MISSING, group=group)
+
+    if value is _MISSING:
+        return default
+    return value
+
+
+def cache_set(alias: str, key: str, value, timeout=DEFAULT_TIMEOUT) -> None:
+    get_cache(alias).set(key, value, timeout=timeout)
+
+
+def cache_get_or_set(alias: str, key: str, default, timeout=DEFAULT_TIMEOUT):
+    """
+    Gets a value from a cache, or computes it with the `default` callable and stores it.
+    """
+    value = cache_get(alias, key, _MISSING)
+    if value is _MISSING:
+        value = default()
+        cache_set(alias, key, value, timeout=timeout)
+    return value
+
+
+def get_generation(alias: str, namespace: str) -> int:
+    """
+    Returns the current generation number of a namespace, to be included in its cache keys.
+
+    The initial value is time-based, so that a generation key lost on eviction
+    cannot make older entries valid again.
+    """
+    cache = get_cache(alias)
+    key = f"{GENERATION_KEY}:{namespace}"
+
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+        generation = cache.get(key, 0)
+
+    return generation
+
+
+def get_generations(alias: str, namespaces: list) -> list:
+    """
+    Returns the generation numbers of several namespaces, in a single cache read when possible.
+    """
+    cache = get_cache(alias)
+    keys = [f"{GENERATION_KEY}:{namespace}" for namespace in namespaces]
+
+    found = cache.get_many(keys)
+    if len(found) < len(keys):
+        for namespace, key in zip(namespaces, keys):
+            if key not in found:
+                found[key] = get_generation(alias, namespace)
+
+    return [found[key] for key in keys]
+
+
+def bump_generation(alias: str, namespace: str) -> None:
+    """
+    Invalidates all the cache keys of a namespace.
+    """
+    cache = get_cache(alias)
+    key = f"{GENERATION_KEY}:{namespace}"
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns() // 1000, timeout=None)
+
+
+def get_stats(alias: str, group: str | None = None) -> dict:
+    cache = get_cache(alias)
+    prefix = _stats_prefix(group)
+    hits = cache.get(f"{prefix}:hits", 0)
+    misses = cache.get(f"{prefix}:misses", 0)
+    total = hits + misses
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "ratio": hits / total if total else None,
+    }
+
+
+def reset_stats(alias: str, group: str | None = None) -> None:
+    prefix = _stats_prefix(group)
+    get_cache(alias).delete_many([f"{prefix}:hits", f"{prefix}:misses"])
@@ -0,0 +1,238 @@
+"""
+Batched resolution of the chooser values of the StreamFields.
+
+When a StreamField value is converted block by block, each PageChooserBlock, DocumentChooserBlock,
+ImageChooserBlock and SnippetChooserBlock runs its own query (one per block type at best), and
+the nested blocks (links of the buttons, cards, tiles, columns, tabs…) add up to dozens of queries.
+
+Before a page is rendered, the chooser references of its StreamFields are collected from the raw data
+(see streamfield.py) and loaded with one query per model. The values of the StreamFields are then built
+from these objects, so that the number of queries no longer depends on the number of blocks.
+
+The renditions of the images requested by the templates of the blocks are loaded along with them
+(see renditions.py). With SF_BLOCK_CACHE, the StreamFields whose blocks are cached are not primed.
+"""
+
+import copy
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from wagtail import blocks
+from wagtail.blocks.list_block import ListValue
+from wagtail.blocks.stream_block import StreamValue
+from wagtail.images import get_image_model
+from wagtail.images.blocks import ImageBlock
+from wagtail.models import Page
+
+from content_manager.block_cache import CACHED_STREAMFIELDS
+from content_manager.renditions import copy_image, get_rendition_filters, prefetch_images_renditions
+from content_manager.streamfield import walk_streamfield
+
+PRIMED_STREAMFIELDS = ["hero", "body", "header_cta_buttons"]
+
+
+def get_object_id(model, value):
+    if value is None or value == "":
+        return None
+    try:
+        return model._meta.pk.to_python(value)
+    except ValidationError:
+        return None
+
+
+def collect_chooser_ids(stream_values) -> dict:
+    """
+    Returns the ids referenced by the chooser blocks of StreamField values, as a dict {model: set of ids}.
+    """
+    ids = defaultdict(set)
+    for stream_value in stream_values:
+        for raw_block in walk_streamfield(stream_value):
+            if isinstance(raw_block.block, blocks.ChooserBlock):
+                model = raw_block.block.model_class
+                object_id = get_object_id(model, raw_block.value)
+                if object_id is not None:
+                    ids[model].add(object_id)
+    return ids
+
+
+def get_block_templates(block: blocks.Block) -> list[str]:
+    template = getattr(block.meta, "template", None)
+    if not template:
+        return []
+    if isinstance(template, str):
+        return [template]
+    return list(template)
+
+
+def collect_block_templates(stream_values) -> set:
+    """
+    Returns the names of the templates of the blocks of StreamField values
+    """
+    templates = set()
+    for stream_value in stream_values:
+        for raw_block in walk_streamfield(stream_value):
+            templates.update(get_block_templates(raw_block.block))
+    return templates
+
+
+class ChooserObjects:
+    """
+    The objects of the chooser blocks, loaded with one query per model.
+
+    As with ChooserBlock.bulk_to_python, an object referenced several times is copied,
+    so that the attributes set on a value (e.g. the alt text of an ImageBlock) are not shared.
+
+    The renditions of the images are prefetched for `rendition_filters`.
+    """
+
+    def __init__(self, ids: dict, rendition_filters=()):
+        self.objects = {}
+        self.used = set()
+
+        for model, object_ids in ids.items():
+            objects = model.objects.in_bulk(object_ids)
+            for object_id, obj in objects.items():
+                self.objects[(model, object_id)] = obj
+
+            if model is get_image_model():
+                prefetch_images_renditions(objects.values(), rendition_filters)
+
+    def get(self, block: blocks.ChooserBlock, value):
+        key = (block.model_class, get_object_id(block.model_class, value))
+        obj = self.objects.get(key)
+        if obj is None:
+            return None
+
+        if key in self.used:
+            return copy_image(obj) if isinstance(obj, get_image_model()) else copy.copy(obj)
+        self.used.add(key)
+        return obj
+
+
+def has_default_conversion(block: blocks.Block, base_class: type) -> bool:
+    # The blocks with their own to_python are converted by it
+    return type(block).to_python is base_class.to_python
+
+
+def to_python(block: blocks.Block, value, objects: ChooserObjects):
+    """
+    Converts the raw value of a block as block.to_python does, with the chooser values taken from `objects`.
+    """
+    if isinstance(block, blocks.ChooserBlock):
+        return objects.get(block, value)
+
+    if isinstance(block, ImageBlock) and isinstance(value, dict):
+        return struct_value_to_image(struct_to_python(block, value, objects))
+
+    if isinstance(block, blocks.StructBlock) and has_default_conversion(block, blocks.StructBlock):
+        if isinstance(value, dict):
+            return struct_to_python(block, value, objects)
+
+    elif isinstance(block, blocks.StreamBlock) and has_default_conversion(block, blocks.StreamBlock):
+        if isinstance(value, list):
+            return stream_to_python(block, value, objects)
+
+    elif isinstance(block, blocks.ListBlock) and has_default_conversion(block, blocks.ListBlock):
+        if isinstance(value, list):
+            return list_to_python(block, value, objects)
+
+    return block.to_python(value)
+
+
+def struct_to_python(block: blocks.StructBlock, value: dict, objects: ChooserObjects):
+    return block.meta.value_class(
+        block,
+        [
+            (name, to_python(child_block, value[name], objects) if name in value else child_block.get_default())
+            for name, child_block in block.child_blocks.items()
+        ],
+    )
+
+
+def struct_value_to_image(struct_value):
+    """
+    Returns the image of an ImageBlock value, with the alt text of the block (as ImageBlock.to_python does)
+    """
+    image = struct_value.get("image")
+    if image is not None:
+        decorative = struct_value.get("decorative")
+        image.contextual_alt_text = "" if decorative else struct_value.get("alt_text")
+        image.decorative = decorative
+    return image
+
+
+def stream_to_python(block: blocks.StreamBlock, value: list, objects: ChooserObjects) -> StreamValue:
+    return StreamValue(
+        block,
+        [
+            (item["type"], to_python(block.child_blocks[item["type"]], item.get("value"), objects), item.get("id"))
+            for item in value
+            if isinstance(item, dict) and item.get("type") in block.child_blocks
+        ],
+    )
+
+
+def list_to_python(block: blocks.ListBlock, value: list, objects: ChooserObjects) -> ListValue:
+    bound_blocks = []
+    for item in value:
+        item_id = None
+        if isinstance(item, dict) and item.get("type") == "item" and "value" in item:
+            item_id = item.get("id")
+            item = item["value"]
+        bound_blocks.append(
+            ListValue.ListChild(block.child_block, to_python(block.child_block, item, objects), id=item_id)
+        )
+    return ListValue(block, bound_blocks=bound_blocks)
+
+
+def prime_pages_chooser_values(pages: list[Page], field_names: list[str] = PRIMED_STREAMFIELDS) -> None:
+    """
+    Replaces the StreamField values of pages with values whose choosers are resolved in bulk,
+    with one query per model for all the pages.
+
+    Only the values which are still lazy (as loaded from the database) are converted:
+    calling this function again is a no-op.
+    """
+    # The pages being previewed have no primary key, and cannot be used as dict keys
+    stream_values = {}
+    for index, page in enumerate(pages):
+        for field_name in field_names:
+            stream_value = getattr(page, field_name, None)
+            if isinstance(stream_value, StreamValue) and stream_value.is_lazy:
+                stream_values[(index, field_name)] = stream_value
+
+    if not stream_values:
+        return
+
+    ids = collect_chooser_ids(stream_values.values())
+
+    rendition_filters = []
+    if get_image_model() in ids:
+        rendition_filters = get_rendition_filters(collect_block_templates(stream_values.values()))
+
+    objects = ChooserObjects(ids, rendition_filters=rendition_filters)
+    for (index, field_name), stream_value in stream_values.items():
+        value = stream_to_python(stream_value.stream_block, list(stream_value.raw_data), objects)
+        setattr(pages[index], field_name, value)
+
+
+def get_primed_streamfields() -> list[str]:
+    """
+    Returns the StreamFields to prime before rendering a page.
+
+    With SF_BLOCK_CACHE, the StreamFields whose blocks are cached (see block_cache.py) stay lazy,
+    so that the blocks served from the cache load no objects.
+    """
+    if settings.SF_BLOCK_CACHE:
+        return [field_name for field_name in PRIMED_STREAMFIELDS if field_name not in CACHED_STREAMFIELDS]
+    return PRIMED_STREAMFIELDS
+
+
+def prime_chooser_values(page: Page, field_names: list[str] | None = None) -> None:
+    """
+    Resolves the choosers of the StreamFields of a page in bulk, before rendering it
+    """
+    if field_names is None:
+        field_names = get_primed_streamfields()
+    prime_pages_chooser_values([page], field_names)
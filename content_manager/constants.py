@@ -138,6 +138,13 @@ MEDIA_WIDTH_CHOICES = [
     ("fr-content-media--lg", _("Large")),
 ]
 
+# Maximum displayed width of the medias (8/12, 10/12 and 12/12 of the container), for their responsive images
+MEDIA_MAX_WIDTHS = {
+    "fr-content-media--sm": "52rem",
+    "": "65rem",
+    "fr-content-media--lg": "78rem",
+}
+
 TEXT_SIZE_CHOICES = [
     ("fr-text--sm", _("Small")),
     ("", _("Medium")),
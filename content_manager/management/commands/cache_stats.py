@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from content_manager.cache import CACHE_ALIASES, STATS_GROUPS, get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = """
+    Reports the hits and misses of the application caches.
+
+    Only the accesses made through content_manager.cache are counted.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after displaying them",
+        )
+
+    def handle(self, *args, **kwargs):
+        if not settings.SF_CACHE_STATS:
+            self.stdout.write(self.style.WARNING("Cache statistics are disabled (SF_CACHE_STATS=False)."))
+
+        for alias in CACHE_ALIASES:
+            config = settings.CACHES.get(alias, {})
+            backend = config.get("BACKEND", "(default cache)").split(".")[-1]
+            self.stdout.write(f"{alias}: {self.format_stats(get_stats(alias))} [{backend}]")
+
+            if kwargs.get("reset"):
+                reset_stats(alias)
+
+        for alias, group in STATS_GROUPS:
+            self.stdout.write(f"{alias}/{group}: {self.format_stats(get_stats(alias, group))}")
+
+            if kwargs.get("reset"):
+                reset_stats(alias, group)
+
+        if kwargs.get("reset"):
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
+
+    def format_stats(self, stats: dict) -> str:
+        ratio = f"{stats['ratio']:.1%}" if stats["ratio"] is not None else "-"
+        return f"{stats['hits']} hits, {stats['misses']} misses, hit ratio {ratio}"
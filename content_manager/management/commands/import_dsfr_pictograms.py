@@ -1,10 +1,9 @@
 import os
 
 from django.core.management.base import BaseCommand
-from wagtail.images.models import Image
 
 from content_manager.services.accessors import get_or_create_collection
-from content_manager.utils import import_image, overwrite_image
+from content_manager.services.media_import import MediaFile, import_media_files
 
 
 class Command(BaseCommand):
@@ -29,11 +28,7 @@ class Command(BaseCommand):
         picto_folders = os.listdir(picto_root)
         picto_folders.sort()
 
-        exists_counter = 0
-        imported_counter = 0
-
-        collection = get_or_create_collection("Pictogrammes DSFR")
-
+        media_files = []
         for folder in picto_folders:
             folder_path = os.path.join(picto_root, folder)
             files = os.listdir(folder_path)
@@ -43,51 +38,27 @@ class Command(BaseCommand):
             folder_title = folder.capitalize()
 
             for filename in files:
-                file_path = os.path.join(folder_path, filename)
-
                 base_file_title = filename.split(".")[0].replace("-", " ").title()
-                full_image_title = f"Pictogrammes DSFR — {folder_title} — {base_file_title}"
-
-                image_exists = Image.objects.filter(title=full_image_title).first()
-                if image_exists and not force_update:
-                    file_hash = image_exists.get_file_hash()
-                    exists_counter += 1
-                    if verbosity > 1:
-                        self.stdout.write(
-                            f"A file named {full_image_title} already exists, skipping (file_hash: {file_hash})"
-                        )
-                elif image_exists and force_update:
-                    if verbosity > 1:
-                        self.stdout.write(f"Overwriting image {image_exists} with file {filename}.")
-
-                    image = overwrite_image(
-                        image=image_exists,
-                        full_file_path=file_path,
-                        title=full_image_title,
+                media_files.append(
+                    MediaFile(
+                        path=os.path.join(folder_path, filename),
+                        title=f"Pictogrammes DSFR — {folder_title} — {base_file_title}",
+                        tags=["DSFR", "Pictogrammes", folder_title],
                     )
-                    image.get_file_hash()
-                    exists_counter += 1
+                )
 
-                else:
-                    image = import_image(
-                        full_file_path=file_path,
-                        title=full_image_title,
-                    )
-
-                    image.collection = collection
-                    image.save()
-                    image.get_file_hash()
-
-                    image.tags.add("DSFR")
-                    image.tags.add("Pictogrammes")
-                    image.tags.add(folder_title)
-
-                    imported_counter += 1
-                    if verbosity > 1:
-                        self.stdout.write(f"File {full_image_title} imported")
-
-        if force_update:
-            exists_message = "images forcefully updated"
-        else:
-            exists_message = "already existing images skipped"
-        self.stdout.write(f"DSFR pictograms: {imported_counter} images imported, {exists_counter} {exists_message}.")
+        collection = get_or_create_collection("Pictogrammes DSFR")
+        result = import_media_files(media_files, collection, force=force_update)
+
+        if verbosity > 1:
+            for title in result.created:
+                self.stdout.write(f"File {title} imported")
+            for title in result.updated:
+                self.stdout.write(f"Image {title} overwritten")
+            for title in result.unchanged:
+                self.stdout.write(f"A file named {title} already exists, skipping")
+
+        self.stdout.write(
+            f"DSFR pictograms: {len(result.created)} images imported, {len(result.updated)} images updated, "
+            f"{len(result.unchanged)} already existing images skipped."
+        )
@@ -1,10 +1,9 @@
 import os
 
 from django.core.management.base import BaseCommand
-from wagtail.images.models import Image
 
 from content_manager.services.accessors import get_or_create_collection
-from content_manager.utils import import_image, overwrite_image
+from content_manager.services.media_import import MediaFile, import_media_files
 
 
 class Command(BaseCommand):
@@ -29,50 +28,23 @@ class Command(BaseCommand):
         files = os.listdir(image_root)
         files.sort()
 
-        collection = get_or_create_collection("Illustrations par défaut")
-
-        exists_counter = 0
-        imported_counter = 0
-
-        for filename in files:
-            file_path = os.path.join(image_root, filename)
-
-            base_file_title = filename.split(".")[0].replace("-", " ").title()
+        media_files = [
+            MediaFile(path=os.path.join(image_root, filename), title=filename.split(".")[0].replace("-", " ").title())
+            for filename in files
+        ]
 
-            image_exists = Image.objects.filter(title=base_file_title).first()
-            if image_exists and not force_update:
-                file_hash = image_exists.get_file_hash()
-                exists_counter += 1
-                if verbosity > 1:
-                    self.stdout.write(
-                        f"A image named {base_file_title} already exists, skipping (file_hash: {file_hash})"
-                    )
-            elif image_exists and force_update:
-                if verbosity > 1:
-                    self.stdout.write(f"Overwriting image {image_exists} with file {filename}.")
-
-                image = overwrite_image(
-                    image=image_exists,
-                    full_file_path=file_path,
-                    title=base_file_title,
-                )
-                image.get_file_hash()
-                exists_counter += 1
-
-            else:
-                image = import_image(full_file_path=file_path, title=base_file_title)
-                image.collection = collection
-                image.save()
-                image.get_file_hash()
-                imported_counter += 1
+        collection = get_or_create_collection("Illustrations par défaut")
+        result = import_media_files(media_files, collection, force=force_update)
 
-                if verbosity > 1:
-                    self.stdout.write(f"Image {base_file_title} imported")
+        if verbosity > 1:
+            for title in result.created:
+                self.stdout.write(f"Image {title} imported")
+            for title in result.updated:
+                self.stdout.write(f"Image {title} overwritten")
+            for title in result.unchanged:
+                self.stdout.write(f"A image named {title} already exists, skipping")
 
-        if force_update:
-            exists_message = "images forcefully updated"
-        else:
-            exists_message = "already existing images skipped"
         self.stdout.write(
-            f"Illustration images: {imported_counter} images imported, {exists_counter} {exists_message}."
+            f"Illustration images: {len(result.created)} images imported, {len(result.updated)} images updated, "
+            f"{len(result.unchanged)} already existing images skipped."
         )
@@ -1,13 +1,23 @@
 from django.core.management.base import BaseCommand
 
-from content_manager.services.import_export import ImportPages
+from content_manager.services.import_export import (
+    ImportPages,
+    format_import_result,
+    report_import_progress,
+)
 
 
 class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="List the changes without saving them")
+
     def handle(self, *args, **kwargs):
         """
         Import template pages
         """
 
-        page_importer = ImportPages()
-        page_importer.import_pages()
+        page_importer = ImportPages(dry_run=kwargs["dry_run"])
+        result = page_importer.import_pages(progress=report_import_progress(self.stdout))
+
+        for line in format_import_result(result, page_importer.pages, dry_run=kwargs["dry_run"]):
+            self.stdout.write(line)
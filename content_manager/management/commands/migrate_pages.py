@@ -2,7 +2,13 @@ from pathlib import Path
 
 from django.core.management.base import BaseCommand
 
-from content_manager.services.import_export import ExportPage, ImportExportImages, ImportPages
+from content_manager.services.import_export import (
+    ExportPages,
+    ImportExportImages,
+    ImportPages,
+    format_import_result,
+    report_import_progress,
+)
 from content_manager.utils import get_default_site
 
 SOURCE_URL = "https://sites.beta.gouv.fr/"
@@ -12,6 +18,14 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--ids", nargs="+", type=int, help="IDs of the page(s) to migrate, e.g. 5 7")
 
+        parser.add_argument(
+            "--child_of", type=int, help="[Optional] ID of a page whose children should be migrated, e.g. 5"
+        )
+
+        parser.add_argument(
+            "--descendant_of", type=int, help="[Optional] ID of a page whose descendants should be migrated, e.g. 5"
+        )
+
         parser.add_argument(
             "--site_url", type=str, help=f"[Optional] Root URL of the source site. Default: {SOURCE_URL}"
         )
@@ -22,14 +36,18 @@ class Command(BaseCommand):
             help="[Optional] Slug of the parent page. Defaults to the root page of the default site.",
         )
 
+        parser.add_argument("--dry-run", action="store_true", help="List the changes without saving them")
+
     def handle(self, *args, **kwargs):
         """
         Download pages from a distant site and clones them locally.
         """
 
         page_ids = kwargs.get("ids")
-        if not page_ids:
-            raise ValueError("Missing argument: ids")
+        child_of = kwargs.get("child_of")
+        descendant_of = kwargs.get("descendant_of")
+        if not (page_ids or child_of or descendant_of):
+            raise ValueError("Missing argument: ids, child_of or descendant_of")
 
         source_site_url = kwargs.get("site_url")
         if not source_site_url:
@@ -41,24 +59,32 @@ class Command(BaseCommand):
             parent_page_slug = site.root_page.slug
 
         image_folder = Path("/tmp/sf_img")
-        image_ids = []
-
-        pages = {}
 
         self.stdout.write(f"Exporting pages from site {source_site_url}.")
 
-        for page_id in page_ids:
-            self.stdout.write(f"Exporting page {page_id}")
-            page = ExportPage(page_id, source_site_url)
-            pages[page_id] = page.json_export
-            image_ids += page.image_ids
+        page_exporter = ExportPages(source_site_url)
+        if page_ids:
+            page_exporter.export_pages(page_ids)
+        if child_of:
+            page_exporter.export_subtree(child_of, descendants=False)
+        if descendant_of:
+            page_exporter.export_subtree(descendant_of)
 
-        image_exporter = ImportExportImages(image_ids, source_site_url, image_folder=image_folder)
-        image_exporter.download_images()
+        pages_data = page_exporter.json_export
+        self.stdout.write(f"{len(pages_data['pages'])} page(s) exported.")
 
-        pages_data = {"image_ids": image_ids, "pages": pages}
+        image_exporter = ImportExportImages(
+            pages_data["image_ids"], source_site_url, image_folder=image_folder, session=page_exporter.session
+        )
+        image_exporter.download_images()
 
         page_importer = ImportPages(
-            pages_data=pages_data, parent_page_slug=parent_page_slug, image_folder=image_folder
+            pages_data=pages_data,
+            parent_page_slug=parent_page_slug,
+            image_folder=image_folder,
+            dry_run=kwargs["dry_run"],
         )
-        page_importer.import_pages()
+        result = page_importer.import_pages(progress=report_import_progress(self.stdout))
+
+        for line in format_import_result(result, page_importer.pages, dry_run=kwargs["dry_run"]):
+            self.stdout.write(line)
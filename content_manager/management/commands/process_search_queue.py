@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from content_manager.services.search_queue import get_queue_status, process_search_queue
+
+
+class Command(BaseCommand):
+    help = """
+    Indexes the pages and snippets recorded in the search indexing queue (SF_SEARCH_QUEUE setting).
+
+    By default, the queue is processed until it is empty. With --loop, the command keeps waiting
+    for new entries. With --status, it only reports the number of pending entries and the indexing lag.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200, help="Number of entries indexed at a time")
+        parser.add_argument("--loop", action="store_true", help="Keep processing the new entries")
+        parser.add_argument(
+            "--interval", type=float, default=5, help="Seconds between two checks of the queue with --loop"
+        )
+        parser.add_argument("--status", action="store_true", help="Only report the state of the queue")
+
+    def handle(self, *args, **kwargs):
+        if not settings.SF_SEARCH_QUEUE:
+            self.stdout.write(self.style.WARNING("The search indexing queue is disabled (SF_SEARCH_QUEUE=False)."))
+
+        if kwargs["status"]:
+            self.report_status()
+            return
+
+        while True:
+            processed = 0
+            while count := process_search_queue(batch_size=kwargs["batch_size"]):
+                processed += count
+
+            if processed:
+                self.stdout.write(f"{processed} objects indexed.")
+
+            if not kwargs["loop"]:
+                break
+            time.sleep(kwargs["interval"])
+
+        self.report_status()
+
+    def report_status(self):
+        status = get_queue_status()
+        lag = f"{status['lag'].total_seconds():.0f} seconds" if status["lag"] else "none"
+        self.stdout.write(f"{status['pending']} pending entries, indexing lag: {lag}")
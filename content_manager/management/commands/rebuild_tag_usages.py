@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from content_manager.services.tag_usage import rebuild_tag_usages
+
+
+class Command(BaseCommand):
+    help = """
+    Recomputes the usage counts of the tags (number of live pages per tag, page type and site).
+
+    The counts are maintained when the pages are published, unpublished or deleted:
+    this command is only needed after the migration which creates them, or after a bulk change
+    made without the model signals.
+    """
+
+    def handle(self, *args, **kwargs):
+        count = rebuild_tag_usages()
+        self.stdout.write(self.style.SUCCESS(f"{count} tag usage counts saved."))
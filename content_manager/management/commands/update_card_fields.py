@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from content_manager.abstract import SitesFacilesBasePage
+
+CHUNK_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = """
+    Recomputes the card fields of the pages (image, excerpt and category of the cards of the listings).
+
+    The fields are maintained when the pages are saved: this command is only needed after the migration
+    which creates them, or after a bulk change made without saving the pages.
+    """
+
+    def handle(self, *args, **kwargs):
+        count = 0
+        for model in apps.get_models():
+            if not issubclass(model, SitesFacilesBasePage):
+                continue
+
+            card_fields = [field.name for field in model._meta.concrete_fields if field.name.startswith("card_")]
+            pages = []
+            for page in model.objects.order_by("pk").iterator(chunk_size=CHUNK_SIZE):
+                page.update_card_fields()
+                pages.append(page)
+                if len(pages) >= CHUNK_SIZE:
+                    count += model.objects.bulk_update(pages, card_fields)
+                    pages = []
+            count += model.objects.bulk_update(pages, card_fields)
+
+        self.stdout.write(self.style.SUCCESS(f"{count} pages updated."))
@@ -0,0 +1,86 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from content_manager.services.renditions_warmer import (
+    WarmResult,
+    get_live_image_filters,
+    get_queue_status,
+    process_rendition_queue,
+    warm_images,
+)
+
+PROGRESS_INTERVAL = 100
+
+
+class Command(BaseCommand):
+    help = """
+    Generates the missing renditions of the images of the live pages and of the settings, as requested
+    by the templates and the API fields, so that the visitors do not wait for them.
+
+    With --queue, only the renditions recorded when the pages are published are generated
+    (SF_RENDITIONS_QUEUE setting). With --loop, the command keeps waiting for new entries.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=min(4, os.cpu_count() or 1),
+            help="Number of processes generating the renditions",
+        )
+        parser.add_argument("--queue", action="store_true", help="Process the renditions queue")
+        parser.add_argument("--batch-size", type=int, default=200, help="Number of queue entries processed at a time")
+        parser.add_argument("--loop", action="store_true", help="Keep processing the new queue entries")
+        parser.add_argument(
+            "--interval", type=float, default=5, help="Seconds between two checks of the queue with --loop"
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs["queue"]:
+            self.process_queue(**kwargs)
+            return
+
+        image_filters = get_live_image_filters()
+        self.stdout.write(f"{len(image_filters)} images used by the live pages and the settings.")
+        result = warm_images(image_filters, workers=kwargs["workers"], progress=self.report_progress)
+        self.report_result(result)
+
+    def process_queue(self, **kwargs):
+        if not settings.SF_RENDITIONS_QUEUE:
+            self.stdout.write(self.style.WARNING("The renditions queue is disabled (SF_RENDITIONS_QUEUE=False)."))
+
+        while True:
+            result = WarmResult()
+            # The failed entries are queued again, for the next iteration
+            started_at = timezone.now()
+            while True:
+                count, batch_result = process_rendition_queue(
+                    batch_size=kwargs["batch_size"], workers=kwargs["workers"], queued_before=started_at
+                )
+                if not count:
+                    break
+                result.add(batch_result)
+
+            if result.images:
+                self.report_result(result)
+
+            if not kwargs["loop"]:
+                break
+            time.sleep(kwargs["interval"])
+
+        self.stdout.write(f"{get_queue_status()['pending']} pending entries")
+
+    def report_progress(self, result: WarmResult, total: int):
+        if result.images % PROGRESS_INTERVAL == 0 or result.images == total:
+            self.stdout.write(f"{result.images}/{total} images processed, {result.created} renditions generated")
+
+    def report_result(self, result: WarmResult):
+        for image_id, error in result.failures.items():
+            self.stderr.write(f"Image {image_id}: {error}")
+
+        message = f"{result.created} renditions generated for {result.images} images, {len(result.failures)} failures."
+        self.stdout.write(self.style.WARNING(message) if result.failures else self.style.SUCCESS(message))
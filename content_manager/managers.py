@@ -1,5 +1,25 @@
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
-from django.db.models import Count, Q
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from wagtail.query import PageQuerySet
+
+from content_manager.renditions import prefetch_renditions
+
+
+def for_listing(queryset: PageQuerySet, *related: str, template_name: str | None = None) -> PageQuerySet:
+    """
+    Projection of a queryset of pages for the cards of the listings: the StreamFields (hero, body…)
+    are not loaded, and the card fields are used instead (see SitesFacilesBasePage.update_card_fields).
+
+    `related` are other foreign keys to load with the pages, such as the card category of the posts.
+    The renditions of the card images requested by `template_name` are prefetched.
+    """
+    queryset = queryset.defer_streamfields().select_related("card_image", *related)
+    if template_name:
+        queryset = prefetch_renditions(queryset, "card_image", template_name)
+    return queryset
 
 
 class TagManager(models.Manager):
@@ -9,11 +29,18 @@ class TagManager(models.Manager):
     Add a method to get tags with a minimum use count on live pages only.
     """
 
-    def tags_with_usecount(self, min_count=0):
-        return self.annotate(
-            usecount=Count(
-                "content_manager_tagcontentpage_items",
-                filter=Q(content_manager_tagcontentpage_items__content_object__live=True),
-                distinct=True,
-            )
-        ).filter(usecount__gte=min_count)
+    def tags_with_usecount(self, min_count=0, site=None, page_model=None):
+        """
+        Annotates the tags with their number of live pages of a type (content pages by default),
+        on a site or on all the sites, read from the TagUsage table.
+        """
+        if page_model is None:
+            page_model = apps.get_model("content_manager", "ContentPage")
+
+        usage_filter = Q(usages__content_type=ContentType.objects.get_for_model(page_model))
+        if site is not None:
+            usage_filter &= Q(usages__site=site)
+
+        return self.annotate(usecount=Coalesce(Sum("usages__count", filter=usage_filter), 0)).filter(
+            usecount__gte=min_count
+        )
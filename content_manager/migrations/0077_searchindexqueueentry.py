@@ -0,0 +1,45 @@
+# Generated by Django 6.1.2 on 2026-10-18 06:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content_manager", "0076_tagusage"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchIndexQueueEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("object_id", models.CharField(max_length=255)),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[("update", "Update"), ("delete", "Delete")], default="update", max_length=10
+                    ),
+                ),
+                ("queued_at", models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="contenttypes.contenttype"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Search index queue entry",
+                "verbose_name_plural": "Search index queue entries",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("content_type", "object_id"), name="unique_search_index_queue_entry"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content_manager", "0077_searchindexqueueentry"),
+        ("wagtailimages", "0027_image_description"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="catalogindexpage",
+            name="card_excerpt",
+            field=models.TextField(blank=True, default="", editable=False, verbose_name="Card excerpt"),
+        ),
+        migrations.AddField(
+            model_name="catalogindexpage",
+            name="card_image",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="wagtailimages.image",
+                verbose_name="Card image",
+            ),
+        ),
+        migrations.AddField(
+            model_name="contentpage",
+            name="card_excerpt",
+            field=models.TextField(blank=True, default="", editable=False, verbose_name="Card excerpt"),
+        ),
+        migrations.AddField(
+            model_name="contentpage",
+            name="card_image",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="wagtailimages.image",
+                verbose_name="Card image",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content_manager", "0078_card_fields"),
+        ("wagtailimages", "0027_image_description"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RenditionQueueEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("filter_spec", models.CharField(max_length=255)),
+                ("queued_at", models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                (
+                    "image",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="wagtailimages.image"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Rendition queue entry",
+                "verbose_name_plural": "Rendition queue entries",
+                "constraints": [
+                    models.UniqueConstraint(fields=("image", "filter_spec"), name="unique_rendition_queue_entry")
+                ],
+            },
+        ),
+    ]
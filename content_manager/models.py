@@ -1,12 +1,13 @@
 from typing import Union
 
-from django.core.paginator import Paginator
+from django.contrib.contenttypes.models import ContentType
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.db.models import Q
 from django.forms.widgets import Textarea, mark_safe
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from dsfr.constants import NOTICE_TYPE_CHOICES
 from modelcluster.fields import ParentalKey
@@ -25,7 +26,8 @@ from wagtail.snippets.models import register_snippet
 
 from content_manager.abstract import SitesFacilesBasePage
 from content_manager.constants import LIMITED_RICHTEXTFIELD_FEATURES
-from content_manager.managers import TagManager
+from content_manager.managers import TagManager, for_listing
+from content_manager.pagination import paginate
 from content_manager.widgets import DsfrIconPickerWidget
 
 
@@ -104,19 +106,20 @@ class CatalogIndexPage(RoutablePageMixin, SitesFacilesBasePage):
     @property
     def entries(self):
         # Get a list of live content pages that are children of this page
-        return ContentPage.objects.child_of(self).live().specific().prefetch_related("tags")
+        return for_listing(
+            ContentPage.objects.child_of(self).live().specific(),
+            template_name="content_manager/blocks/catalog_index_entries_list.html",
+        ).prefetch_related("tags")
 
     def get_context(self, request, *args, **kwargs):
         context = super().get_context(request, *args, **kwargs)
 
         filtered_data = self._get_filtered_entries_and_context(request, self.entries)
-        entries = filtered_data["entries"]
+        entries = filtered_data.pop("entries")
         extra_breadcrumbs = filtered_data["extra_breadcrumbs"]
 
         # Pagination
-        paginator = Paginator(entries, self.entries_per_page)
-        page_number = request.GET.get("page")
-        paginated_entries = paginator.get_page(page_number)
+        paginator, paginated_entries = paginate(request, entries, self.entries_per_page, ordering=["path"])
 
         context.update(
             {
@@ -235,11 +238,11 @@ class CatalogIndexPage(RoutablePageMixin, SitesFacilesBasePage):
 
     def get_tags(self) -> models.QuerySet:
         ids = self.entries.values_list("tags", flat=True)
-        return Tag.objects.tags_with_usecount(1).filter(id__in=ids).order_by("name")
+        return Tag.objects.tags_with_usecount(1, site=self.get_site()).filter(id__in=ids).order_by("name")
 
     @property
     def show_filters(self) -> bool | models.BooleanField:
-        return self.filter_by_tag and self.get_tags().count() > 0
+        return self.filter_by_tag and self.get_tags().exists()
 
     @path("tags/", name="tags_list")
     def tags_list(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
@@ -282,6 +285,84 @@ class Tag(TaggitTag):
         verbose_name = _("Tag")
 
 
+class TagUsage(models.Model):
+    """
+    Number of live pages of a type using a tag on a site.
+
+    Maintained on publication, unpublication and deletion by content_manager/services/tag_usage.py,
+    and rebuilt with the rebuild_tag_usages command.
+    """
+
+    tag = models.ForeignKey(TaggitTag, on_delete=models.CASCADE, related_name="usages")
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name="+")
+    site = models.ForeignKey("wagtailcore.Site", on_delete=models.CASCADE, related_name="+")
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tag", "content_type", "site"], name="unique_tag_usage"),
+        ]
+        verbose_name = _("Tag usage")
+        verbose_name_plural = _("Tag usages")
+
+    def __str__(self):
+        return f"{self.tag} ({self.content_type}, {self.site}): {self.count}"
+
+
+class SearchIndexQueueEntry(models.Model):
+    """
+    An object to update in or delete from the search index.
+
+    Recorded when the SF_SEARCH_QUEUE setting is enabled, and processed in batches
+    by the process_search_queue command (see content_manager/services/search_queue.py).
+    """
+
+    ACTION_UPDATE = "update"
+    ACTION_DELETE = "delete"
+    ACTION_CHOICES = [
+        (ACTION_UPDATE, _("Update")),
+        (ACTION_DELETE, _("Delete")),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name="+")
+    object_id = models.CharField(max_length=255)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, default=ACTION_UPDATE)
+    queued_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["content_type", "object_id"], name="unique_search_index_queue_entry"),
+        ]
+        verbose_name = _("Search index queue entry")
+        verbose_name_plural = _("Search index queue entries")
+
+    def __str__(self):
+        return f"{self.action} {self.content_type} {self.object_id}"
+
+
+class RenditionQueueEntry(models.Model):
+    """
+    A rendition of an image to generate before it is requested by a visitor.
+
+    Recorded when a page is published and the SF_RENDITIONS_QUEUE setting is enabled, and processed
+    in batches by the warm_renditions command (see content_manager/services/renditions_warmer.py).
+    """
+
+    image = models.ForeignKey(get_image_model_string(), on_delete=models.CASCADE, related_name="+")
+    filter_spec = models.CharField(max_length=255)
+    queued_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["image", "filter_spec"], name="unique_rendition_queue_entry"),
+        ]
+        verbose_name = _("Rendition queue entry")
+        verbose_name_plural = _("Rendition queue entries")
+
+    def __str__(self):
+        return f"{self.image_id} {self.filter_spec}"
+
+
 class MonospaceField(models.TextField):
     """
     A TextField which renders as a large HTML textarea with monospace font.
@@ -0,0 +1,181 @@
+"""
+Full-page cache for the anonymous visits of the SitesFacilesBasePage pages.
+
+Enabled with the SF_PAGE_CACHE setting. Pages are served from the "pages" cache
+by an `on_serve_page` hook (see wagtail_hooks.py), and invalidated by the signal handlers
+in content_manager/signals.py when a page, a snippet or a setting changes.
+"""
+
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.http import HttpRequest, HttpResponse
+from django.middleware.csp import get_nonce
+from django.utils.translation import get_language
+from wagtail.models import Page, ReferenceIndex, Site
+
+from content_manager.cache import PAGES_CACHE, bump_generation, cache_get, cache_set, get_generations, site_key
+
+ALL_PAGES_NAMESPACE = "pages"
+
+UNCACHEABLE_CACHE_CONTROL = ["private", "no-cache", "no-store"]
+
+# Paths of the references of the recent entries blocks to their index page, in the reference index
+RECENT_ENTRIES_MODEL_PATHS = ["blog_recent_entries.blog", "events_recent_entries.index_page"]
+
+
+def site_namespace(site_id) -> str:
+    return f"pages-site-{site_id}"
+
+
+def page_namespace(page_id) -> str:
+    return f"pages-page-{page_id}"
+
+
+def is_request_cacheable(request: HttpRequest) -> bool:
+    """
+    Only anonymous visits, without any session or pending message, can be served from the cache.
+    """
+    if not settings.SF_PAGE_CACHE:
+        return False
+
+    if request.method not in ["GET", "HEAD"] or getattr(request, "is_preview", False):
+        return False
+
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return False
+
+    cookies = [settings.SESSION_COOKIE_NAME, getattr(settings, "MESSAGE_COOKIE_NAME", "messages")]
+    return not any(cookie in request.COOKIES for cookie in cookies)
+
+
+def is_page_cacheable(page: Page) -> bool:
+    """
+    Only the pages based on SitesFacilesBasePage are cached: this excludes the form pages.
+    """
+    from content_manager.abstract import SitesFacilesBasePage
+
+    return isinstance(page, SitesFacilesBasePage)
+
+
+def is_response_cacheable(request: HttpRequest, response: HttpResponse) -> bool:
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+
+    # A CSRF token or a CSP nonce has been used in the page, so it is specific to the visitor
+    if request.META.get("CSRF_COOKIE_NEEDS_UPDATE") or get_nonce(request):
+        return False
+
+    cache_control = response.get("Cache-Control", "")
+    return not any(directive in cache_control for directive in UNCACHEABLE_CACHE_CONTROL)
+
+
+def get_cache_key(request: HttpRequest, page: Page) -> str:
+    """
+    Returns the cache key for a page, by site, locale, path and query string.
+    """
+    site = Site.find_for_request(request)
+    site_id = site.pk if site else 0
+
+    generations = get_generations(PAGES_CACHE, [ALL_PAGES_NAMESPACE, site_namespace(site_id), page_namespace(page.pk)])
+
+    query_string = urlencode(sorted(request.GET.lists()), doseq=True)
+    url = f"{request.get_host()}{request.path}?{query_string}"
+    url_hash = hashlib.sha256(url.encode()).hexdigest()
+
+    return site_key(site_id, "page", page.pk, get_language(), "-".join(map(str, generations)), url_hash)
+
+
+def get_cached_response(key: str) -> HttpResponse | None:
+    cached = cache_get(PAGES_CACHE, key)
+    if cached is None:
+        return None
+
+    return HttpResponse(cached["content"], status=cached["status"], headers=cached["headers"])
+
+
+def store_response(key: str, response: HttpResponse) -> None:
+    cached = {
+        "content": response.content,
+        "status": response.status_code,
+        "headers": dict(response.headers),
+    }
+    cache_set(PAGES_CACHE, key, cached, timeout=settings.SF_PAGE_CACHE_TIMEOUT)
+
+
+def serve_with_page_cache(callback, page, request, serve_args, serve_kwargs) -> HttpResponse:
+    if not is_request_cacheable(request) or not is_page_cacheable(page):
+        return callback(page, request, serve_args, serve_kwargs)
+
+    key = get_cache_key(request, page)
+    response = get_cached_response(key)
+    if response is not None:
+        return response
+
+    response = callback(page, request, serve_args, serve_kwargs)
+
+    # Template responses are rendered now, so that the use of CSRF tokens is known
+    if callable(getattr(response, "render", None)):
+        response.render()
+
+    if (
+        request.method == "GET"
+        and is_response_cacheable(request, response)
+        and not page.get_view_restrictions().exists()
+    ):
+        store_response(key, response)
+
+    return response
+
+
+def get_pages_listing_entries_of(index_page_ids) -> list:
+    """
+    Returns the ids of the pages whose recent entries blocks list the children of the given pages
+    (see content_manager/blocks/related_entries.py), from the reference index
+    """
+    condition = Q()
+    for model_path in RECENT_ENTRIES_MODEL_PATHS:
+        condition |= Q(model_path__endswith=model_path)
+
+    page_content_type = ContentType.objects.get_for_model(Page)
+    return list(
+        ReferenceIndex.objects.filter(
+            condition,
+            base_content_type=page_content_type,
+            to_content_type=page_content_type,
+            to_object_id__in=[str(page_id) for page_id in index_page_ids],
+        )
+        .values_list("object_id", flat=True)
+        .distinct()
+    )
+
+
+def invalidate_page(page: Page) -> None:
+    """
+    Invalidates a page and its ancestors, as the index pages list their children,
+    and the pages showing the recent entries of these ancestors.
+    """
+    if not settings.SF_PAGE_CACHE:
+        return
+
+    page_ids = list(Page.objects.ancestor_of(page, inclusive=True).values_list("pk", flat=True))
+    page_ids += get_pages_listing_entries_of(page_ids)
+    for page_id in page_ids:
+        bump_generation(PAGES_CACHE, page_namespace(page_id))
+
+    # The page itself might already be deleted
+    bump_generation(PAGES_CACHE, page_namespace(page.pk))
+
+
+def invalidate_site(site_id) -> None:
+    if settings.SF_PAGE_CACHE:
+        bump_generation(PAGES_CACHE, site_namespace(site_id))
+
+
+def invalidate_all_pages() -> None:
+    if settings.SF_PAGE_CACHE:
+        bump_generation(PAGES_CACHE, ALL_PAGES_NAMESPACE)
@@ -0,0 +1,227 @@
+"""
+Keyset (cursor) pagination for the listings, enabled with the SF_KEYSET_PAGINATION setting.
+
+Instead of an OFFSET, the next page is selected with a WHERE clause on the ordering fields
+of the last entry of the current page, which is encoded in an opaque cursor.
+The total number of entries is cached instead of counted on every request.
+
+`?page=` links are still supported, so that the existing links keep working.
+"""
+
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+import math
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q, QuerySet
+
+from content_manager.cache import FRAGMENTS_CACHE, cache_get_or_set
+
+CURSOR_PARAM = "cursor"
+
+
+def encode_cursor(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict | None:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("d") not in ["next", "prev", "last"]:
+        return None
+    return data
+
+
+def serialize_value(value):
+    if isinstance(value, datetime.datetime | datetime.date):
+        return value.isoformat()
+    return value
+
+
+def deserialize_value(value, field):
+    if isinstance(value, str) and field.get_internal_type() == "DateTimeField":
+        return datetime.datetime.fromisoformat(value)
+    if isinstance(value, str) and field.get_internal_type() == "DateField":
+        return datetime.date.fromisoformat(value)
+    return value
+
+
+class KeysetPage:
+    """
+    A page of results, with the same interface as django.core.paginator.Page for the templates,
+    and the cursors of the previous and next pages.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list: list, number: int, paginator, previous_cursor=None, next_cursor=None):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self.previous_cursor = previous_cursor
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+    def next_page_number(self) -> int:
+        return self.number + 1
+
+    def previous_page_number(self) -> int:
+        return self.number - 1
+
+    @property
+    def last_cursor(self) -> str:
+        return encode_cursor({"d": "last"})
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset on its ordering fields, which must end with a unique field (usually "pk").
+
+    `ordering` is a list of field names, prefixed with "-" for a descending order.
+    """
+
+    def __init__(self, object_list: QuerySet, per_page: int, ordering: list[str]):
+        self.per_page = int(per_page)
+        self.ordering = ordering
+        self.object_list = object_list.order_by(*ordering)
+
+    @property
+    def count(self) -> int:
+        """
+        Returns the total number of entries, cached for SF_CACHE_TIMEOUT seconds.
+        """
+        try:
+            sql = str(self.object_list.query)
+        except EmptyResultSet:
+            return 0
+
+        key = f"keyset-count:{hashlib.sha256(sql.encode()).hexdigest()}"
+        return cache_get_or_set(FRAGMENTS_CACHE, key, self.object_list.count, timeout=settings.SF_CACHE_TIMEOUT)
+
+    @property
+    def num_pages(self) -> int:
+        return max(1, math.ceil(self.count / self.per_page))
+
+    def get_field(self, field_name: str):
+        model = self.object_list.model
+        return model._meta.pk if field_name == "pk" else model._meta.get_field(field_name)
+
+    def get_keys(self, obj) -> list:
+        return [serialize_value(getattr(obj, field.lstrip("-"))) for field in self.ordering]
+
+    def after(self, keys: list, reverse: bool = False) -> Q:
+        """
+        Returns the condition for the entries located after the given keys (or before them if `reverse`)
+        """
+        condition = Q()
+        equal = Q()
+        for field, key in zip(self.ordering, keys):
+            name = field.lstrip("-")
+            value = deserialize_value(key, self.get_field(name))
+            descending = field.startswith("-") != reverse
+            condition |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def reversed_ordering(self) -> list[str]:
+        return [field[1:] if field.startswith("-") else f"-{field}" for field in self.ordering]
+
+    def cursor(self, direction: str, obj, number: int) -> str:
+        return encode_cursor({"d": direction, "k": self.get_keys(obj), "n": number})
+
+    def build_page(self, entries: list, number: int, has_previous: bool, has_next: bool) -> KeysetPage:
+        previous_cursor = None
+        next_cursor = None
+        if entries and has_previous:
+            previous_cursor = self.cursor("prev", entries[0], number - 1)
+        if entries and has_next:
+            next_cursor = self.cursor("next", entries[-1], number + 1)
+
+        return KeysetPage(entries, number, self, previous_cursor=previous_cursor, next_cursor=next_cursor)
+
+    def get_page(self, cursor: str | None = None, page_number=None) -> KeysetPage:
+        """
+        Returns the page for a cursor, or for a page number (with an OFFSET) if there is no valid cursor.
+        """
+        data = decode_cursor(cursor) if cursor else None
+        if data is None:
+            return self.get_page_by_number(page_number)
+
+        if data["d"] == "last":
+            entries = list(self.object_list.order_by(*self.reversed_ordering())[: self.per_page])[::-1]
+            return self.build_page(entries, self.num_pages, has_previous=self.count > len(entries), has_next=False)
+
+        try:
+            number = min(max(1, int(data.get("n", 1))), self.num_pages)
+            reverse = data["d"] == "prev"
+            queryset = self.object_list.filter(self.after(self.get_cursor_keys(data), reverse=reverse))
+        except (TypeError, ValueError, ValidationError):
+            # A cursor edited by hand
+            return self.get_page_by_number(page_number)
+
+        if not reverse:
+            entries = list(queryset[: self.per_page + 1])
+            has_next = len(entries) > self.per_page
+            return self.build_page(entries[: self.per_page], number, has_previous=True, has_next=has_next)
+
+        entries = list(queryset.order_by(*self.reversed_ordering())[: self.per_page + 1])
+        has_previous = len(entries) > self.per_page
+        entries = entries[: self.per_page][::-1]
+        return self.build_page(entries, number, has_previous=has_previous, has_next=True)
+
+    def get_cursor_keys(self, data: dict) -> list:
+        keys = data.get("k")
+        if not isinstance(keys, list) or len(keys) != len(self.ordering):
+            raise ValueError("The cursor keys don't match the ordering")
+        if not all(isinstance(key, str | int | float) for key in keys):
+            raise ValueError("The cursor keys must be scalar values")
+        return keys
+
+    def get_page_by_number(self, page_number) -> KeysetPage:
+        try:
+            number = max(1, int(page_number or 1))
+        except (TypeError, ValueError):
+            number = 1
+
+        offset = (number - 1) * self.per_page
+        entries = list(self.object_list[offset : offset + self.per_page + 1])
+        has_next = len(entries) > self.per_page
+        return self.build_page(entries[: self.per_page], number, has_previous=number > 1, has_next=has_next)
+
+
+def paginate(request, queryset: QuerySet, per_page: int, ordering: list[str]):
+    """
+    Returns the paginator and the current page of a listing, with a keyset pagination
+    if SF_KEYSET_PAGINATION is enabled, or Django's Paginator otherwise.
+    """
+    if settings.SF_KEYSET_PAGINATION:
+        paginator = KeysetPaginator(queryset, per_page, ordering)
+        return paginator, paginator.get_page(request.GET.get(CURSOR_PARAM), request.GET.get("page"))
+
+    paginator = Paginator(queryset, per_page)
+    return paginator, paginator.get_page(request.GET.get("page"))
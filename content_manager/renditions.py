@@ -0,0 +1,206 @@
+"""
+Prefetching of the image renditions requested by the templates.
+
+Each {% image %} tag looks its rendition up on its own (in the renditions cache, then in the database),
+so a listing of 20 cards, or a page with many images in its blocks, runs one lookup per image and filter spec.
+
+The filter specs are read from the image tags of the templates themselves (and of the templates
+they include), so that they are declared only once. The renditions of all the images of a listing
+or of a page are then loaded with one query, and the image tags use these prefetched renditions.
+
+The responsive images (see the responsive_image template tag) are rendered as a <picture> with
+a srcset of SF_RESPONSIVE_IMAGE_WIDTHS, sources in the SF_RESPONSIVE_IMAGE_FORMATS picked by the browser,
+and a JPEG or PNG fallback. The SVG and GIF images are still rendered from their original file.
+"""
+
+import copy
+import os
+from collections import defaultdict
+from collections.abc import Iterable
+from functools import cache
+
+from django.conf import settings
+from django.db.models import Prefetch, QuerySet
+from django.template import TemplateDoesNotExist
+from django.template.library import SimpleNode
+from django.template.loader import get_template
+from django.template.loader_tags import IncludeNode
+from wagtail.images import get_image_model
+from wagtail.images.models import Picture
+from wagtail.images.shortcuts import get_rendition_or_not_found, get_renditions_or_not_found
+from wagtail.images.templatetags.wagtailimages_tags import ImageNode, SrcsetImageNode
+
+# Fallback format of the responsive images, by extension of the original file
+RESPONSIVE_FALLBACK_FORMATS = {".jpg": "jpeg", ".jpeg": "jpeg", ".png": "png", ".webp": "png"}
+
+# The content column of the DSFR is at most 78rem wide
+DEFAULT_IMAGE_SIZES = "(min-width: 78em) 78rem, 100vw"
+
+
+def get_node_filter_specs(node: ImageNode) -> list[str]:
+    if isinstance(node, SrcsetImageNode):
+        return [image_filter.spec for image_filter in node.get_filters()]
+    return [node.get_filter().spec]
+
+
+@cache
+def get_template_rendition_filters(template_name: str) -> tuple[str, ...]:
+    """
+    Returns the filter specs of the image tags of a template and of the templates it includes.
+
+    Only the includes of a constant template name are followed. The simple tags can declare
+    the filter specs they request with a `rendition_filters` function (see responsive_image).
+    """
+    try:
+        template = get_template(template_name)
+    except TemplateDoesNotExist:
+        return ()
+
+    nodelist = template.template.nodelist
+    filter_specs = set()
+    for node in nodelist.get_nodes_by_type(ImageNode):
+        filter_specs.update(get_node_filter_specs(node))
+
+    for node in nodelist.get_nodes_by_type(SimpleNode):
+        rendition_filters = getattr(node.func, "rendition_filters", None)
+        if rendition_filters is not None:
+            filter_specs.update(rendition_filters())
+
+    for node in nodelist.get_nodes_by_type(IncludeNode):
+        included = node.template
+        if isinstance(included.var, str) and not included.filters and included.var != template_name:
+            filter_specs.update(get_template_rendition_filters(included.var))
+
+    return tuple(sorted(filter_specs))
+
+
+def get_rendition_filters(template_names: Iterable[str]) -> list[str]:
+    filter_specs = set()
+    for template_name in template_names:
+        filter_specs.update(get_template_rendition_filters(template_name))
+    return sorted(filter_specs)
+
+
+def get_renditions_queryset(filter_specs: list[str]) -> QuerySet:
+    return get_image_model().get_rendition_model().objects.filter(filter_spec__in=filter_specs)
+
+
+def prefetch_renditions(queryset: QuerySet, image_field: str, *template_names: str) -> QuerySet:
+    """
+    Prefetches the renditions requested by templates for the images of a foreign key of the queryset
+    """
+    filter_specs = get_rendition_filters(template_names)
+    if not filter_specs:
+        return queryset
+
+    return queryset.prefetch_related(
+        Prefetch(
+            f"{image_field}__renditions",
+            queryset=get_renditions_queryset(filter_specs),
+            to_attr="prefetched_renditions",
+        )
+    )
+
+
+def attach_renditions(image, renditions) -> None:
+    # The alt text of a rendition is read from its image (see ImageBlock), so each copy of an image has its own
+    image.prefetched_renditions = []
+    for rendition in renditions:
+        rendition = copy.copy(rendition)
+        rendition.image = image
+        image.prefetched_renditions.append(rendition)
+
+
+def copy_image(image):
+    """
+    Returns a copy of an image with its own copies of the prefetched renditions
+    """
+    image_copy = copy.copy(image)
+    if hasattr(image, "prefetched_renditions"):
+        attach_renditions(image_copy, image.prefetched_renditions)
+    return image_copy
+
+
+def prefetch_images_renditions(images: Iterable, filter_specs: list[str]) -> None:
+    """
+    Loads in one query the renditions of images which are already loaded, for the given filter specs
+    """
+    images = [image for image in images if image is not None and not hasattr(image, "prefetched_renditions")]
+    if not images or not filter_specs:
+        return
+
+    renditions = defaultdict(list)
+    for rendition in get_renditions_queryset(filter_specs).filter(image__in={image.pk for image in images}):
+        renditions[rendition.image_id].append(rendition)
+
+    for image in images:
+        attach_renditions(image, renditions[image.pk])
+
+
+def get_responsive_fallback_format(image) -> str | None:
+    _, extension = os.path.splitext(image.file.name)
+    return RESPONSIVE_FALLBACK_FORMATS.get(extension.lower())
+
+
+def get_responsive_widths(image_width: int) -> list[int]:
+    """
+    Returns the widths of the srcset of an image: the renditions are never wider than the original,
+    which is stood for by the first width above it.
+    """
+    widths = sorted(settings.SF_RESPONSIVE_IMAGE_WIDTHS)
+    smaller = [width for width in widths if width < image_width]
+    return smaller + [width for width in widths if width >= image_width][:1]
+
+
+def get_responsive_filter_specs(image) -> list[str]:
+    """
+    Returns the filter specs of the renditions of a responsive image, grouped by format and sorted by width
+    """
+    image_formats = [*settings.SF_RESPONSIVE_IMAGE_FORMATS, get_responsive_fallback_format(image)]
+    widths = get_responsive_widths(image.width)
+    return [f"width-{width}|format-{image_format}" for image_format in image_formats for width in widths]
+
+
+def get_all_responsive_filter_specs() -> list[str]:
+    """
+    Returns the filter specs of the renditions of all the responsive images, whatever their size and format
+    """
+    image_formats = [*settings.SF_RESPONSIVE_IMAGE_FORMATS, *sorted(set(RESPONSIVE_FALLBACK_FORMATS.values()))]
+    return [
+        f"width-{width}|format-{image_format}"
+        for image_format in image_formats
+        for width in settings.SF_RESPONSIVE_IMAGE_WIDTHS
+    ]
+
+
+def render_responsive_image(image, sizes: str | None = None, attrs: dict | None = None) -> str:
+    """
+    Returns the HTML of a responsive image, or of its original file for the SVG and GIF images
+    """
+    if not image:
+        return ""
+
+    attrs = dict(attrs or {})
+    if get_responsive_fallback_format(image) is None:
+        return get_rendition_or_not_found(image, "original").img_tag(attrs)
+
+    attrs["sizes"] = sizes or DEFAULT_IMAGE_SIZES
+    renditions = get_renditions_or_not_found(image, get_responsive_filter_specs(image))
+    return Picture(renditions, attrs).__html__()
+
+
+def get_image_filter_specs(image, filter_specs) -> list[str]:
+    """
+    Returns the filter specs requested by templates for an image, where the specs of the responsive images
+    are replaced by those matching its size and format
+    """
+    filter_specs = set(filter_specs)
+    image_specs = filter_specs - set(get_all_responsive_filter_specs())
+
+    if image_specs != filter_specs:
+        if get_responsive_fallback_format(image) is None:
+            image_specs.add("original")
+        else:
+            image_specs.update(get_responsive_filter_specs(image))
+
+    return sorted(image_specs)
@@ -1,16 +1,24 @@
 import copy
+import hashlib
 import json
 import os
-import sys
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from io import BytesIO
 from pathlib import PosixPath
-from urllib.request import urlretrieve
+from urllib.parse import urljoin
 
 import requests
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.core.files.images import ImageFile
+from django.db import DatabaseError, transaction
 from django.utils import timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from wagtail.blocks.stream_block import StreamBlock, StreamValue
 from wagtail.images.models import Image
 from wagtail.models import Page
 from wagtail.utils.file import hash_filelike
@@ -18,33 +26,100 @@ from wagtail.utils.file import hash_filelike
 from content_manager.constants import HEADER_FIELDS
 from content_manager.models import ContentPage
 from content_manager.services.accessors import get_or_create_collection, get_or_create_content_page
+from content_manager.streamfield import (
+    RawBlock,
+    collect_references,
+    get_reference_kind,
+    remap_references,
+    strip_block_ids,
+    transform_raw_data,
+)
+from content_manager.utils import get_default_site
 
 PAGE_TEMPLATES_ROOT = settings.BASE_DIR / "content_manager/page_templates"
 TEMPLATES_DATA_FILE = PAGE_TEMPLATES_ROOT / "pages_data.json"
 IMAGES_FOLDER = PAGE_TEMPLATES_ROOT / "img"
 
+# Connection and read timeouts of the requests to the source site, in seconds
+HTTP_TIMEOUT = (5, 30)
+HTTP_RETRIES = 3
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Number of pages fetched per request to the pages API, its default maximum limit (WAGTAILAPI_LIMIT_MAX)
+PAGES_BATCH_SIZE = 20
+EXPORT_PAGE_TYPE = "content_manager.ContentPage"
+EXPORT_PAGE_FIELDS = ["body", *HEADER_FIELDS]
+
 User = get_user_model()
 
 
+class ImageDownloadError(Exception):
+    """Raised when some images could not be downloaded from the source site."""
+
+    def __init__(self, failures: dict):
+        """Set the errors of the failed downloads, by source image id."""
+        self.failures = failures
+        details = "\n".join(f"- image {image_id}: {error}" for image_id, error in sorted(failures.items()))
+        super().__init__(
+            f"{len(failures)} image(s) could not be downloaded, run the export again to resume:\n{details}"
+        )
+
+
+def get_http_session(pool_size: int = DOWNLOAD_WORKERS) -> requests.Session:
+    """
+    Returns a session which keeps its connections to the source site open,
+    and retries the requests which fail on a connection error or a server error.
+    """
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 class ExportPage:
     """
     Generic class for export of a ContentPage from a wagtail instance
     """
 
-    def __init__(self, source_page_id, source_site) -> None:
+    def __init__(
+        self,
+        source_page_id,
+        source_site,
+        source_content: dict | None = None,
+        session: requests.Session | None = None,
+    ) -> None:
         self.source_site = source_site
         self.source_page_id = source_page_id
-        self.source_content = self.get_content_from_source_page()
+        self.session = session or get_http_session()
+
+        # The content can be given when it has been fetched with other pages, see ExportPages
+        if source_content is None:
+            source_content = self.get_content_from_source_page()
+        self.source_content = source_content
         self.source_body = self.source_content["body"]
         self.user = User.objects.filter(is_superuser=True).first()
 
         self.content = copy.deepcopy(self.source_content)
-        self.content["body"] = remove_block_ids(self.source_body)
         self.content.pop("tags", None)
         self.content.pop("header_image_render", None)
         self.content.pop("header_image_thumbnail", None)
         self.clear_meta_keys()
 
+        # The ids of the objects referenced by the body, by kind ("image", "document", "page" or "snippet")
+        self.references = {}
+        self.content["body"] = transform_raw_data(
+            get_stream_block("body"), self.source_body, [strip_block_ids, collect_references(self.references)]
+        )
+
         self.images = {}
         self.image_ids = []
         self.get_source_images()
@@ -58,7 +133,8 @@ class ExportPage:
         return f"{self.source_site}api/v2/pages/{self.source_page_id}/"
 
     def get_content_from_source_page(self):
-        response = requests.get(self.source_page_api_url)
+        response = self.session.get(self.source_page_api_url, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
         return response.json()
 
     def get_source_images(self) -> None:
@@ -73,37 +149,135 @@ class ExportPage:
             self.image_ids.append(header_image["id"])
             self.content["header_image"]["meta"].pop("download_url")
 
-        # Remove fields with credentials
-
         # Images from the body
-        self.locate_image_ids(self.source_body)
+        self.image_ids += self.references.get("image", [])
         self.image_ids = list(set(self.image_ids))
 
-    def locate_image_ids(self, json_object):  # NOSONAR
-        if isinstance(json_object, dict) and json_object:
-            for key, value in json_object.items():
-                if key in ["image", "bg_image"] and value:
-                    # Manage the case of images with alt
-                    if isinstance(value, dict):
-                        self.image_ids.append(value["image"])
-                    else:
-                        self.image_ids.append(value)
-                else:
-                    self.locate_image_ids(value)
-
-        elif isinstance(json_object, list) and json_object:
-            for item in json_object:
-                self.locate_image_ids(item)
-
     def clear_meta_keys(self):
         keys = ["parent", "seo_title", "search_description"]
         for key in keys:
             self.content["meta"].pop(key, None)
 
 
+class ExportPages:
+    """
+    Batched export of ContentPages from a wagtail instance
+
+    The pages are fetched through the listing endpoint of the pages API, `batch_size` pages per request,
+    either by id or as a whole subtree. Source sites whose API doesn't accept a list of ids
+    are queried page by page instead.
+    """
+
+    def __init__(
+        self,
+        source_site,
+        session: requests.Session | None = None,
+        batch_size: int = PAGES_BATCH_SIZE,
+    ) -> None:
+        self.source_site = source_site
+        self.session = session or get_http_session()
+        self.batch_size = batch_size
+
+        self.pages = {}
+        self.image_ids = []
+
+    @property
+    def json_export(self) -> dict:
+        return {"image_ids": self.image_ids, "pages": self.pages}
+
+    @property
+    def source_pages_api_url(self) -> str:
+        return f"{self.source_site}api/v2/pages/"
+
+    def iter_source_pages(self, **filters):
+        """
+        Yields the content of the source pages matching the filters, one listing page at a time.
+        """
+        params = {
+            "type": EXPORT_PAGE_TYPE,
+            "fields": ",".join(EXPORT_PAGE_FIELDS),
+            "order": "id",
+            "limit": self.batch_size,
+            **filters,
+        }
+
+        offset = 0
+        while True:
+            response = self.session.get(
+                self.source_pages_api_url, params={**params, "offset": offset}, timeout=HTTP_TIMEOUT
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            yield from data["items"]
+
+            offset += len(data["items"])
+            if not data["items"] or offset >= data["meta"]["total_count"]:
+                break
+
+    def iter_source_pages_by_id(self, page_ids):
+        page_ids = [str(page_id) for page_id in page_ids]
+
+        for start in range(0, len(page_ids), self.batch_size):
+            batch = page_ids[start : start + self.batch_size]
+            try:
+                yield from self.iter_source_pages(id=",".join(batch))
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code != 400:
+                    raise
+                # The API of the source site doesn't accept a list of ids
+                for page_id in batch:
+                    yield ExportPage(page_id, self.source_site, session=self.session).source_content
+
+    def add_page(self, source_content: dict) -> None:
+        page_id = str(source_content["id"])
+        page = ExportPage(page_id, self.source_site, source_content=source_content, session=self.session)
+        self.pages[page_id] = page.json_export
+        self.image_ids += page.image_ids
+
+    def export_pages(self, page_ids) -> dict:
+        for source_content in self.iter_source_pages_by_id(page_ids):
+            self.add_page(source_content)
+        return self.json_export
+
+    def export_subtree(self, page_id, descendants: bool = True) -> dict:
+        """
+        Exports all the descendants of a page, or only its children if `descendants` is False
+        """
+        filter_name = "descendant_of" if descendants else "child_of"
+        for source_content in self.iter_source_pages(**{filter_name: page_id}):
+            self.add_page(source_content)
+        return self.json_export
+
+
+@dataclass
+class ImportResult:
+    """
+    The outcome of the import of a list of pages, by source page id
+
+    `updated` holds the names of the changed fields of each updated page, and `skipped` the pages
+    which were not created because another page already uses their slug.
+    """
+
+    created: list = field(default_factory=list)
+    updated: dict = field(default_factory=dict)
+    unchanged: list = field(default_factory=list)
+    skipped: list = field(default_factory=list)
+    failures: dict = field(default_factory=dict)
+    images_created: int = 0
+
+    @property
+    def pages(self) -> int:
+        return len(self.created) + len(self.updated) + len(self.unchanged) + len(self.skipped) + len(self.failures)
+
+
 class ImportPages:
     """
     Generic class for import of a list of ContentPages from a previously made export
+
+    The existing pages and images are fetched in bulk, then the pages are imported in a single transaction,
+    each one in its own savepoint so that a failing page is rolled back alone.
+    With `dry_run`, nothing is saved: the result tells which pages would be created or updated.
     """
 
     def __init__(
@@ -111,6 +285,7 @@ class ImportPages:
         pages_data: dict | None = None,
         parent_page_slug: str | None = None,
         image_folder: PosixPath | None = IMAGES_FOLDER,
+        dry_run: bool = False,
     ) -> None:
         if pages_data is None:
             with open(TEMPLATES_DATA_FILE, "r") as json_file:
@@ -118,6 +293,9 @@ class ImportPages:
 
         self.pages = pages_data["pages"]  # type: ignore
         self.image_ids = pages_data["image_ids"]  # type: ignore
+        self.dry_run = dry_run
+        # Pages referencing images which are not created in a dry run
+        self.unresolved_pages = set()
 
         self.image_importer = ImportExportImages(self.image_ids, image_folder=image_folder)
 
@@ -130,63 +308,126 @@ class ImportPages:
     def get_or_create_page_templates_index(self) -> ContentPage:
         # The templates index is created right under the Root page, like a site
         parent_page = Page.objects.first()
+        if self.dry_run:
+            return ContentPage.objects.child_of(parent_page).filter(slug="page_templates_index").first()
+
         body = [("subpageslist", None)]
         return get_or_create_content_page(
             slug="page_templates_index", title="Modèles de pages à copier", body=body, parent_page=parent_page
         )
 
-    def import_pages(self):
-        self.image_importer.import_images()
+    def import_pages(self, progress: Callable | None = None) -> ImportResult:
+        """
+        Imports the pages, and returns the result of the import.
 
-        if not self.parent_page:
-            self.parent_page = self.get_or_create_page_templates_index()
+        `progress` is called with the current result and the number of pages after each page.
+        """
+        result = ImportResult()
 
-        for page_id in self.pages.keys():
-            self.update_image_ids(page_id)
+        with transaction.atomic():
+            result.images_created = self.image_importer.import_images(dry_run=self.dry_run)
 
-            raw_page = self.pages[page_id]
-            source_url = raw_page["meta"]["html_url"]
+            if not self.parent_page:
+                self.parent_page = self.get_or_create_page_templates_index()
 
-            page_exists = ContentPage.objects.child_of(self.parent_page).filter(source_url=source_url).first()
-            if page_exists:
-                self.update_page(page_id, page_exists)
-            else:
-                self.import_page(page_id)
+            existing_pages = self.get_existing_pages()
+            used_slugs = self.get_used_slugs()
+            header_images = Image.objects.in_bulk(
+                image["local_id"] for image in self.image_importer.image_data.values() if image.get("local_id")
+            )
 
-    def import_page(self, page_id: str) -> ContentPage:
-        raw_page = self.pages[page_id]
-        source_url = raw_page["meta"]["html_url"]
+            for page_id in self.pages.keys():
+                try:
+                    with transaction.atomic():
+                        self.update_image_ids(page_id, header_images)
+                        self.import_or_update_page(page_id, existing_pages, used_slugs, result)
+                except (ValidationError, DatabaseError, KeyError, ValueError) as e:
+                    result.failures[page_id] = f"{type(e).__name__}: {e}"
+
+                if progress:
+                    progress(result, len(self.pages))
+
+            if self.dry_run:
+                transaction.set_rollback(True)
+
+        return result
 
-        page_dict = {
+    def get_existing_pages(self) -> dict:
+        """
+        Returns the pages already imported under the parent page, by source URL
+        """
+        if not self.parent_page:
+            return {}
+
+        source_urls = [raw_page["meta"]["html_url"] for raw_page in self.pages.values()]
+        pages = (
+            ContentPage.objects.child_of(self.parent_page)
+            .filter(source_url__in=source_urls)
+            .select_related("header_image")
+        )
+        return {page.source_url: page for page in pages}
+
+    def get_used_slugs(self) -> set:
+        """
+        Returns the slugs of the pages to import which are already used by a page of the same locale
+        """
+        locale = self.parent_page.locale if self.parent_page else get_default_site().root_page.locale
+        slugs = [raw_page["meta"]["slug"] for raw_page in self.pages.values()]
+        return set(ContentPage.objects.filter(slug__in=slugs, locale=locale).values_list("slug", flat=True))
+
+    def get_page_fields(self, page_id: str) -> dict:
+        raw_page = self.pages[page_id]
+        page_fields = {
             "slug": raw_page["meta"]["slug"],
             "title": raw_page["title"],
             "body": raw_page["body"],
-            "parent_page": self.parent_page,
         }
 
-        page_fields = {"source_url": source_url}
+        for field_name in HEADER_FIELDS:
+            if raw_page[field_name]:
+                page_fields[field_name] = raw_page[field_name]
+        return page_fields
+
+    def import_or_update_page(self, page_id: str, existing_pages: dict, used_slugs: set, result: ImportResult):
+        source_url = self.pages[page_id]["meta"]["html_url"]
+        page_fields = self.get_page_fields(page_id)
 
-        for field in HEADER_FIELDS:
-            if raw_page[field]:
-                page_fields[field] = raw_page[field]
-        page_dict["page_fields"] = page_fields
-        return get_or_create_content_page(**page_dict)
+        existing_page = existing_pages.get(source_url)
+        if existing_page:
+            changed_fields = get_changed_fields(
+                existing_page, page_fields, ignore_images=page_id in self.unresolved_pages
+            )
+            if not changed_fields:
+                result.unchanged.append(page_id)
+                return
 
-    def update_page(self, source_page_id, existing_page):
-        raw_page = self.pages[source_page_id]
-        existing_page.slug = raw_page["meta"]["slug"]
-        existing_page.title = raw_page["title"]
-        existing_page.body = raw_page["body"]
+            result.updated[page_id] = changed_fields
+            if not self.dry_run:
+                self.update_page(existing_page, page_fields)
 
-        for field in HEADER_FIELDS:
-            if raw_page[field]:
-                setattr(existing_page, field, raw_page[field])
+        elif page_fields["slug"] in used_slugs:
+            # Don't replace or duplicate an already existing page
+            result.skipped.append(page_id)
+
+        else:
+            result.created.append(page_id)
+            used_slugs.add(page_fields["slug"])
+            if not self.dry_run:
+                self.import_page(source_url, page_fields)
+
+    def import_page(self, source_url: str, page_fields: dict) -> ContentPage:
+        return self.parent_page.add_child(
+            instance=ContentPage(source_url=source_url, show_in_menus=True, **page_fields)
+        )
+
+    def update_page(self, existing_page: ContentPage, page_fields: dict) -> ContentPage:
+        for field_name, value in page_fields.items():
+            setattr(existing_page, field_name, value)
 
         existing_page.save()
-        sys.stdout.write(f"Page {existing_page.slug} has been updated.\n")
         return existing_page
 
-    def update_image_ids(self, page_id):
+    def update_image_ids(self, page_id, header_images: dict):
         page = self.pages[page_id]
 
         if page["header_image"]:
@@ -194,21 +435,71 @@ class ImportPages:
             local_image_id = self.image_importer.image_data[source_image_id]["local_id"]
 
             # We need to replace the dictionary with the image itself
-            page["header_image"] = Image.objects.get(pk=local_image_id)
+            page["header_image"] = header_images.get(local_image_id)
+
+        if self.dry_run:
+            references = {}
+            transform_raw_data(get_stream_block(), page["body"], [collect_references(references)])
+            image_data = self.image_importer.image_data
+            if any(
+                str(image_id) in image_data and image_data[str(image_id)].get("local_id") is None
+                for image_id in references.get("image", [])
+            ):
+                self.unresolved_pages.add(page_id)
 
         page["body"] = update_streamfield_image_ids(page["body"], self.image_importer.image_data)
 
 
+def clear_image_references(raw_block: RawBlock) -> None:
+    if get_reference_kind(raw_block) == "image":
+        raw_block.set_value(None)
+
+
+def get_changed_fields(page: ContentPage, page_fields: dict, ignore_images: bool = False) -> list:
+    """
+    Returns the names of the fields of a page which differ from the given values.
+
+    With `ignore_images`, the image references of the StreamFields are left out of the comparison,
+    for the images which don't have a local id yet in a dry run.
+    """
+    visitors = [strip_block_ids, clear_image_references] if ignore_images else [strip_block_ids]
+
+    changed_fields = []
+    for field_name, value in page_fields.items():
+        current_value = getattr(page, field_name)
+        if isinstance(current_value, StreamValue):
+            # The block ids are generated on save
+            stream_block = current_value.stream_block
+            current_value = transform_raw_data(stream_block, current_value.raw_data, visitors)
+            value = transform_raw_data(stream_block, value, visitors)
+        if current_value != value:
+            changed_fields.append(field_name)
+    return changed_fields
+
+
 class ImportExportImages:
     """
     Generic class for import/export of a list of Images from a wagtail instance
+
+    The images are downloaded by a pool of `workers` threads sharing one HTTP session.
+    The image data file is written after each downloaded image, so that an interrupted download
+    can be resumed: the images whose file is already on disk, with the recorded checksum, are skipped.
     """
 
-    def __init__(self, image_ids, source_site=None, image_folder: PosixPath | None = IMAGES_FOLDER) -> None:
+    def __init__(
+        self,
+        image_ids,
+        source_site=None,
+        image_folder: PosixPath | None = IMAGES_FOLDER,
+        workers: int = DOWNLOAD_WORKERS,
+        session: requests.Session | None = None,
+    ) -> None:
         self.user = User.objects.filter(is_superuser=True).first()
 
         self.image_ids = set(image_ids)
         self.source_site = source_site
+        self.workers = workers
+        self.session = session or get_http_session(pool_size=workers)
 
         # Create the folder for the files if it doesn't exist
         self.image_folder = image_folder
@@ -230,99 +521,218 @@ class ImportExportImages:
 
         return image_data
 
+    def save_image_data(self) -> None:
+        # Written to a temporary file first, so that an interruption never leaves a truncated file
+        temporary_file = f"{self.image_data_file}.tmp"
+        with open(temporary_file, "w") as json_file:
+            json.dump(self.image_data, json_file, indent=2)
+            json_file.write("\n")
+        os.replace(temporary_file, self.image_data_file)
+
     def source_image_api_url(self, image_id: int) -> str:
         return f"{self.source_site}api/v2/images/{image_id}/"
 
     def get_content_from_source_image(self, image_id: int) -> dict:
-        response = requests.get(self.source_image_api_url(image_id))
+        response = self.session.get(self.source_image_api_url(image_id), timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
         return response.json()
 
+    def is_downloaded(self, image_id: str) -> bool:
+        """
+        Checks if an image has been fully downloaded by a previous run
+        """
+        image_data = self.image_data.get(image_id, {})
+        if "filename" not in image_data:
+            return False
+        if image_data.get("is_pictogram"):
+            return True
+
+        file_path = self.image_folder / image_data["filename"]
+        if "checksum" not in image_data or not os.path.isfile(file_path):
+            return False
+
+        with open(file_path, "rb") as image_file:
+            return hash_filelike(image_file) == image_data["checksum"]
+
+    def download_file(self, url: str, file_path) -> str:
+        """
+        Downloads a file and returns its checksum
+        """
+        checksum = hashlib.sha1()
+        temporary_file = f"{file_path}.part"
+        with self.session.get(url, timeout=HTTP_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            with open(temporary_file, "wb") as image_file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    image_file.write(chunk)
+                    checksum.update(chunk)
+        os.replace(temporary_file, file_path)
+        return checksum.hexdigest()
+
+    def download_image(self, image_id: str) -> dict:
+        """
+        Downloads the metadata and the file of an image, and returns its data
+        """
+        image = self.get_content_from_source_image(image_id)
+
+        image_data = {"meta": image["meta"], "title": image["title"]}
+
+        image_url = urljoin(self.source_site or "", image["meta"].pop("download_url"))
+        image_name = image_url.split("?")[0].split("/")[-1]
+
+        # No need to export the pictograms, as they should already be present
+        if "Pictogrammes_DSFR" in image_name:
+            pictogram_title = image_name.replace("__", " — ").replace("_", " ")
+            image_data["filename"] = pictogram_title
+            image_data["is_pictogram"] = True
+
+        else:
+            image_data["checksum"] = self.download_file(image_url, self.image_folder / image_name)
+            image_data["filename"] = image_name
+            image_data["is_pictogram"] = False
+
+        return image_data
+
     def download_images(self) -> None:
-        for i in self.image_ids:
-            i = str(i)
-            image = self.get_content_from_source_image(i)
-
-            if i not in self.image_data:
-                self.image_data[i] = {}
-            self.image_data[i]["meta"] = image["meta"]
-            self.image_data[i]["title"] = image["title"]
-
-            image_url = image["meta"].pop("download_url")
-            image_name = image_url.split("?")[0].split("/")[-1]
-
-            # No need to export the pictograms, as they should already be present
-            if "Pictogrammes_DSFR" in image_name:
-                pictogram_title = image_name.replace("__", " — ").replace("_", " ")
-                self.image_data[i]["filename"] = pictogram_title
-                self.image_data[i]["is_pictogram"] = True
-
-            else:
-                urlretrieve(image_url, self.image_folder / image_name)
-                self.image_data[i]["filename"] = image_name
-                self.image_data[i]["is_pictogram"] = False
-
-        with open(self.image_data_file, "w") as json_file:
-            json.dump(self.image_data, json_file, indent=2)
-            json_file.write("\n")
+        image_ids = [str(i) for i in sorted(self.image_ids, key=str)]
+        to_download = [i for i in image_ids if not self.is_downloaded(i)]
+
+        failures = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.download_image, i): i for i in to_download}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    image_data = future.result()
+                except (requests.RequestException, OSError, KeyError, ValueError) as error:
+                    failures[i] = error
+                    continue
+
+                # Keeps the local id of the images which were already imported
+                self.image_data[i] = {**self.image_data.get(i, {}), **image_data}
+                self.save_image_data()
+
+        self.save_image_data()
+
+        if failures:
+            raise ImageDownloadError(failures)
+
+    def import_images(self, dry_run: bool = False) -> int:
+        """
+        Sets the local id of the images, creating the missing ones, and returns the number of created images.
 
-    def import_images(self) -> None:
-        for i in self.image_ids:
-            i = str(i)
-            image_data = self.image_data[i]
-            filename = image_data["filename"]
+        The pictograms are matched by title, and the other images by the hash of their file,
+        the files being hashed in a thread pool. With `dry_run`, the missing images are not created.
+        """
+        image_ids = [str(i) for i in self.image_ids]
+        pictogram_ids = [i for i in image_ids if self.image_data[i]["is_pictogram"]]
+        file_ids = [i for i in image_ids if not self.image_data[i]["is_pictogram"]]
+
+        # Reverse order, so that the first image with a given title or hash is kept
+        pictograms = dict(
+            Image.objects.filter(title__in=[self.image_data[i]["filename"] for i in pictogram_ids])
+            .order_by("-pk")
+            .values_list("title", "id")
+        )
+        for i in pictogram_ids:
+            self.image_data[i]["local_id"] = pictograms.get(self.image_data[i]["filename"])
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            file_hashes = dict(zip(file_ids, executor.map(self.get_file_hash, file_ids)))
+
+        images = dict(
+            Image.objects.filter(file_hash__in=set(file_hashes.values()))
+            .order_by("-pk")
+            .values_list("file_hash", "id")
+        )
+
+        created = set()
+        for i in file_ids:
+            file_hash = file_hashes[i]
+            if file_hash not in images:
+                created.add(file_hash)
+                images[file_hash] = None if dry_run else self.create_image(self.image_data[i], file_hash).id
+            self.image_data[i]["local_id"] = images[file_hash]
 
-            if image_data["is_pictogram"]:
-                pictogram = Image.objects.filter(title=filename).first()
-                image_data["local_id"] = pictogram.id
-            else:
-                image = self.get_or_create_image(image_data)
-                image_data["local_id"] = image.id
+        return len(created)
 
-    def get_or_create_image(self, image_data) -> Image:
+    def get_file_hash(self, image_id: str) -> str:
+        with open(self.image_folder / self.image_data[image_id]["filename"], "rb") as image_file:
+            return hash_filelike(image_file)
+
+    def create_image(self, image_data: dict, file_hash: str) -> Image:
         filename = image_data["filename"]
         imported_filename = f"template_image_{filename.lower()}"
-        title = image_data["title"]
 
         with open(self.image_folder / filename, "rb") as image_file:
-            file_hash = hash_filelike(image_file)
-
-            image = Image.objects.filter(file_hash=file_hash).first()
-            if not image:
-                image = Image(
-                    file=ImageFile(BytesIO(image_file.read()), name=imported_filename),
-                    title=title,
-                    uploaded_by_user=self.user,
-                    collection=self.collection,
-                    created_at=timezone.now(),
-                )
-                image.save()
-                image.get_file_hash()
-
+            content = image_file.read()
+
+        image = Image(
+            file=ImageFile(BytesIO(content), name=imported_filename),
+            title=image_data["title"],
+            uploaded_by_user=self.user,
+            collection=self.collection,
+            created_at=timezone.now(),
+            file_size=len(content),
+            file_hash=file_hash,
+        )
+        image.save()
         return image
 
 
-def remove_block_ids(json_object):
+def get_stream_block(field_name: str = "body") -> StreamBlock:
+    return ContentPage._meta.get_field(field_name).stream_block
+
+
+def remove_block_ids(json_object, field_name: str = "body"):
     """
     Parse a page JSON StreamField representation and strip the block IDs
     """
-    if not isinstance(json_object, (dict, list)):
-        return json_object
-    if isinstance(json_object, list):
-        return [remove_block_ids(v) for v in json_object]
-    return {k: remove_block_ids(v) for k, v in json_object.items() if k != "id"}
+    return transform_raw_data(get_stream_block(field_name), json_object, [strip_block_ids])
 
 
-def update_streamfield_image_ids(json_object, image_ids):
+def update_streamfield_image_ids(json_object, image_ids, field_name: str = "body"):
     """
     Parse a page JSON StreamField representation and update the image IDs
     """
-    if isinstance(json_object, dict):
-        for k, v in json_object.items():
-            v_str = str(v)
-            if k in ["image", "bg_image"] and v_str in image_ids:
-                json_object[k] = image_ids[v_str]["local_id"]
-            else:
-                update_streamfield_image_ids(v, image_ids)
-    elif isinstance(json_object, list):
-        return [update_streamfield_image_ids(v, image_ids) for v in json_object]
-    return json_object
+    mapping = {source_id: image["local_id"] for source_id, image in image_ids.items() if "local_id" in image}
+    return transform_raw_data(get_stream_block(field_name), json_object, [remap_references(mapping, "image")])
+
+
+def format_progress_bar(done: int, total: int, width: int = 30) -> str:
+    filled = width * done // total if total else width
+    return f"[{'#' * filled}{' ' * (width - filled)}] {done}/{total}"
+
+
+def report_import_progress(stdout) -> Callable:
+    """
+    Returns a `progress` callback of ImportPages.import_pages, writing a progress bar
+    to the output of a management command
+    """
+
+    def progress(result: ImportResult, total: int) -> None:
+        stdout.write(f"\r{format_progress_bar(result.pages, total)}", ending="\n" if result.pages == total else "")
+
+    return progress
+
+
+def format_import_result(result: ImportResult, pages: dict, dry_run: bool = False) -> list:
+    """
+    Returns the lines of a report of an import, with the changed fields of the updated pages
+    """
+
+    def page_label(page_id) -> str:
+        return f"{pages[page_id]['meta']['slug']} (source id {page_id})"
+
+    prefix = "Would be " if dry_run else ""
+    lines = [f"{prefix}created: {page_label(page_id)}" for page_id in result.created]
+    lines += [
+        f"{prefix}updated: {page_label(page_id)}, {', '.join(fields)}" for page_id, fields in result.updated.items()
+    ]
+    lines += [f"Skipped, slug already used: {page_label(page_id)}" for page_id in result.skipped]
+    lines += [f"Failed: {page_label(page_id)}, {error}" for page_id, error in result.failures.items()]
+    lines.append(
+        f"{len(result.created)} pages created, {len(result.updated)} updated, {len(result.unchanged)} unchanged, "
+        f"{len(result.skipped)} skipped, {len(result.failures)} failures, {result.images_created} images created."
+    )
+    return lines
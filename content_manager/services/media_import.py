@@ -0,0 +1,165 @@
+"""
+Bulk import of the image files shipped with the static files (DSFR pictograms, default illustrations).
+
+The existing images are listed with their title and file hash in a single query, and the files to import
+are read and hashed in a thread pool. A run where nothing changed makes no other query and writes nothing.
+The new images are created with bulk_create by batches, along with their tags, and added to the search index
+(see search_queue.py).
+"""
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from io import BytesIO
+
+from django.core.files.images import ImageFile
+from django.db import transaction
+from wagtail.images import get_image_model
+
+from content_manager.services.search_queue import update_search_index
+
+IMPORT_WORKERS = 8
+BATCH_SIZE = 100
+
+
+@dataclass
+class MediaFile:
+    """
+    An image file to import, with the title and the tags of its image
+    """
+
+    path: str
+    title: str
+    tags: list = field(default_factory=list)
+
+
+@dataclass
+class MediaImportResult:
+    """
+    The titles of the created, updated and unchanged images of an import
+    """
+
+    created: list = field(default_factory=list)
+    updated: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+
+
+def read_media_file(media_file: MediaFile) -> tuple[bytes, str]:
+    """
+    Returns the content of a file and its hash, computed as Image.file_hash
+    """
+    with open(media_file.path, "rb") as image_file:
+        content = image_file.read()
+    return content, hashlib.sha1(content).hexdigest()
+
+
+def build_image(media_file: MediaFile, content: bytes, file_hash: str, collection):
+    return get_image_model()(
+        file=ImageFile(BytesIO(content), name=media_file.title),
+        title=media_file.title,
+        collection=collection,
+        file_size=len(content),
+        file_hash=file_hash,
+    )
+
+
+def get_or_create_tags(names: set) -> dict:
+    tag_model = get_image_model().tags.through.tag_model()
+    tags = {}
+    for name in sorted(names):
+        tags[name], _created = tag_model.objects.get_or_create(name=name)
+    return tags
+
+
+def create_images(batch: list, tags: dict) -> list:
+    """
+    Creates the images of a list of (media file, unsaved image) pairs, with their tags
+    """
+    image_model = get_image_model()
+    through = image_model.tags.through
+
+    with transaction.atomic():
+        images = image_model.objects.bulk_create([image for _media_file, image in batch])
+        through.objects.bulk_create(
+            [
+                through(tag=tags[name], content_object=image)
+                for (media_file, _image), image in zip(batch, images)
+                for name in media_file.tags
+            ]
+        )
+
+    update_search_index(image_model, images)
+    return images
+
+
+def overwrite_image_file(image_id: int, media_file: MediaFile, content: bytes, file_hash: str):
+    """
+    Replaces the file of an image, keeping the same database record and ID
+    """
+    image = get_image_model().objects.get(pk=image_id)
+    image.file = ImageFile(BytesIO(content), name=media_file.title)
+    image.file_size = len(content)
+    image.file_hash = file_hash
+    image.save()
+    return image
+
+
+def import_media_files(
+    media_files: list[MediaFile],
+    collection,
+    force: bool = False,
+    workers: int = IMPORT_WORKERS,
+    batch_size: int = BATCH_SIZE,
+) -> MediaImportResult:
+    """
+    Creates the images of the files whose title is not used yet.
+
+    With `force`, the file of the existing images is replaced too, unless its hash is unchanged.
+    """
+    result = MediaImportResult()
+
+    # Reverse order, so that the first image with a given title is kept
+    existing_images = {
+        title: (image_id, file_hash)
+        for title, image_id, file_hash in get_image_model()
+        .objects.filter(title__in=[media_file.title for media_file in media_files])
+        .order_by("-pk")
+        .values_list("title", "pk", "file_hash")
+    }
+
+    to_read = []
+    for media_file in media_files:
+        if media_file.title in existing_images and not force:
+            result.unchanged.append(media_file.title)
+        else:
+            to_read.append(media_file)
+
+    if not to_read:
+        return result
+
+    tags = get_or_create_tags(
+        {name for media_file in to_read if media_file.title not in existing_images for name in media_file.tags}
+    )
+
+    batch = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for media_file, (content, file_hash) in zip(to_read, executor.map(read_media_file, to_read)):
+            if media_file.title in existing_images:
+                image_id, existing_hash = existing_images[media_file.title]
+                if file_hash == existing_hash:
+                    result.unchanged.append(media_file.title)
+                else:
+                    overwrite_image_file(image_id, media_file, content, file_hash)
+                    result.updated.append(media_file.title)
+                continue
+
+            batch.append((media_file, build_image(media_file, content, file_hash, collection)))
+            result.created.append(media_file.title)
+            if len(batch) >= batch_size:
+                create_images(batch, tags)
+                batch = []
+
+    if batch:
+        create_images(batch, tags)
+
+    return result
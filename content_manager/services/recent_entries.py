@@ -0,0 +1,108 @@
+"""
+Entries of the recent entries blocks of the blog and events index pages
+(see content_manager/blocks/related_entries.py)
+
+The entries are loaded with the listing projection (without their StreamFields, with their card image)
+and their categories in batch, and only the fields displayed by the cards are kept. They are cached for
+SF_RECENT_ENTRIES_CACHE_TIMEOUT seconds, so that the blocks showing the same entries,
+on the same page or on different ones, share a single fetch.
+
+They are invalidated when a page under the index page is saved or deleted, and when
+a page is moved or a snippet, an image or a setting changes (see content_manager/signals.py).
+"""
+
+import datetime
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.translation import get_language
+from wagtail.models import Page
+
+from content_manager.cache import (
+    FRAGMENTS_CACHE,
+    bump_generation,
+    cache_get_or_set,
+    get_generations,
+    page_site_id,
+    site_key,
+)
+from content_manager.managers import for_listing
+
+ALL_RECENT_ENTRIES_NAMESPACE = "recent-entries"
+
+
+def index_recent_entries_namespace(page_id) -> str:
+    return f"recent-entries-page-{page_id}"
+
+
+@dataclass
+class RecentEntry:
+    """
+    The fields of an entry displayed by the cards of the recent entries blocks
+    """
+
+    title: str
+    url: str
+    date: datetime.datetime | None
+    categories: list[str] = field(default_factory=list)
+    cover_url: str = ""
+
+
+def build_recent_entries(posts: QuerySet, count: int | None, categories_field: str) -> list[RecentEntry]:
+    posts = for_listing(posts.select_related(None).prefetch_related(None)).prefetch_related(categories_field)
+
+    entries = []
+    for post in posts[:count]:
+        cover = post.card_image
+        entries.append(
+            RecentEntry(
+                title=post.title,
+                url=post.url,
+                date=post.date,
+                categories=[category.name for category in getattr(post, categories_field).all()],
+                cover_url=cover.file.url if cover else "",
+            )
+        )
+    return entries
+
+
+def get_recent_entries(
+    index_page: Page, posts: QuerySet, count: int | None, categories_field: str, key_parts=()
+) -> list[RecentEntry]:
+    """
+    Returns the first `count` entries of a queryset of the posts of an index page, from the cache when possible.
+
+    `key_parts` identifies the filters applied to the posts.
+    """
+    generations = get_generations(
+        FRAGMENTS_CACHE, [ALL_RECENT_ENTRIES_NAMESPACE, index_recent_entries_namespace(index_page.pk)]
+    )
+    key = site_key(
+        page_site_id(index_page),
+        "recent-entries",
+        index_page.pk,
+        get_language(),
+        # The events index pages only list the upcoming events
+        timezone.localdate().isoformat(),
+        count,
+        *key_parts,
+        "-".join(map(str, generations)),
+    )
+
+    return cache_get_or_set(
+        FRAGMENTS_CACHE,
+        key,
+        lambda: build_recent_entries(posts, count, categories_field),
+        timeout=settings.SF_RECENT_ENTRIES_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_index_recent_entries(page_ids) -> None:
+    for page_id in page_ids:
+        bump_generation(FRAGMENTS_CACHE, index_recent_entries_namespace(page_id))
+
+
+def invalidate_all_recent_entries() -> None:
+    bump_generation(FRAGMENTS_CACHE, ALL_RECENT_ENTRIES_NAMESPACE)
@@ -0,0 +1,322 @@
+"""
+Generation of the image renditions before they are requested by the visitors.
+
+Otherwise, the first visitor of a page pays for the generation (and the upload, with a remote storage)
+of each of its renditions. The renditions requested by the templates of the blocks, the social preview,
+the cards of the listings, the API fields and the logos of the header and footer are listed for the images
+of the live pages and of the settings (see content_manager/renditions.py), and the warm_renditions command
+generates the missing ones in a process pool.
+
+With the SF_RENDITIONS_QUEUE setting, the renditions of the images of a page are also recorded in the
+RenditionQueueEntry table when it is published (see content_manager/signals.py), and generated in batches
+by `warm_renditions --queue`.
+"""
+
+import datetime
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import django
+from django.apps import apps
+from django.db import connections, transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from wagtail import blocks
+from wagtail.blocks.stream_block import StreamValue
+from wagtail.images import get_image_model
+from wagtail.images.api.fields import ImageRenditionField
+from wagtail.images.models import Filter
+
+from content_manager.abstract import SitesFacilesBasePage
+from content_manager.choosers import PRIMED_STREAMFIELDS, get_block_templates, get_object_id
+from content_manager.models import CmsDsfrConfig, RenditionQueueEntry
+from content_manager.renditions import get_image_filter_specs, get_rendition_filters
+from content_manager.streamfield import walk_streamfield
+
+CHUNK_SIZE = 200
+
+# Templates which render the image fields of the pages and of the settings
+PAGE_IMAGE_FIELD_TEMPLATES = {
+    "header_image": ["blocks/socialmedia_preview_image.html"],
+    "preview_image": ["blocks/socialmedia_preview_image.html"],
+    "card_image": [
+        "blog/blocks/blog_index_posts_list.html",
+        "content_manager/blocks/catalog_index_entries_list.html",
+        "events/blocks/events_index_posts_list.html",
+    ],
+}
+SETTINGS_IMAGE_FIELD_TEMPLATES = {
+    "operator_logo_file": ["blocks/header.html", "blocks/footer.html"],
+}
+
+
+@dataclass
+class WarmResult:
+    """
+    The outcome of the generation of the renditions of a set of images
+    """
+
+    images: int = 0
+    created: int = 0
+    failures: dict = field(default_factory=dict)
+
+    def add(self, other: "WarmResult") -> None:
+        self.images += other.images
+        self.created += other.created
+        self.failures.update(other.failures)
+
+
+def get_api_image_filters(model) -> dict:
+    """
+    Returns the filter specs of the ImageRenditionField API fields of a model, by image field name
+    """
+    filters = defaultdict(set)
+    for api_field in getattr(model, "api_fields", []):
+        serializer = getattr(api_field, "serializer", None)
+        if isinstance(serializer, ImageRenditionField):
+            filters[serializer.source or api_field.name].add(serializer.filter_spec)
+    return filters
+
+
+def merge_image_filters(image_filters: dict, other: dict) -> None:
+    for image_id, filter_specs in other.items():
+        image_filters[image_id].update(filter_specs)
+
+
+def get_ancestor_templates(templates_by_path: dict, path: tuple) -> list[str]:
+    # The templates of the nearest block rendered with a template, which renders the images of its children
+    for depth in range(len(path), 0, -1):
+        templates = templates_by_path.get(path[:depth])
+        if templates:
+            return templates
+    return []
+
+
+def get_image_foreign_keys(model) -> list[str]:
+    image_model = get_image_model()
+    return [
+        model_field.attname
+        for model_field in model._meta.concrete_fields
+        if model_field.is_relation and model_field.related_model is image_model
+    ]
+
+
+def get_block_image_templates(stream_values) -> dict:
+    """
+    Returns the names of the templates which render the images of the chooser blocks, by image id.
+
+    The images of the snippets (e.g. the portrait of a Person in a contact card) are rendered
+    by the template of the block which chooses the snippet.
+    """
+    image_model = get_image_model()
+    image_templates = defaultdict(set)
+    snippet_templates = defaultdict(lambda: defaultdict(set))
+
+    for stream_value in stream_values:
+        # The path of a block in a StreamField determines its definition, and so its templates
+        templates_by_path = {}
+        for raw_block in walk_streamfield(stream_value):
+            block_templates = get_block_templates(raw_block.block)
+            if block_templates:
+                templates_by_path[raw_block.path] = block_templates
+
+            if not isinstance(raw_block.block, blocks.ChooserBlock):
+                continue
+
+            model = raw_block.block.model_class
+            object_id = get_object_id(model, raw_block.value)
+            if object_id is None:
+                continue
+
+            templates = get_ancestor_templates(templates_by_path, raw_block.path)
+            if model is image_model:
+                image_templates[object_id].update(templates)
+            elif get_image_foreign_keys(model):
+                snippet_templates[model][object_id].update(templates)
+
+    for model, templates_by_id in snippet_templates.items():
+        for object_id, *image_ids in model.objects.filter(pk__in=templates_by_id).values_list(
+            "pk", *get_image_foreign_keys(model)
+        ):
+            for image_id in image_ids:
+                if image_id:
+                    image_templates[image_id].update(templates_by_id[object_id])
+
+    return image_templates
+
+
+def get_page_image_filters(page) -> dict:
+    """
+    Returns the filter specs of the renditions requested for the images of a page, by image id
+    """
+    image_filters = defaultdict(set)
+
+    stream_values = [
+        stream_value
+        for field_name in PRIMED_STREAMFIELDS
+        if isinstance(stream_value := getattr(page, field_name, None), StreamValue)
+    ]
+    for image_id, template_names in get_block_image_templates(stream_values).items():
+        image_filters[image_id].update(get_rendition_filters(template_names))
+
+    field_filters = get_api_image_filters(type(page))
+    for field_name, template_names in PAGE_IMAGE_FIELD_TEMPLATES.items():
+        field_filters[field_name].update(get_rendition_filters(template_names))
+
+    for field_name, filter_specs in field_filters.items():
+        image_id = getattr(page, f"{field_name}_id", None)
+        if image_id and filter_specs:
+            image_filters[image_id].update(filter_specs)
+
+    return {image_id: filter_specs for image_id, filter_specs in image_filters.items() if filter_specs}
+
+
+def get_settings_image_filters() -> dict:
+    image_filters = defaultdict(set)
+    for config in CmsDsfrConfig.objects.all():
+        for field_name, template_names in SETTINGS_IMAGE_FIELD_TEMPLATES.items():
+            image_id = getattr(config, f"{field_name}_id", None)
+            if image_id:
+                image_filters[image_id].update(get_rendition_filters(template_names))
+    return image_filters
+
+
+def get_live_image_filters() -> dict:
+    """
+    Returns the filter specs of the renditions requested for the images of the live pages and of the settings
+    """
+    image_filters = defaultdict(set)
+    for model in apps.get_models():
+        if not issubclass(model, SitesFacilesBasePage):
+            continue
+        for page in model.objects.live().order_by("pk").iterator(chunk_size=CHUNK_SIZE):
+            merge_image_filters(image_filters, get_page_image_filters(page))
+
+    merge_image_filters(image_filters, get_settings_image_filters())
+    return image_filters
+
+
+def warm_image(image_id: int, filter_specs: list[str]) -> tuple[int, int, str]:
+    """
+    Generates the missing renditions of an image. Runs in the worker processes.
+
+    Returns the image id, the number of generated renditions and the error message, if any.
+    """
+    try:
+        image = get_image_model().objects.get(pk=image_id)
+        filters = [
+            image.clean_filter_for_svg(Filter(spec=spec)) for spec in get_image_filter_specs(image, filter_specs)
+        ]
+        existing = image.find_existing_renditions(*filters)
+        missing = [image_filter for image_filter in filters if image_filter not in existing]
+        if missing:
+            image.create_renditions(*missing)
+    except Exception as e:  # noqa: BLE001
+        return image_id, 0, f"{type(e).__name__}: {e}"
+    return image_id, len(missing), ""
+
+
+def warm_images(image_filters: dict, workers: int = 1, progress: Callable | None = None) -> WarmResult:
+    """
+    Generates the missing renditions of images, given as a dict {image id: filter specs}.
+
+    With several workers, the images are processed in a process pool. `progress` is called
+    with the current result and the number of images after each image.
+    """
+    tasks = [(image_id, sorted(filter_specs)) for image_id, filter_specs in image_filters.items() if filter_specs]
+    result = WarmResult()
+    if not tasks:
+        return result
+
+    if workers > 1:
+        # The worker processes open their own database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            outcomes = executor.map(warm_image, *zip(*tasks), chunksize=8)
+            collect_outcomes(result, outcomes, len(tasks), progress)
+    else:
+        collect_outcomes(result, (warm_image(*task) for task in tasks), len(tasks), progress)
+
+    return result
+
+
+def collect_outcomes(result: WarmResult, outcomes, total: int, progress: Callable | None) -> None:
+    for image_id, created, error in outcomes:
+        result.images += 1
+        result.created += created
+        if error:
+            result.failures[image_id] = error
+        if progress:
+            progress(result, total)
+
+
+def queue_page_renditions(page) -> None:
+    """
+    Records the renditions of the images of a page to generate, for instance when it is published
+    """
+    image_filters = get_page_image_filters(page)
+    images = get_image_model().objects.in_bulk(image_filters.keys())
+    now = timezone.now()
+
+    RenditionQueueEntry.objects.bulk_create(
+        [
+            RenditionQueueEntry(image=image, filter_spec=filter_spec, queued_at=now)
+            for image_id, image in images.items()
+            for filter_spec in get_image_filter_specs(image, image_filters[image_id])
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def process_rendition_queue(
+    batch_size: int = 200, workers: int = 1, queued_before: datetime.datetime | None = None
+) -> tuple[int, WarmResult]:
+    """
+    Generates the renditions of a batch of the oldest entries of the queue, and returns the number
+    of processed entries with the result.
+
+    The batch is claimed in a short transaction, and the entries are only removed once their renditions
+    are generated. The entries of the failed images are moved to the end of the queue, to be retried
+    by the next runs: `queued_before` leaves them out of the current one. As generating a rendition twice
+    is harmless, several workers can run at the same time.
+    """
+    queue = RenditionQueueEntry.objects.all()
+    if queued_before is not None:
+        queue = queue.filter(queued_at__lte=queued_before)
+
+    with transaction.atomic():
+        entries = list(queue.select_for_update(skip_locked=True).order_by("queued_at")[:batch_size])
+
+    image_filters = defaultdict(set)
+    for entry in entries:
+        image_filters[entry.image_id].add(entry.filter_spec)
+
+    result = warm_images(image_filters, workers)
+
+    processed = Q()
+    failed = Q()
+    for entry in entries:
+        condition = Q(pk=entry.pk, queued_at=entry.queued_at)
+        if entry.image_id in result.failures:
+            failed |= condition
+        else:
+            processed |= condition
+
+    # An empty Q() would match all the entries
+    if processed:
+        RenditionQueueEntry.objects.filter(processed).delete()
+    if failed:
+        RenditionQueueEntry.objects.filter(failed).update(queued_at=timezone.now())
+
+    return len(entries), result
+
+
+def get_queue_status() -> dict:
+    """
+    Returns the number of pending entries and the age of the oldest one
+    """
+    status = RenditionQueueEntry.objects.aggregate(pending=Count("pk"), oldest=Min("queued_at"))
+    status["lag"] = timezone.now() - status["oldest"] if status["oldest"] else None
+    return status
@@ -0,0 +1,130 @@
+"""
+Incremental indexing queue of the search backends, enabled with the SF_SEARCH_QUEUE setting.
+
+Instead of indexing the objects in the request which changes them, the signal handlers
+(see content_manager/signals.py) record them in the SearchIndexQueueEntry table, and the
+process_search_queue command indexes them in batches. An object changed several times
+before being processed has a single entry in the queue.
+
+A full rebuild with update_index is then only needed after a change of the indexed fields.
+"""
+
+from itertools import groupby
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from wagtail.models import Page
+from wagtail.search.backends import get_search_backends
+
+from content_manager.models import SearchIndexQueueEntry
+
+
+def get_content_type_id(obj) -> int:
+    # The specific type of the pages, even if they are loaded as Page instances
+    if isinstance(obj, Page):
+        return obj.content_type_id
+    return ContentType.objects.get_for_model(obj).pk
+
+
+def queue_for_indexing(objects, action: str = SearchIndexQueueEntry.ACTION_UPDATE) -> None:
+    """
+    Records objects to update in (or delete from) the search index.
+    """
+    now = timezone.now()
+    entries = [
+        SearchIndexQueueEntry(
+            content_type_id=get_content_type_id(obj), object_id=str(obj.pk), action=action, queued_at=now
+        )
+        for obj in objects
+    ]
+
+    SearchIndexQueueEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=["content_type", "object_id"],
+        update_fields=["action", "queued_at"],
+    )
+
+
+def update_search_index(model, objects: list) -> None:
+    """
+    Adds objects of a model to the search index: through the queue if it is enabled,
+    or immediately in a single batch otherwise.
+
+    For the objects created without the model signals, for instance with bulk_create.
+    """
+    if settings.SF_SEARCH_QUEUE:
+        queue_for_indexing(objects)
+        return
+
+    for backend in get_search_backends(with_auto_update=True):
+        backend.add_bulk(model, objects)
+
+
+def index_objects(model, object_ids: list) -> None:
+    indexed_objects = list(model.get_indexed_objects().filter(pk__in=object_ids))
+    # The objects which no longer exist are removed from the index
+    missing_ids = set(map(str, object_ids)) - {str(obj.pk) for obj in indexed_objects}
+
+    for backend in get_search_backends():
+        if indexed_objects:
+            backend.add_bulk(model, indexed_objects)
+        for object_id in missing_ids:
+            backend.delete(model(pk=object_id))
+
+
+def delete_objects(model, object_ids: list) -> None:
+    for backend in get_search_backends():
+        for object_id in object_ids:
+            backend.delete(model(pk=object_id))
+
+
+def process_search_queue(batch_size: int = 200) -> int:
+    """
+    Indexes a batch of the oldest entries of the queue, and returns the number of processed entries.
+
+    The batch is claimed in a short transaction, and indexed outside of it so that the pages published
+    meanwhile can update their entries. Only the entries which were not queued again during the indexing
+    are then deleted. As indexing is idempotent, several workers can run at the same time.
+    """
+    with transaction.atomic():
+        entries = list(
+            SearchIndexQueueEntry.objects.select_for_update(skip_locked=True).order_by("queued_at")[:batch_size]
+        )
+
+    if not entries:
+        return 0
+
+    for (content_type_id, action), group in groupby(
+        sorted(entries, key=lambda entry: (entry.content_type_id, entry.action)),
+        key=lambda entry: (entry.content_type_id, entry.action),
+    ):
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None:
+            continue
+
+        object_ids = [entry.object_id for entry in group]
+        if action == SearchIndexQueueEntry.ACTION_DELETE:
+            delete_objects(model, object_ids)
+        else:
+            index_objects(model, object_ids)
+
+    # The objects changed again since the batch was claimed stay in the queue
+    processed = Q()
+    for entry in entries:
+        processed |= Q(pk=entry.pk, queued_at=entry.queued_at)
+    SearchIndexQueueEntry.objects.filter(processed).delete()
+
+    return len(entries)
+
+
+def get_queue_status() -> dict:
+    """
+    Returns the number of pending entries and the age of the oldest one (the indexing lag).
+    """
+    status = SearchIndexQueueEntry.objects.aggregate(pending=Count("pk"), oldest=Min("queued_at"))
+    status["lag"] = timezone.now() - status["oldest"] if status["oldest"] else None
+    return status
@@ -0,0 +1,100 @@
+"""
+Tree of the pages of a site, for the readable sitemap (see SiteMapView)
+
+The whole tree is loaded in a few queries: one for the live descendants of the site root,
+ordered by their treebeard path, one for the view restrictions, and one per page type
+with an `exclude_from_sitemap` field.
+"""
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.http import HttpRequest
+from django.utils.translation import get_language
+from wagtail.models import Page, PageViewRestriction
+
+from content_manager.cache import FRAGMENTS_CACHE, bump_generation, cache_get_or_set, get_generation, site_key
+
+SITEMAP_NAMESPACE = "sitemap"
+
+
+def get_excluded_page_ids(pages: list[Page]) -> set:
+    """
+    Returns the ids of the pages excluded from the sitemap, with one query per page type.
+    """
+    ids_by_content_type = {}
+    for page in pages:
+        ids_by_content_type.setdefault(page.content_type_id, []).append(page.pk)
+
+    excluded_ids = set()
+    for content_type_id, page_ids in ids_by_content_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None or not any(field.name == "exclude_from_sitemap" for field in model._meta.concrete_fields):
+            continue
+
+        excluded_ids.update(
+            model.objects.filter(pk__in=page_ids, exclude_from_sitemap=True).values_list("pk", flat=True)
+        )
+
+    return excluded_ids
+
+
+def build_sitemap_tree(root_page: Page, request: HttpRequest | None = None, show_restricted: bool = False) -> list:
+    """
+    Returns the nested list of the pages under `root_page`, as dicts with the keys
+    `title`, `url`, `restricted` and `children`.
+
+    The pages excluded from the sitemap, and the restricted pages unless `show_restricted` is set,
+    are left out with all their descendants.
+    """
+    pages = list(root_page.get_descendants().live().order_by("path"))
+    excluded_ids = get_excluded_page_ids(pages)
+    restricted_paths = set(PageViewRestriction.objects.values_list("page__path", flat=True))
+    root_is_restricted = any(root_page.path.startswith(path) for path in restricted_paths)
+
+    tree = []
+    nodes_by_path = {root_page.path: {"children": tree, "restricted": root_is_restricted}}
+
+    for page in pages:
+        parent = nodes_by_path.get(page.path[: -page.steplen])
+        if parent is None:
+            # One of the ancestors is not live, or is left out of the sitemap
+            continue
+
+        restricted = parent["restricted"] or page.path in restricted_paths
+        if page.pk in excluded_ids or (restricted and not show_restricted):
+            continue
+
+        node = {
+            "title": page.title,
+            "url": page.get_url(request),
+            "restricted": restricted,
+            "children": [],
+        }
+        parent["children"].append(node)
+        nodes_by_path[page.path] = node
+
+    return tree
+
+
+def get_sitemap_tree(site, request: HttpRequest | None = None, show_restricted: bool = False) -> list:
+    """
+    Returns the sitemap tree of a site, cached by site, locale and authentication state.
+    """
+    key = site_key(
+        site,
+        "sitemap",
+        get_language(),
+        "restricted" if show_restricted else "public",
+        get_generation(FRAGMENTS_CACHE, SITEMAP_NAMESPACE),
+    )
+
+    return cache_get_or_set(
+        FRAGMENTS_CACHE,
+        key,
+        lambda: build_sitemap_tree(site.root_page, request=request, show_restricted=show_restricted),
+        timeout=settings.SF_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_sitemap() -> None:
+    bump_generation(FRAGMENTS_CACHE, SITEMAP_NAMESPACE)
@@ -0,0 +1,119 @@
+"""
+Materialized usage counts of the tags (see the TagUsage model)
+
+The number of live pages using each tag is stored per page type and per site, and refreshed
+for the affected tags only when a page is published, unpublished, moved or deleted,
+or when its tags change (see content_manager/signals.py).
+"""
+
+from functools import cache
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count
+from taggit.models import TaggedItemBase
+from wagtail.models import Page, Site
+
+from content_manager.models import TagUsage
+
+
+def get_tagged_page_model(model) -> type[Page] | None:
+    # The content object is a generic foreign key on the default taggit model
+    related_model = model._meta.get_field("content_object").related_model
+    if isinstance(related_model, type) and issubclass(related_model, Page):
+        return related_model
+    return None
+
+
+@cache
+def get_tagged_item_models() -> tuple:
+    """
+    Returns the through models of the page tags, such as TagContentPage.
+    """
+    return tuple(
+        model
+        for model in apps.get_models()
+        if issubclass(model, TaggedItemBase) and get_tagged_page_model(model) is not None
+    )
+
+
+def count_tag_usages(tag_ids=None) -> dict:
+    """
+    Returns the number of live pages using each tag, as a dict {(tag id, content type id, site id): count},
+    for the given tags or for all of them.
+
+    One query per tagged page type and per site.
+    """
+    counts = {}
+    sites = list(Site.objects.select_related("root_page"))
+
+    for model in get_tagged_item_models():
+        content_type = ContentType.objects.get_for_model(get_tagged_page_model(model))
+        items = model.objects.filter(content_object__live=True)
+        if tag_ids is not None:
+            items = items.filter(tag_id__in=tag_ids)
+
+        for site in sites:
+            rows = (
+                items.filter(content_object__path__startswith=site.root_page.path)
+                .values("tag_id")
+                .annotate(count=Count("content_object", distinct=True))
+                .values_list("tag_id", "count")
+            )
+            for tag_id, count in rows:
+                key = (tag_id, content_type.pk, site.pk)
+                counts[key] = counts.get(key, 0) + count
+
+    return counts
+
+
+def save_tag_usages(counts: dict, tag_ids=None) -> None:
+    usages = TagUsage.objects.all()
+    if tag_ids is not None:
+        usages = usages.filter(tag_id__in=tag_ids)
+
+    with transaction.atomic():
+        usages.delete()
+        TagUsage.objects.bulk_create(
+            [
+                TagUsage(tag_id=tag_id, content_type_id=content_type_id, site_id=site_id, count=count)
+                for (tag_id, content_type_id, site_id), count in counts.items()
+            ]
+        )
+
+
+def refresh_tag_usages(tag_ids) -> None:
+    """
+    Recomputes the usage counts of the given tags.
+    """
+    tag_ids = set(tag_ids)
+    if tag_ids:
+        save_tag_usages(count_tag_usages(tag_ids), tag_ids)
+
+
+def rebuild_tag_usages() -> int:
+    """
+    Recomputes the usage counts of all the tags, and returns the number of rows.
+    """
+    counts = count_tag_usages()
+    save_tag_usages(counts)
+    return len(counts)
+
+
+def get_page_tag_ids(page: Page, descendants: bool = False) -> set:
+    """
+    Returns the ids of the tags of a page, and of its descendants if `descendants` is set.
+    """
+    tag_ids = set()
+    for model in get_tagged_item_models():
+        if descendants:
+            items = model.objects.filter(content_object__path__startswith=page.path)
+        elif isinstance(page.specific_deferred, get_tagged_page_model(model)):
+            items = model.objects.filter(content_object_id=page.pk)
+        else:
+            continue
+
+        tag_ids.update(items.values_list("tag_id", flat=True))
+
+    return tag_ids
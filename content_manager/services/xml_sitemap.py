@@ -0,0 +1,201 @@
+"""
+Sitemap for search engines (sitemap.xml), split into an index and a sitemap per page type and locale.
+
+- the entries of a section are computed with a single query, and cached until a page of
+  the same type and locale is saved, published or deleted
+- the rendered XML files are cached with their ETag and last modification date,
+  so that crawlers can use conditional requests
+"""
+
+import hashlib
+import math
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.http import HttpRequest
+from django.template.loader import render_to_string
+from django.urls import reverse
+from wagtail.models import Page
+
+from content_manager.cache import FRAGMENTS_CACHE, bump_generation, cache_get_or_set, get_generations, site_key
+
+XML_SITEMAP_NAMESPACE = "xml-sitemap"
+XML_SITEMAP_INDEX_NAMESPACE = "xml-sitemap-index"
+
+
+def section_namespace(content_type_id, locale_id) -> str:
+    return f"xml-sitemap-{content_type_id}-{locale_id}"
+
+
+def get_section_name(content_type: ContentType, language_code: str) -> str:
+    return f"{content_type.app_label}.{content_type.model}.{language_code}"
+
+
+def get_section_key(site, *parts) -> str:
+    return site_key(site, "xml-sitemap", *parts)
+
+
+def get_site_pages(site, model=Page):
+    """
+    Returns the live and public pages of a site, in all its locales (under the translations of its root page)
+    """
+    condition = Q()
+    for root_page in site.root_page.get_translations(inclusive=True):
+        condition |= model.objects.descendant_of_q(root_page, inclusive=True)
+
+    return model.objects.filter(condition).live().public()
+
+
+def build_sections(site) -> dict:
+    rows = (
+        get_site_pages(site)
+        .values_list("content_type_id", "locale_id", "locale__language_code")
+        .distinct()
+        .order_by("content_type_id", "locale__language_code")
+    )
+
+    sections = {}
+    for content_type_id, locale_id, language_code in rows:
+        content_type = ContentType.objects.get_for_id(content_type_id)
+        sections[get_section_name(content_type, language_code)] = (content_type_id, locale_id)
+
+    return sections
+
+
+def get_sections(site) -> dict:
+    """
+    Returns the sections of the sitemap of a site, by name: one per page type and locale.
+    """
+    generations = get_generations(FRAGMENTS_CACHE, [XML_SITEMAP_NAMESPACE, XML_SITEMAP_INDEX_NAMESPACE])
+    key = get_section_key(site, "sections", "-".join(map(str, generations)))
+
+    return cache_get_or_set(
+        FRAGMENTS_CACHE, key, lambda: build_sections(site), timeout=settings.SF_SITEMAP_CACHE_TIMEOUT
+    )
+
+
+def build_section_entries(site, content_type_id: int, locale_id: int, request: HttpRequest | None = None) -> list:
+    """
+    Returns the entries (location and lastmod) of a section, with a single query.
+    """
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    if model is None or not issubclass(model, Page):
+        return []
+
+    pages = (
+        get_site_pages(site, model)
+        .filter(content_type_id=content_type_id, locale_id=locale_id)
+        .defer_streamfields()
+        .order_by("path")
+    )
+    if any(field.name == "exclude_from_sitemap" for field in model._meta.concrete_fields):
+        pages = pages.filter(exclude_from_sitemap=False)
+
+    return [
+        {
+            "location": page.get_full_url(request),
+            "lastmod": page.last_published_at or page.latest_revision_created_at,
+        }
+        for page in pages
+    ]
+
+
+def get_section_entries(site, content_type_id: int, locale_id: int, request: HttpRequest | None = None) -> list:
+    generations = get_generations(
+        FRAGMENTS_CACHE, [XML_SITEMAP_NAMESPACE, section_namespace(content_type_id, locale_id)]
+    )
+    key = get_section_key(site, "entries", content_type_id, locale_id, "-".join(map(str, generations)))
+
+    return cache_get_or_set(
+        FRAGMENTS_CACHE,
+        key,
+        lambda: build_section_entries(site, content_type_id, locale_id, request=request),
+        timeout=settings.SF_SITEMAP_CACHE_TIMEOUT,
+    )
+
+
+def get_latest_lastmod(entries: list):
+    lastmods = [entry["lastmod"] for entry in entries if entry["lastmod"]]
+    return max(lastmods, default=None)
+
+
+def render_xml(template_name: str, context: dict, last_modified) -> dict:
+    content = render_to_string(template_name, context)
+
+    return {
+        "content": content,
+        "etag": hashlib.sha1(content.encode(), usedforsecurity=False).hexdigest(),
+        # Whole seconds, as compared with the If-Modified-Since header
+        "last_modified": int(last_modified.timestamp()) if last_modified else None,
+    }
+
+
+def get_sitemap_index(site, request: HttpRequest) -> dict:
+    """
+    Returns the rendered sitemap index of a site, with its ETag and last modification timestamp.
+    """
+    generations = get_generations(FRAGMENTS_CACHE, [XML_SITEMAP_NAMESPACE, XML_SITEMAP_INDEX_NAMESPACE])
+    key = get_section_key(site, "index", "-".join(map(str, generations)))
+
+    def build():
+        items = []
+        for section, (content_type_id, locale_id) in get_sections(site).items():
+            entries = get_section_entries(site, content_type_id, locale_id, request=request)
+            if not entries:
+                continue
+
+            location = request.build_absolute_uri(reverse("xml_sitemap_section", kwargs={"section": section}))
+            last_mod = get_latest_lastmod(entries)
+            for page_number in range(1, math.ceil(len(entries) / settings.SF_SITEMAP_LIMIT) + 1):
+                items.append(
+                    {
+                        "location": location if page_number == 1 else f"{location}?p={page_number}",
+                        "last_mod": last_mod,
+                    }
+                )
+
+        last_modified = max((item["last_mod"] for item in items if item["last_mod"]), default=None)
+        return render_xml("sitemap_index.xml", {"sitemaps": items}, last_modified)
+
+    return cache_get_or_set(FRAGMENTS_CACHE, key, build, timeout=settings.SF_SITEMAP_CACHE_TIMEOUT)
+
+
+def get_sitemap_section(site, request: HttpRequest, section: str, page_number: int) -> dict | None:
+    """
+    Returns a rendered page of a section, with its ETag and last modification timestamp,
+    or None if the section or the page does not exist.
+    """
+    sections = get_sections(site)
+    if section not in sections:
+        return None
+
+    content_type_id, locale_id = sections[section]
+    entries = get_section_entries(site, content_type_id, locale_id, request=request)
+    limit = settings.SF_SITEMAP_LIMIT
+    # Checked before building the key, so that the pages out of range are not cached
+    if not 1 <= page_number <= math.ceil(len(entries) / limit):
+        return None
+
+    generations = get_generations(
+        FRAGMENTS_CACHE, [XML_SITEMAP_NAMESPACE, section_namespace(content_type_id, locale_id)]
+    )
+    key = get_section_key(site, "section", section, page_number, "-".join(map(str, generations)))
+
+    def build():
+        urlset = entries[(page_number - 1) * limit : page_number * limit]
+        return render_xml("sitemap.xml", {"urlset": urlset}, get_latest_lastmod(urlset))
+
+    return cache_get_or_set(FRAGMENTS_CACHE, key, build, timeout=settings.SF_SITEMAP_CACHE_TIMEOUT)
+
+
+def invalidate_page_section(page: Page) -> None:
+    """
+    Invalidates the section of a page, and the sitemap index.
+    """
+    bump_generation(FRAGMENTS_CACHE, section_namespace(page.content_type_id, page.locale_id))
+    bump_generation(FRAGMENTS_CACHE, XML_SITEMAP_INDEX_NAMESPACE)
+
+
+def invalidate_xml_sitemap() -> None:
+    bump_generation(FRAGMENTS_CACHE, XML_SITEMAP_NAMESPACE)
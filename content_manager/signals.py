@@ -0,0 +1,195 @@
+"""
+Cache invalidation, tag usage counts, search indexing and renditions queue updates on content changes.
+
+Connected in ContentManagerConfig.ready()
+"""
+
+from functools import cache
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from taggit.models import TaggedItemBase
+from wagtail.contrib.settings.models import BaseSiteSetting
+from wagtail.contrib.settings.registry import registry as settings_registry
+from wagtail.documents import get_document_model
+from wagtail.images import get_image_model
+from wagtail.models import Locale, Page, PageViewRestriction, ReferenceIndex, Site
+from wagtail.search.index import class_is_indexed
+from wagtail.signals import page_published, page_unpublished, post_page_move
+from wagtail.snippets.models import get_snippet_models
+
+from content_manager.block_cache import invalidate_all_blocks
+from content_manager.models import SearchIndexQueueEntry
+from content_manager.page_cache import invalidate_all_pages, invalidate_page, invalidate_site
+from content_manager.services.recent_entries import invalidate_all_recent_entries, invalidate_index_recent_entries
+from content_manager.services.renditions_warmer import queue_page_renditions
+from content_manager.services.search_queue import queue_for_indexing
+from content_manager.services.sitemap import invalidate_sitemap
+from content_manager.services.tag_usage import get_page_tag_ids, rebuild_tag_usages, refresh_tag_usages
+from content_manager.services.xml_sitemap import invalidate_page_section, invalidate_xml_sitemap
+
+
+@cache
+def get_site_wide_models() -> tuple:
+    """
+    Models displayed on many pages: any change invalidates all the cached pages.
+    """
+    return tuple(
+        get_snippet_models()
+        + list(settings_registry)
+        + [Site, Locale, PageViewRestriction, get_image_model(), get_document_model()]
+    )
+
+
+def is_referenced_by_snippets(page: Page) -> bool:
+    """
+    Checks if a page is used in a snippet, such as a menu.
+    """
+    content_types = ContentType.objects.get_for_models(*get_snippet_models()).values()
+
+    return ReferenceIndex.get_references_to(page).filter(base_content_type__in=content_types).exists()
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def invalidate_changed_page(sender, instance, **kwargs):
+    invalidate_page(instance)
+
+    if settings.SF_PAGE_CACHE and is_referenced_by_snippets(instance):
+        invalidate_all_pages()
+
+    # The blocks of the page itself are cached by revision, but other pages can link to it
+    if settings.SF_BLOCK_CACHE and ReferenceIndex.get_references_to(instance).exists():
+        invalidate_all_blocks()
+
+
+@receiver(post_page_move)
+def invalidate_moved_page(sender, instance, **kwargs):
+    # The URLs of the page and its descendants changed, and can be used anywhere
+    invalidate_all_pages()
+    invalidate_all_blocks()
+    invalidate_all_recent_entries()
+
+
+@receiver(post_delete)
+def invalidate_deleted_object(sender, instance, **kwargs):
+    if isinstance(instance, Page):
+        invalidate_page(instance)
+        invalidate_all_blocks()
+    else:
+        invalidate_site_wide_object(sender, instance)
+
+
+@receiver(post_save)
+def invalidate_saved_object(sender, instance, created=False, **kwargs):
+    # Site settings are created with their default values on the first page rendering
+    if created and isinstance(instance, BaseSiteSetting):
+        return
+
+    invalidate_site_wide_object(sender, instance)
+
+
+def invalidate_site_wide_object(sender, instance):
+    if not issubclass(sender, get_site_wide_models()):
+        return
+
+    invalidate_all_blocks()
+    if isinstance(instance, BaseSiteSetting):
+        invalidate_site(instance.site_id)
+    else:
+        invalidate_all_pages()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_recent_entries(sender, instance, **kwargs):
+    if isinstance(instance, Page):
+        # Saved on publication and unpublication: the entries of its index pages are invalidated
+        invalidate_index_recent_entries(Page.objects.ancestor_of(instance).values_list("pk", flat=True))
+    elif issubclass(sender, get_site_wide_models()):
+        # The categories and the cover images are displayed by the cards
+        invalidate_all_recent_entries()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(post_page_move)
+def invalidate_sitemap_tree(sender, instance, **kwargs):
+    if isinstance(instance, (Page, PageViewRestriction, Site)):
+        invalidate_sitemap()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_xml_sitemap_section(sender, instance, **kwargs):
+    if isinstance(instance, Page):
+        invalidate_page_section(instance)
+    elif isinstance(instance, (PageViewRestriction, Site, Locale)):
+        invalidate_xml_sitemap()
+
+
+@receiver(post_page_move)
+def invalidate_moved_page_sitemaps(sender, instance, **kwargs):
+    invalidate_xml_sitemap()
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def refresh_page_tag_usages(sender, instance, **kwargs):
+    refresh_tag_usages(get_page_tag_ids(instance))
+
+
+@receiver(post_page_move)
+def refresh_moved_page_tag_usages(sender, instance, **kwargs):
+    # The page and its descendants may have moved to another site
+    refresh_tag_usages(get_page_tag_ids(instance, descendants=True))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def refresh_object_tag_usages(sender, instance, **kwargs):
+    if isinstance(instance, TaggedItemBase):
+        # Tags added or removed on publication, or deleted with their page
+        refresh_tag_usages([instance.tag_id])
+    elif isinstance(instance, Site):
+        rebuild_tag_usages()
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def queue_changed_page_for_indexing(sender, instance, **kwargs):
+    if settings.SF_SEARCH_QUEUE:
+        queue_for_indexing([instance])
+
+
+@receiver(post_page_move)
+def queue_moved_pages_for_indexing(sender, instance, **kwargs):
+    # The paths of the page and its descendants are used to filter the search results
+    if settings.SF_SEARCH_QUEUE:
+        queue_for_indexing(instance.get_descendants(inclusive=True))
+
+
+@receiver(post_save)
+def queue_saved_object_for_indexing(sender, instance, created=False, raw=False, **kwargs):
+    if not settings.SF_SEARCH_QUEUE or raw or not class_is_indexed(sender):
+        return
+
+    # The existing pages are indexed on publication and unpublication
+    if created or not isinstance(instance, Page):
+        queue_for_indexing([instance])
+
+
+@receiver(post_delete)
+def queue_deleted_object_for_indexing(sender, instance, **kwargs):
+    if settings.SF_SEARCH_QUEUE and class_is_indexed(sender):
+        queue_for_indexing([instance], action=SearchIndexQueueEntry.ACTION_DELETE)
+
+
+@receiver(page_published)
+def queue_published_page_renditions(sender, instance, **kwargs):
+    if settings.SF_RENDITIONS_QUEUE:
+        # Once the publication is committed, so that a failure cannot roll it back
+        transaction.on_commit(lambda: queue_page_renditions(instance))
@@ -0,0 +1,202 @@
+"""
+Iterative walk of the raw data of the StreamFields.
+
+The blocks are visited from their JSON data and their definitions, without converting them
+to Python values (and so without the database queries of the choosers) nor rendering them.
+An explicit stack is used instead of recursion, so that deeply nested blocks are supported.
+
+The raw data can also be transformed in a single walk by visitors (see transform_raw_data), for instance
+to strip the block ids, to collect the references of the chooser blocks or to remap their ids.
+"""
+
+import copy
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from wagtail import blocks
+from wagtail.contrib.typed_table_block.blocks import TypedTableBlock
+from wagtail.documents import get_document_model
+from wagtail.images import get_image_model
+from wagtail.images.blocks import ImageBlock
+from wagtail.models import Page
+
+
+@dataclass
+class RawBlock:
+    """
+    A block found in the raw data of a StreamField:
+
+    - `name` is the block type in a StreamBlock, or the field name in a StructBlock
+    - `block` is the block definition
+    - `value` is the raw (JSON) value
+    - `path` is the list of the names of the ancestors, including the block itself
+    - `container` and `key` locate the value in the raw data: container[key] is the value
+    - `item` is the stream or list item wrapping the value ({"type": …, "value": …, "id": …}), if any
+    """
+
+    name: str
+    block: blocks.Block
+    value: Any
+    path: tuple
+    container: Any = None
+    key: Any = None
+    item: dict | None = None
+
+    def set_value(self, value) -> None:
+        """
+        Replaces the value of the block in the raw data
+        """
+        self.container[self.key] = value
+        self.value = value
+
+
+def is_list_item(item) -> bool:
+    # The list items are stored as {"type": "item", "value": …, "id": …} since Wagtail 2.16
+    return isinstance(item, dict) and item.get("type") == "item" and "value" in item
+
+
+def get_list_items(value: list) -> list:
+    return [item["value"] if is_list_item(item) else item for item in value]
+
+
+def get_raw_children(raw_block: RawBlock) -> list[RawBlock]:
+    """
+    Returns the children of a block, in the order of the content.
+    """
+    block = raw_block.block
+    value = raw_block.value
+    path = raw_block.path
+    children = []
+
+    if isinstance(block, blocks.StreamBlock) and isinstance(value, list):
+        for item in value:
+            if not isinstance(item, dict):
+                continue
+            child_block = block.child_blocks.get(item.get("type"))
+            if child_block is not None:
+                children.append(
+                    RawBlock(item["type"], child_block, item.get("value"), path + (item["type"],), item, "value", item)
+                )
+
+    elif isinstance(block, blocks.StructBlock) and isinstance(value, dict):
+        for name, child_block in block.child_blocks.items():
+            if name in value:
+                children.append(RawBlock(name, child_block, value[name], path + (name,), value, name))
+
+    elif isinstance(block, blocks.ListBlock) and isinstance(value, list):
+        for index, item in enumerate(value):
+            if is_list_item(item):
+                children.append(RawBlock(raw_block.name, block.child_block, item["value"], path, item, "value", item))
+            else:
+                children.append(RawBlock(raw_block.name, block.child_block, item, path, value, index))
+
+    elif isinstance(block, TypedTableBlock) and isinstance(value, dict):
+        columns = value.get("columns", [])
+        for row in value.get("rows", []):
+            cells = row.get("values", [])
+            for index, (column, cell) in enumerate(zip(columns, cells)):
+                child_block = block.child_blocks.get(column.get("type"))
+                if child_block is not None:
+                    children.append(
+                        RawBlock(column["type"], child_block, cell, path + (column["type"],), cells, index)
+                    )
+
+    return children
+
+
+def walk_raw_blocks(
+    stream_block: blocks.StreamBlock, raw_data, skip: Callable[[RawBlock], bool] | None = None
+) -> Iterator[RawBlock]:
+    """
+    Yields all the blocks of the raw data of a StreamField, depth first and in the order of the content.
+
+    The blocks for which `skip` returns True are left out with all their descendants.
+    As this is a generator, the walk stops as soon as the caller stops iterating.
+    """
+    stack = [RawBlock("", stream_block, list(raw_data), ())]
+
+    while stack:
+        raw_block = stack.pop()
+        if raw_block.path:
+            if skip is not None and skip(raw_block):
+                continue
+            yield raw_block
+
+        stack.extend(reversed(get_raw_children(raw_block)))
+
+
+def walk_streamfield(streamfield, skip: Callable[[RawBlock], bool] | None = None) -> Iterator[RawBlock]:
+    """
+    Yields all the blocks of a StreamField value (see walk_raw_blocks)
+    """
+    return walk_raw_blocks(streamfield.stream_block, streamfield.raw_data, skip=skip)
+
+
+def transform_raw_data(stream_block: blocks.StreamBlock, raw_data, visitors: list[Callable[[RawBlock], None]]) -> list:
+    """
+    Returns a copy of the raw data of a StreamField, transformed by visitors in a single walk.
+
+    Each visitor is called with each block, parents first. A visitor can replace the value of a block
+    with RawBlock.set_value: the children of the new value are visited next.
+    """
+    data = copy.deepcopy(list(raw_data))
+    for raw_block in walk_raw_blocks(stream_block, data):
+        for visitor in visitors:
+            visitor(raw_block)
+    return data
+
+
+def get_reference_kind(raw_block: RawBlock) -> str | None:
+    """
+    Returns the kind of object referenced by a chooser block: "image", "document", "page" or "snippet"
+    """
+    block = raw_block.block
+    if isinstance(block, ImageBlock) and not isinstance(raw_block.value, dict):
+        # Image stored before the block had its alt text fields
+        return "image"
+    if not isinstance(block, blocks.ChooserBlock):
+        return None
+
+    model = block.model_class
+    if issubclass(model, get_image_model()):
+        return "image"
+    if issubclass(model, get_document_model()):
+        return "document"
+    if issubclass(model, Page):
+        return "page"
+    return "snippet"
+
+
+def strip_block_ids(raw_block: RawBlock) -> None:
+    """
+    Visitor removing the ids of the stream and list items
+    """
+    if raw_block.item is not None:
+        raw_block.item.pop("id", None)
+
+
+def collect_references(references: dict) -> Callable[[RawBlock], None]:
+    """
+    Returns a visitor adding the ids referenced by the chooser blocks to `references`, a dict {kind: list of ids}
+    """
+
+    def visitor(raw_block: RawBlock) -> None:
+        kind = get_reference_kind(raw_block)
+        if kind and raw_block.value not in (None, ""):
+            references.setdefault(kind, []).append(raw_block.value)
+
+    return visitor
+
+
+def remap_references(mapping: dict, kind: str = "image") -> Callable[[RawBlock], None]:
+    """
+    Returns a visitor replacing the ids referenced by the chooser blocks of a kind,
+    with `mapping` as a dict {str(former id): new id}. The ids missing from the mapping are kept.
+    """
+
+    def visitor(raw_block: RawBlock) -> None:
+        if get_reference_kind(raw_block) == kind and str(raw_block.value) in mapping:
+            raw_block.set_value(mapping[str(raw_block.value)])
+
+    return visitor
@@ -6,7 +6,10 @@ from django.utils.html import mark_safe
 from wagtail.models import Site
 from wagtail.rich_text import RichText
 
+from content_manager.block_cache import render_cached_block
 from content_manager.models import MegaMenu
+from content_manager.pagination import CURSOR_PARAM
+from content_manager.renditions import get_all_responsive_filter_specs, render_responsive_image
 
 register = template.Library()
 
@@ -26,6 +29,20 @@ def settings_value(name):
     return getattr(settings, name, "")
 
 
+@register.simple_tag
+def responsive_image(image, sizes=None, **attrs):
+    """
+    Renders an image as a <picture> with a srcset of widths and formats, see content_manager/renditions.py
+
+    Usage: {% responsive_image value.image sizes="(min-width: 62em) 50vw, 100vw" class="fr-responsive-img" %}
+    """
+    return mark_safe(render_responsive_image(image, sizes, attrs))
+
+
+# The renditions of the tag are prefetched with those of the image tags
+responsive_image.rendition_filters = get_all_responsive_filter_specs
+
+
 @register.simple_tag
 def root_url() -> str:
     """Return the site's base path, taking FORCE_SCRIPT_NAME into account."""
@@ -123,6 +140,52 @@ def toggle_url_filter(context, *_, **kwargs):
         return ""
 
 
+@register.simple_tag(takes_context=True)
+def cursor_url(context, cursor: str | None = None) -> str:
+    """
+    Returns the query string for a page of a keyset pagination (see content_manager/pagination.py),
+    keeping the other GET parameters.
+    """
+    url_params = context["request"].GET.copy()
+    url_params.pop("page", None)
+    url_params.pop(CURSOR_PARAM, None)
+
+    if cursor:
+        url_params[CURSOR_PARAM] = cursor
+
+    url_string = url_params.urlencode()
+    return f"?{url_string}" if url_string else "?"
+
+
+class BlockCacheNode(template.Node):
+    def __init__(self, nodelist, block, stream):
+        self.nodelist = nodelist
+        self.block = block
+        self.stream = stream
+
+    def render(self, context):
+        block = self.block.resolve(context)
+        stream = self.stream.resolve(context)
+        html = render_cached_block(context, stream, block, lambda: self.nodelist.render(context))
+        return mark_safe(html)
+
+
+@register.tag
+def blockcache(parser, token):
+    """
+    Caches the rendering of a top-level block of the current page (see content_manager/block_cache.py)
+
+    Usage: {% blockcache block stream %}…{% endblockcache %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes two arguments: the block and its stream")
+
+    nodelist = parser.parse(("endblockcache",))
+    parser.delete_first_token()
+    return BlockCacheNode(nodelist, parser.compile_filter(bits[1]), parser.compile_filter(bits[2]))
+
+
 @register.filter
 def table_has_heading_row(value):
     non_empty_heading = False
@@ -37,3 +37,25 @@ class APITestCase(WagtailPageTestCase):
         response = self.client.get(url)
 
         self.assertEqual({"message": "No Page matches the given query."}, response.json())
+
+    def test_pages_listing_accepts_a_list_of_ids(self):
+        home_page = Page.objects.get(slug="home")
+        other_page = home_page.add_child(instance=ContentPage(title="Other page", slug="other-page", owner=self.admin))
+        home_page.add_child(instance=ContentPage(title="Third page", slug="third-page", owner=self.admin))
+
+        url = reverse("wagtailapi:pages:listing")
+        response = self.client.get(
+            url,
+            {"type": "content_manager.ContentPage", "fields": "body", "id": f"{self.content_page.id},{other_page.id}"},
+        )
+
+        data = response.json()
+        self.assertEqual(data["meta"]["total_count"], 2)
+        self.assertEqual({item["id"] for item in data["items"]}, {self.content_page.id, other_page.id})
+        self.assertEqual(self.lorem_raw, data["items"][0]["body"][0]["value"])
+
+    def test_pages_listing_rejects_an_invalid_list_of_ids(self):
+        url = reverse("wagtailapi:pages:listing")
+        response = self.client.get(url, {"id": "1,a"})
+
+        self.assertEqual(response.status_code, 400)
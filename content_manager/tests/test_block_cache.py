@@ -0,0 +1,96 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from wagtail.models import Page
+from wagtail.test.utils import WagtailPageTestCase
+
+from content_manager.block_cache import get_cacheable_block_ids
+from content_manager.cache import BLOCKS_STATS_GROUP, CACHE_ALIASES, FRAGMENTS_CACHE, get_cache, get_stats
+from content_manager.models import ContentPage
+
+User = get_user_model()
+
+
+@override_settings(SF_BLOCK_CACHE=True, SF_PAGE_CACHE=False, SF_CACHE_STATS=True)
+class BlockCacheTestCase(WagtailPageTestCase):
+    def setUp(self):
+        for alias in CACHE_ALIASES:
+            get_cache(alias).clear()
+
+        self.home_page = Page.objects.get(slug="home")
+        self.admin = User.objects.create_superuser("test", "test@test.test", "pass")
+        self.client.force_login(self.admin)
+
+        self.target_page = self.home_page.add_child(instance=ContentPage(title="Page cible", slug="cible"))
+        self.target_page.save_revision().publish()
+
+        self.content_page = self.home_page.add_child(
+            instance=ContentPage(
+                title="Page avec des blocs",
+                slug="blocs",
+                body=[
+                    {"type": "link", "value": {"link_type": "page", "page": self.target_page.pk}},
+                    {"type": "subpageslist", "value": None},
+                ],
+            )
+        )
+        self.content_page.save_revision().publish()
+
+    def rename_without_signals(self, page, title):
+        Page.objects.filter(pk=page.pk).update(title=title)
+
+    def test_blocks_are_served_from_the_cache(self):
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Page cible")
+
+        self.rename_without_signals(self.target_page, "Titre modifié")
+
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Page cible")
+        self.assertEqual(get_stats(FRAGMENTS_CACHE, BLOCKS_STATS_GROUP)["hits"], 1)
+
+    def test_dynamic_blocks_are_not_cached(self):
+        self.client.get(self.content_page.url)
+
+        self.content_page.add_child(instance=ContentPage(title="Sous-page", slug="sous-page"))
+
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Sous-page")
+        self.assertEqual(len(get_cacheable_block_ids(ContentPage.objects.get(pk=self.content_page.pk).body)), 1)
+
+    def test_new_revision_changes_the_keys(self):
+        self.client.get(self.content_page.url)
+
+        self.content_page.body = [{"type": "paragraph", "value": '<p data-block-key="a1">Nouveau contenu</p>'}]
+        self.content_page.save_revision().publish()
+
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Nouveau contenu")
+        self.assertNotContains(response, "Page cible")
+
+    def test_publishing_a_linked_page_invalidates_the_blocks(self):
+        self.client.get(self.content_page.url)
+
+        self.target_page.title = "Titre publié"
+        self.target_page.save_revision().publish()
+
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Titre publié")
+
+    @override_settings(SF_BLOCK_CACHE=False)
+    def test_cache_can_be_disabled(self):
+        self.client.get(self.content_page.url)
+        self.rename_without_signals(self.target_page, "Titre modifié")
+
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Titre modifié")
+
+    def test_cache_stats_command_reports_the_blocks(self):
+        self.client.get(self.content_page.url)
+        self.client.get(self.content_page.url)
+
+        out = StringIO()
+        call_command("cache_stats", stdout=out)
+        self.assertIn("fragments/blocks: 1 hits, 1 misses, hit ratio 50.0%", out.getvalue())
@@ -0,0 +1,100 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from config.cache import caches_from_env, parse_cache_url
+from content_manager.cache import (
+    CACHE_ALIASES,
+    PAGES_CACHE,
+    bump_generation,
+    cache_get,
+    cache_get_or_set,
+    cache_set,
+    get_generation,
+    get_stats,
+    reset_stats,
+    site_key,
+)
+
+
+class CacheUrlTestCase(TestCase):
+    def test_locmem_is_the_default(self):
+        caches = caches_from_env({})
+
+        self.assertEqual(set(caches.keys()), set(CACHE_ALIASES))
+        self.assertEqual(caches["default"]["BACKEND"], "django.core.cache.backends.locmem.LocMemCache")
+        self.assertNotEqual(caches["default"]["LOCATION"], caches["pages"]["LOCATION"])
+
+    def test_alias_url_overrides_the_global_one(self):
+        caches = caches_from_env(
+            {"SF_CACHE_URL": "redis://cache:6379/0", "SF_CACHE_URL_RENDITIONS": "db://renditions_cache"}
+        )
+
+        self.assertEqual(caches["pages"]["BACKEND"], "django.core.cache.backends.redis.RedisCache")
+        self.assertEqual(caches["pages"]["LOCATION"], "redis://cache:6379/0")
+        self.assertEqual(caches["pages"]["KEY_PREFIX"], "sf:pages")
+        self.assertEqual(caches["renditions"]["BACKEND"], "django.core.cache.backends.db.DatabaseCache")
+        self.assertEqual(caches["renditions"]["LOCATION"], "renditions_cache")
+
+    def test_file_cache_uses_a_folder_per_alias(self):
+        config = parse_cache_url("file:///var/tmp/django_cache/", alias="fragments")
+
+        self.assertEqual(config["LOCATION"], "/var/tmp/django_cache/fragments")
+
+    def test_valkey_scheme_is_redis_compatible(self):
+        config = parse_cache_url("valkey://cache:6379/1")
+
+        self.assertEqual(config["LOCATION"], "redis://cache:6379/1")
+
+    def test_unknown_scheme_raises_an_error(self):
+        with self.assertRaises(ValueError):
+            parse_cache_url("memcached://localhost:11211")
+
+
+@override_settings(SF_CACHE_STATS=True)
+class CacheHelpersTestCase(TestCase):
+    def setUp(self):
+        reset_stats(PAGES_CACHE)
+
+    def test_site_key_is_prefixed_by_the_site(self):
+        self.assertEqual(site_key(3, "menu", "fr"), "site:3:menu:fr")
+
+    def test_hits_and_misses_are_counted(self):
+        key = site_key(1, "test-hits")
+        cache_get(PAGES_CACHE, key)
+        cache_set(PAGES_CACHE, key, "value")
+        self.assertEqual(cache_get(PAGES_CACHE, key), "value")
+
+        stats = get_stats(PAGES_CACHE)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["ratio"], 0.5)
+
+    def test_get_or_set_only_computes_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "computed"
+
+        key = site_key(1, "test-get-or-set")
+        self.assertEqual(cache_get_or_set(PAGES_CACHE, key, compute), "computed")
+        self.assertEqual(cache_get_or_set(PAGES_CACHE, key, compute), "computed")
+        self.assertEqual(len(calls), 1)
+
+    def test_bump_generation_changes_the_namespace_keys(self):
+        generation = get_generation(PAGES_CACHE, "test-namespace")
+        self.assertEqual(get_generation(PAGES_CACHE, "test-namespace"), generation)
+
+        bump_generation(PAGES_CACHE, "test-namespace")
+        self.assertNotEqual(get_generation(PAGES_CACHE, "test-namespace"), generation)
+
+    def test_cache_stats_command(self):
+        cache_get(PAGES_CACHE, site_key(1, "test-command"))
+
+        out = StringIO()
+        call_command("cache_stats", "--reset", stdout=out)
+
+        self.assertIn("pages: 0 hits, 1 misses", out.getvalue())
+        self.assertEqual(get_stats(PAGES_CACHE)["misses"], 0)
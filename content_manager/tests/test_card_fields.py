@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from wagtail.models import Page
+from wagtail.test.utils import WagtailPageTestCase
+
+from blog.models import BlogEntryPage, BlogIndexPage, Category
+from content_manager.models import CatalogIndexPage, ContentPage
+from content_manager.utils import import_image
+
+
+class CardFieldsTestCase(WagtailPageTestCase):
+    def setUp(self):
+        self.home_page = Page.objects.get(slug="home")
+        self.image = import_image("static/artwork/technical-error.svg", "Couverture")
+        self.hero = [
+            {
+                "type": "hero_text_image",
+                "value": {"image": {"image": self.image.pk, "alt_text": "", "decorative": True}},
+            }
+        ]
+
+        self.catalog = self.home_page.add_child(instance=CatalogIndexPage(title="Catalogue", slug="catalogue"))
+        self.entry = self.catalog.add_child(
+            instance=ContentPage(
+                title="Fiche",
+                slug="fiche",
+                hero=self.hero,
+                body=[{"type": "paragraph", "value": "<p>" + " ".join(f"mot{i}" for i in range(30)) + "</p>"}],
+            )
+        )
+        self.entry.save_revision().publish()
+
+    def test_card_fields_are_computed_on_save(self):
+        entry = ContentPage.objects.get(pk=self.entry.pk)
+
+        self.assertEqual(entry.card_image, self.image)
+        self.assertEqual(entry.card_excerpt, " ".join(f"mot{i}" for i in range(20)) + " …")
+
+    def test_card_category_is_the_first_category(self):
+        blog_index = self.home_page.add_child(instance=BlogIndexPage(title="Actualités", slug="actualites"))
+        category = Category.objects.create(name="Innovation", slug="innovation")
+        post = blog_index.add_child(instance=BlogEntryPage(title="Article", slug="article"))
+        post.blog_categories.add(category)
+        post.save_revision().publish()
+
+        self.assertEqual(BlogEntryPage.objects.get(pk=post.pk).card_category, category)
+
+    def test_listing_does_not_load_the_streamfields(self):
+        with CaptureQueriesContext(connection) as queries:
+            entries = list(self.catalog.entries)
+
+        self.assertEqual(entries[0].card_image, self.image)
+        self.assertNotIn('"body"', queries[0]["sql"])
+        self.assertNotIn('"hero"', queries[0]["sql"])
+
+    def test_listing_shows_the_card_fields(self):
+        response = self.client.get(self.catalog.url)
+
+        self.assertContains(response, self.image.get_rendition("width-1200").url)
+        self.assertContains(response, "mot19 …")
+
+    def test_command_updates_the_card_fields(self):
+        ContentPage.objects.filter(pk=self.entry.pk).update(card_image=None, card_excerpt="")
+
+        out = StringIO()
+        call_command("update_card_fields", stdout=out)
+
+        entry = ContentPage.objects.get(pk=self.entry.pk)
+        self.assertEqual(entry.card_image, self.image)
+        self.assertTrue(entry.card_excerpt.startswith("mot0"))
+        self.assertIn("pages updated.", out.getvalue())
@@ -0,0 +1,99 @@
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from wagtail.documents import get_document_model
+from wagtail.models import Page
+from wagtail.test.utils import WagtailPageTestCase
+
+from content_manager.choosers import prime_chooser_values
+from content_manager.models import ContentPage
+from content_manager.utils import import_image
+
+
+class ChooserValuesTestCase(WagtailPageTestCase):
+    def setUp(self):
+        self.home_page = Page.objects.get(slug="home")
+        self.targets = [
+            self.home_page.add_child(instance=ContentPage(title=f"Cible {i}", slug=f"cible-{i}")) for i in range(8)
+        ]
+        self.document = get_document_model().objects.create(
+            title="Rapport annuel", file=ContentFile(b"rapport", name="rapport.txt")
+        )
+
+    def page_link(self, index):
+        return {"link_type": "page", "page": self.targets[index].pk}
+
+    def create_page(self, slug, body):
+        return self.home_page.add_child(instance=ContentPage(title=slug, slug=slug, body=body))
+
+    def count_queries(self, page):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(page.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_number_of_queries_does_not_depend_on_the_blocks(self):
+        single_link_page = self.create_page("lien", [{"type": "link", "value": self.page_link(0)}])
+        # Wagtail converts the values of each block type separately
+        many_links_page = self.create_page(
+            "liens",
+            [
+                {"type": "link", "value": self.page_link(0)},
+                {"type": "buttons_list", "value": {"buttons": [{"type": "button", "value": self.page_link(1)}]}},
+                {
+                    "type": "text_cta",
+                    "value": {
+                        "cta_buttons": [{"type": "buttons", "value": [{"type": "button", "value": self.page_link(2)}]}]
+                    },
+                },
+                {"type": "card", "value": {"title": "Carte", "link": self.page_link(3)}},
+                {"type": "tile", "value": {"title": "Tuile", "link": self.page_link(4)}},
+            ],
+        )
+        # Warms up the caches (sites, settings…)
+        self.client.get(single_link_page.url)
+
+        self.assertEqual(self.count_queries(single_link_page), self.count_queries(many_links_page))
+
+    def test_values_are_resolved(self):
+        body = [
+            {"type": "buttons_list", "value": {"buttons": [{"type": "button", "value": self.page_link(i)}]}}
+            for i in range(3)
+        ]
+        body.append({"type": "card", "value": {"title": "Carte", "link": {"document": self.document.pk}}})
+        page = ContentPage.objects.get(pk=self.create_page("liens", body).pk)
+        prime_chooser_values(page)
+
+        buttons = [block.value["buttons"][0].value for block in page.body[:3]]
+        self.assertEqual([button.label() for button in buttons], ["Cible 0", "Cible 1", "Cible 2"])
+        self.assertEqual(buttons[1].url(), self.targets[1].url)
+        self.assertEqual(page.body[3].value["link"]["document"], self.document)
+
+    def test_images_are_not_shared(self):
+        image = import_image("static/artwork/technical-error.svg", "Erreur")
+        body = [
+            {
+                "type": "card",
+                "value": {"title": "Carte", "image": {"image": image.pk, "alt_text": alt_text, "decorative": False}},
+            }
+            for alt_text in ["Premier", "Second"]
+        ]
+        page = self.home_page.add_child(instance=ContentPage(title="Images", slug="images", body=body))
+        page = ContentPage.objects.get(pk=page.pk)
+
+        # The images, and the renditions requested by the template of the cards
+        with self.assertNumQueries(2):
+            prime_chooser_values(page)
+
+        self.assertEqual([block.value["image"].contextual_alt_text for block in page.body], ["Premier", "Second"])
+
+    @override_settings(SF_BLOCK_CACHE=True)
+    def test_cached_streamfields_are_not_primed(self):
+        body = [{"type": "link", "value": self.page_link(0)}]
+        page = ContentPage.objects.get(pk=self.create_page("lien", body).pk)
+
+        with self.assertNumQueries(0):
+            prime_chooser_values(page)
+
+        self.assertTrue(page.body.is_lazy)
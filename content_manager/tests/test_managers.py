@@ -1,8 +1,11 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
-from wagtail.models import Page
+from django.core.management import call_command
+from wagtail.models import Page, Site
 from wagtail.test.utils import WagtailPageTestCase
 
-from content_manager.models import ContentPage, Tag, TagContentPage
+from content_manager.models import ContentPage, Tag, TagContentPage, TagUsage
 
 User = get_user_model()
 
@@ -63,3 +66,33 @@ class TagManagerTests(WagtailPageTestCase):
 
         tag = Tag.objects.tags_with_usecount().get(pk=self.tag.pk)
         assert tag.usecount == 2
+
+    def test_usecount_follows_publication(self):
+        self.content_page_draft.save_revision().publish()
+        assert Tag.objects.tags_with_usecount().get(pk=self.tag.pk).usecount == 2
+
+        self.content_page_live.unpublish()
+        assert Tag.objects.tags_with_usecount().get(pk=self.tag.pk).usecount == 1
+
+        self.content_page_draft.delete()
+        assert Tag.objects.tags_with_usecount().get(pk=self.tag.pk).usecount == 0
+
+    def test_usecount_by_site(self):
+        other_root = Page.objects.get(depth=1).add_child(instance=ContentPage(title="Other site", slug="other-site"))
+        other_site = Site.objects.create(hostname="other.test", root_page=other_root)
+        other_page = other_root.add_child(instance=ContentPage(title="Other page", slug="other-page"))
+        TagContentPage.objects.create(tag=self.tag, content_object=other_page)
+
+        assert Tag.objects.tags_with_usecount().get(pk=self.tag.pk).usecount == 2
+        assert Tag.objects.tags_with_usecount(site=other_site).get(pk=self.tag.pk).usecount == 1
+        assert (
+            Tag.objects.tags_with_usecount(site=Site.objects.get(is_default_site=True)).get(pk=self.tag.pk).usecount
+            == 1
+        )
+
+    def test_rebuild_tag_usages_command(self):
+        TagUsage.objects.all().delete()
+        assert Tag.objects.tags_with_usecount().get(pk=self.tag.pk).usecount == 0
+
+        call_command("rebuild_tag_usages", stdout=StringIO())
+        assert Tag.objects.tags_with_usecount().get(pk=self.tag.pk).usecount == 1
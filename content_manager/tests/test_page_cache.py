@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from wagtail.models import Page, PageViewRestriction
+from wagtail.test.utils import WagtailPageTestCase
+
+from blog.models import BlogEntryPage, BlogIndexPage
+from content_manager.cache import CACHE_ALIASES, get_cache
+from content_manager.models import CmsDsfrConfig, ContentPage
+
+User = get_user_model()
+
+
+@override_settings(SF_PAGE_CACHE=True)
+class PageCacheTestCase(WagtailPageTestCase):
+    def setUp(self):
+        for alias in CACHE_ALIASES:
+            get_cache(alias).clear()
+
+        self.home_page = Page.objects.get(slug="home")
+        self.admin = User.objects.create_superuser("test", "test@test.test", "pass")
+        self.content_page = self.home_page.add_child(
+            instance=ContentPage(title="Page en cache", slug="cached-page", owner=self.admin)
+        )
+        self.content_page.save_revision().publish()
+
+    def rename_without_signals(self, page, title):
+        Page.objects.filter(pk=page.pk).update(title=title)
+
+    def test_anonymous_visit_is_served_from_the_cache(self):
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Page en cache")
+
+        self.rename_without_signals(self.content_page, "Titre modifié")
+
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Page en cache")
+        self.assertNotContains(response, "Titre modifié")
+
+    def test_query_string_is_part_of_the_key(self):
+        self.client.get(self.content_page.url)
+        self.rename_without_signals(self.content_page, "Titre modifié")
+
+        response = self.client.get(f"{self.content_page.url}?utm_source=test")
+        self.assertContains(response, "Titre modifié")
+
+    def test_publication_invalidates_the_page_and_its_ancestors(self):
+        self.client.get(self.content_page.url)
+        self.client.get(self.home_page.url)
+
+        self.content_page.title = "Titre publié"
+        self.content_page.save_revision().publish()
+        self.rename_without_signals(self.home_page.specific, "Accueil modifié")
+
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Titre publié")
+
+        response = self.client.get(self.home_page.url)
+        self.assertContains(response, "Accueil modifié")
+
+    def test_settings_save_invalidates_the_site(self):
+        self.client.get(self.content_page.url)
+
+        config = CmsDsfrConfig.objects.get_or_create(site=self.home_page.get_site())[0]
+        config.site_title = "Nouveau titre du site"
+        config.save()
+
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Nouveau titre du site")
+
+    def test_authenticated_visit_is_not_cached(self):
+        self.client.force_login(self.admin)
+        self.client.get(self.content_page.url)
+        self.rename_without_signals(self.content_page, "Titre modifié")
+
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Titre modifié")
+
+    def test_restricted_page_is_not_served_from_the_cache(self):
+        response = self.client.get(self.content_page.url)
+        self.assertEqual(response.status_code, 200)
+
+        # Without the signals, so that the cached page is not invalidated
+        PageViewRestriction.objects.bulk_create(
+            [PageViewRestriction(page=self.content_page, restriction_type=PageViewRestriction.LOGIN)]
+        )
+
+        response = self.client.get(self.content_page.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_publication_invalidates_the_pages_showing_the_recent_entries(self):
+        blog_index = self.home_page.add_child(instance=BlogIndexPage(title="Actualités", slug="actualites"))
+        body = [("blog_recent_entries", {"title": "Actus", "blog": blog_index, "entries_count": 3})]
+        listing_page = self.home_page.add_child(instance=ContentPage(title="Accueil bis", slug="listing", body=body))
+        listing_page.save_revision().publish()
+        self.client.get(listing_page.url)
+
+        post = blog_index.add_child(instance=BlogEntryPage(title="Nouvel article", slug="nouvel-article"))
+        post.save_revision().publish()
+
+        response = self.client.get(listing_page.url)
+        self.assertContains(response, "Nouvel article")
+
+    @override_settings(SF_PAGE_CACHE=False)
+    def test_cache_is_disabled_by_default(self):
+        self.client.get(self.content_page.url)
+        self.rename_without_signals(self.content_page, "Titre modifié")
+
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Titre modifié")
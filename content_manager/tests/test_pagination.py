@@ -0,0 +1,131 @@
+from django.test import RequestFactory, override_settings
+from wagtail.models import Page
+from wagtail.test.utils import WagtailPageTestCase
+
+from content_manager.models import CatalogIndexPage, ContentPage
+from content_manager.pagination import KeysetPaginator, decode_cursor, encode_cursor, paginate
+
+
+class KeysetPaginatorTestCase(WagtailPageTestCase):
+    def setUp(self):
+        home = Page.objects.get(slug="home")
+        # Duplicate titles, to check the tie-breaking on the primary key
+        for i in range(7):
+            home.add_child(instance=ContentPage(title=f"Page {i // 2}", slug=f"page-{i}"))
+
+        self.queryset = ContentPage.objects.filter(slug__startswith="page-")
+        self.expected = list(self.queryset.order_by("-title", "pk").values_list("slug", flat=True))
+
+    def get_slugs(self, page) -> list:
+        return [entry.slug for entry in page]
+
+    def test_next_cursors_go_through_all_entries(self):
+        paginator = KeysetPaginator(self.queryset, 3, ordering=["-title", "pk"])
+
+        page = paginator.get_page()
+        slugs = self.get_slugs(page)
+        while page.has_next():
+            page = paginator.get_page(page.next_cursor)
+            slugs += self.get_slugs(page)
+
+        self.assertEqual(slugs, self.expected)
+        self.assertEqual(page.number, 3)
+        self.assertEqual(paginator.num_pages, 3)
+
+    def test_previous_cursor_goes_back(self):
+        paginator = KeysetPaginator(self.queryset, 3, ordering=["-title", "pk"])
+
+        second_page = paginator.get_page(paginator.get_page().next_cursor)
+        first_page = paginator.get_page(second_page.previous_cursor)
+
+        self.assertEqual(self.get_slugs(first_page), self.expected[:3])
+        self.assertEqual(first_page.number, 1)
+        self.assertFalse(first_page.has_previous())
+
+    def test_page_number_is_still_supported(self):
+        paginator = KeysetPaginator(self.queryset, 3, ordering=["-title", "pk"])
+
+        page = paginator.get_page(page_number="2")
+        self.assertEqual(self.get_slugs(page), self.expected[3:6])
+        self.assertEqual(decode_cursor(page.next_cursor)["n"], 3)
+
+    def test_last_page_and_invalid_cursors(self):
+        paginator = KeysetPaginator(self.queryset, 3, ordering=["-title", "pk"])
+
+        self.assertEqual(self.get_slugs(paginator.get_page(paginator.get_page().last_cursor)), self.expected[-3:])
+        self.assertEqual(self.get_slugs(paginator.get_page("not-a-cursor")), self.expected[:3])
+
+    def test_crafted_cursors_show_the_requested_page(self):
+        paginator = KeysetPaginator(self.queryset, 3, ordering=["-first_published_at", "pk"])
+        date = "2026-01-01T00:00:00+00:00"
+
+        for data in [
+            {"d": "next", "k": [date, 1], "n": "x"},
+            {"d": "next", "k": [date, 1], "n": None},
+            {"d": "next", "k": "not-a-list", "n": 2},
+            {"d": "prev", "k": ["not-a-date", 1], "n": 2},
+            {"d": "next", "k": [date, "x"], "n": 2},
+            {"d": "next", "k": [date, {"pk__gt": 0}], "n": 2},
+            {"d": "next", "k": [[date], 1], "n": 2},
+        ]:
+            with self.subTest(data=data):
+                page = paginator.get_page(encode_cursor(data))
+                self.assertEqual(page.number, 1)
+                self.assertEqual(len(page), 3)
+
+                page = paginator.get_page(encode_cursor(data), page_number="2")
+                self.assertEqual(page.number, 2)
+                self.assertEqual(len(page), 3)
+
+    def test_cursor_number_is_clamped_to_the_number_of_pages(self):
+        paginator = KeysetPaginator(self.queryset, 3, ordering=["-title", "pk"])
+        second_page = paginator.get_page(paginator.get_page().next_cursor)
+        data = decode_cursor(second_page.next_cursor)
+        data["n"] = 999
+
+        page = paginator.get_page(encode_cursor(data))
+        self.assertEqual(self.get_slugs(page), self.expected[6:])
+        self.assertEqual(page.number, 3)
+
+    def test_count_is_cached(self):
+        paginator = KeysetPaginator(self.queryset, 3, ordering=["-title", "pk"])
+        self.assertEqual(paginator.count, 7)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(KeysetPaginator(self.queryset, 3, ordering=["-title", "pk"]).count, 7)
+
+    @override_settings(SF_KEYSET_PAGINATION=False)
+    def test_django_paginator_is_used_by_default(self):
+        request = RequestFactory().get("/", {"page": 2})
+        paginator, page = paginate(request, self.queryset.order_by("pk"), 3, ordering=["pk"])
+
+        self.assertEqual(page.number, 2)
+        self.assertFalse(hasattr(page, "next_cursor"))
+
+
+@override_settings(SF_KEYSET_PAGINATION=True)
+class CatalogKeysetPaginationTestCase(WagtailPageTestCase):
+    def setUp(self):
+        home = Page.objects.get(slug="home")
+        self.catalog = home.add_child(instance=CatalogIndexPage(title="Catalogue", slug="catalog", entries_per_page=2))
+        for i in range(5):
+            self.catalog.add_child(instance=ContentPage(title=f"Entrée {i}", slug=f"entry-{i}"))
+
+    def test_catalog_links_use_cursors(self):
+        response = self.client.get(self.catalog.url)
+
+        self.assertContains(response, "Entrée 1")
+        self.assertNotContains(response, "Entrée 2")
+        self.assertContains(response, "1 / 3")
+        self.assertContains(response, "?cursor=")
+
+        next_cursor = response.context["entries"].next_cursor
+        response = self.client.get(self.catalog.url, {"cursor": next_cursor})
+        self.assertContains(response, "Entrée 2")
+        self.assertContains(response, "2 / 3")
+
+    def test_page_links_still_work(self):
+        response = self.client.get(self.catalog.url, {"page": 3})
+
+        self.assertContains(response, "Entrée 4")
+        self.assertNotContains(response, "Entrée 3")
@@ -0,0 +1,98 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from wagtail.models import Page, Site
+from wagtail.test.utils import WagtailPageTestCase
+
+from blog.models import BlogEntryPage, BlogIndexPage, Category
+from content_manager.cache import CACHE_ALIASES, get_cache
+from content_manager.models import ContentPage
+from content_manager.utils import import_image
+
+
+class RecentEntriesTestCase(WagtailPageTestCase):
+    def setUp(self):
+        for alias in CACHE_ALIASES:
+            get_cache(alias).clear()
+
+        self.home_page = Page.objects.get(slug="home")
+        self.blog_index = self.home_page.add_child(instance=BlogIndexPage(title="Actualités", slug="actualites"))
+        self.category = Category.objects.create(name="Innovation", slug="innovation")
+        self.image = import_image("static/artwork/technical-error.svg", "Couverture")
+
+        for i in range(3):
+            entry = self.blog_index.add_child(
+                instance=BlogEntryPage(
+                    title=f"Article {i}",
+                    slug=f"article-{i}",
+                    hero=[
+                        {
+                            "type": "hero_text_image",
+                            "value": {"image": {"image": self.image.pk, "alt_text": "", "decorative": True}},
+                        }
+                    ],
+                )
+            )
+            entry.blog_categories.add(self.category)
+            entry.save_revision().publish()
+
+        self.content_page = self.home_page.add_child(
+            instance=ContentPage(
+                title="Accueil du blog",
+                slug="accueil-blog",
+                body=[
+                    ("blog_recent_entries", {"title": "Actus", "blog": self.blog_index, "entries_count": 3}),
+                    (
+                        "blog_recent_entries",
+                        {"title": "Innovation", "blog": self.blog_index, "category_filter": self.category},
+                    ),
+                ],
+            )
+        )
+        self.content_page.save_revision().publish()
+
+    def get_posts(self, index=0):
+        page = ContentPage.objects.get(pk=self.content_page.pk)
+        return page.body[index].value.posts()
+
+    def test_entries_have_the_card_fields(self):
+        posts = self.get_posts()
+
+        self.assertEqual(len(posts), 3)
+        self.assertEqual(posts[0].categories, ["Innovation"])
+        self.assertEqual(posts[0].cover_url, self.image.file.url)
+        self.assertTrue(posts[0].url.endswith("/article-2/"))
+
+    def test_entries_are_loaded_in_batch(self):
+        block_value = self.content_page.body[0].value
+        # The root paths of the sites are cached on their own
+        Site.get_site_root_paths()
+
+        # The posts with their card images, and their categories
+        with CaptureQueriesContext(connection) as queries:
+            block_value.posts()
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('"body"', queries[0]["sql"])
+
+        with self.assertNumQueries(0):
+            block_value.posts()
+
+    def test_filters_are_part_of_the_key(self):
+        self.get_posts(0)
+
+        other = self.blog_index.add_child(instance=BlogEntryPage(title="Sans catégorie", slug="sans-categorie"))
+        Page.objects.filter(pk=other.pk).update(live=True)
+
+        self.assertEqual(len(self.get_posts(1)), 3)
+
+    def test_publication_invalidates_the_entries(self):
+        self.assertEqual(len(self.get_posts()), 3)
+
+        entry = BlogEntryPage.objects.get(slug="article-0")
+        entry.unpublish()
+
+        self.assertEqual([post.title for post in self.get_posts()], ["Article 2", "Article 1"])
+
+    def test_page_is_renderable(self):
+        response = self.client.get(self.content_page.url)
+        self.assertContains(response, "Article 2")
+        self.assertContains(response, self.image.file.url)
@@ -0,0 +1,164 @@
+from io import BytesIO
+
+from django.core.files.images import ImageFile
+from django.db import connection
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image as PILImage
+from wagtail.images import get_image_model
+from wagtail.models import Page
+from wagtail.test.utils import WagtailPageTestCase
+
+from content_manager.cache import CACHE_ALIASES, RENDITIONS_CACHE, get_cache
+from content_manager.models import CatalogIndexPage, ContentPage
+from content_manager.renditions import get_all_responsive_filter_specs, get_template_rendition_filters
+from content_manager.utils import import_image
+
+LISTING_TEMPLATE = "content_manager/blocks/catalog_index_entries_list.html"
+
+
+class RenditionsPrefetchTestCase(WagtailPageTestCase):
+    def setUp(self):
+        self.home_page = Page.objects.get(slug="home")
+        self.catalog = self.home_page.add_child(instance=CatalogIndexPage(title="Catalogue", slug="catalogue"))
+
+    def add_entries(self, start, count):
+        for i in range(start, start + count):
+            image = import_image("static/artwork/technical-error.svg", f"Image {i}")
+            self.catalog.add_child(
+                instance=ContentPage(
+                    title=f"Fiche {i}",
+                    slug=f"fiche-{i}",
+                    live=True,
+                    hero=[
+                        {
+                            "type": "hero_text_image",
+                            "value": {"image": {"image": image.pk, "alt_text": "", "decorative": True}},
+                        }
+                    ],
+                )
+            )
+
+    def count_listing_queries(self):
+        # Generates the renditions, then forgets them
+        render_to_string(LISTING_TEMPLATE, {"entries": self.catalog.entries})
+        get_cache(RENDITIONS_CACHE).clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            html = render_to_string(LISTING_TEMPLATE, {"entries": self.catalog.entries})
+        self.assertEqual(html.count("<img"), len(self.catalog.entries))
+        return len(queries)
+
+    def test_filters_are_read_from_the_templates(self):
+        self.assertEqual(
+            get_template_rendition_filters("blocks/socialmedia_preview_image.html"), ("fill-1200x630", "fill-800x418")
+        )
+        self.assertEqual(get_template_rendition_filters(LISTING_TEMPLATE), ("width-1200",))
+        # Through the includes
+        self.assertIn("fill-600x600", get_template_rendition_filters("content_manager/heros/hero_image_text.html"))
+
+    def test_listing_queries_do_not_depend_on_the_number_of_cards(self):
+        self.add_entries(0, 1)
+        single_card_queries = self.count_listing_queries()
+
+        self.add_entries(1, 5)
+        self.assertEqual(self.count_listing_queries(), single_card_queries)
+
+    def test_block_images_renditions_are_prefetched(self):
+        images = [import_image("static/artwork/technical-error.svg", f"Carte {i}") for i in range(4)]
+        page = self.home_page.add_child(
+            instance=ContentPage(
+                title="Cartes",
+                slug="cartes",
+                body=[
+                    {
+                        "type": "card",
+                        "value": {
+                            "title": f"Carte {i}",
+                            "image": {"image": image.pk, "alt_text": f"Image {i}", "decorative": False},
+                        },
+                    }
+                    for i, image in enumerate(images)
+                ],
+            )
+        )
+        self.client.get(page.url)
+        for alias in CACHE_ALIASES:
+            get_cache(alias).clear()
+
+        page = ContentPage.objects.get(pk=page.pk)
+        page.get_context(self.client.get("/").wsgi_request)
+
+        with self.assertNumQueries(0):
+            renditions = [block.value["image"].get_rendition("width-1200") for block in page.body]
+        self.assertEqual([rendition.alt for rendition in renditions], [f"Image {i}" for i in range(4)])
+
+
+def create_raster_image(title, file_name, width, height, image_format):
+    content = BytesIO()
+    PILImage.new("RGB", (width, height), "#000091").save(content, format=image_format)
+    return get_image_model().objects.create(title=title, file=ImageFile(content, name=file_name))
+
+
+@override_settings(SF_RESPONSIVE_IMAGE_WIDTHS=[400, 800, 1200, 1600], SF_RESPONSIVE_IMAGE_FORMATS=["avif", "webp"])
+class ResponsiveImageTestCase(WagtailPageTestCase):
+    def render(self, image, sizes=None):
+        template = Template(
+            "{% load wagtail_dsfr_tags %}{% responsive_image image sizes=sizes class='fr-responsive-img' %}"
+        )
+        return template.render(Context({"image": image, "sizes": sizes}))
+
+    def test_picture_has_sources_and_fallback(self):
+        image = create_raster_image("Photo", "photo.jpg", 1000, 500, "jpeg")
+        html = self.render(image, sizes="50vw")
+
+        self.assertIn('<source sizes="50vw" srcset="', html)
+        self.assertIn('type="image/avif"', html)
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('sizes="50vw"', html)
+        # The renditions are not wider than the original, and the fallback keeps its format
+        self.assertIn(" 1000w", html)
+        self.assertNotIn("1200w", html)
+        self.assertIn(".jpg 400w", html)
+        self.assertIn('height="200"', html)
+        self.assertIn('width="400"', html)
+
+    def test_transparent_images_fall_back_to_png(self):
+        image = create_raster_image("Logo", "logo.png", 600, 300, "png")
+        html = self.render(image)
+
+        self.assertIn(".png 400w", html)
+        self.assertIn('sizes="(min-width: 78em) 78rem, 100vw"', html)
+
+    def test_svg_images_keep_their_original(self):
+        image = get_image_model().objects.create(
+            title="Pictogramme",
+            file=ImageFile(open("static/artwork/technical-error.svg", "rb"), name="technical-error.svg"),
+        )
+        html = self.render(image)
+
+        self.assertNotIn("<picture>", html)
+        self.assertIn(".svg", html)
+
+    def test_centered_image_block_is_responsive(self):
+        image = create_raster_image("Photo", "photo.jpg", 1000, 500, "jpeg")
+        page = Page.objects.get(slug="home").add_child(
+            instance=ContentPage(
+                title="Image",
+                slug="image",
+                body=[{"type": "image", "value": {"image": image.pk, "width": "fr-content-media--sm"}}],
+            )
+        )
+
+        response = self.client.get(page.url)
+        self.assertContains(response, 'sizes="(min-width: 78em) 52rem, 100vw"')
+        self.assertContains(response, "<picture>")
+
+    def test_responsive_renditions_are_prefetched(self):
+        get_template_rendition_filters.cache_clear()
+        self.assertEqual(
+            get_template_rendition_filters("content_manager/blocks/image.html"),
+            tuple(sorted(get_all_responsive_filter_specs())),
+        )
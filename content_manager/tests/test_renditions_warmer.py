@@ -0,0 +1,124 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from wagtail.images import get_image_model
+from wagtail.models import Page
+from wagtail.test.utils import WagtailPageTestCase
+
+from blog.models import Person
+from content_manager.models import CmsDsfrConfig, ContentPage, RenditionQueueEntry
+from content_manager.services.renditions_warmer import get_live_image_filters, get_page_image_filters
+from content_manager.utils import get_default_site, import_image
+
+Rendition = get_image_model().get_rendition_model()
+
+
+class RenditionsWarmerTestCase(WagtailPageTestCase):
+    def setUp(self):
+        self.home_page = Page.objects.get(slug="home")
+        self.hero_image = import_image("static/artwork/technical-error.svg", "Héros")
+        self.card_image = import_image("static/artwork/coding.svg", "Carte")
+        self.preview_image = import_image("static/artwork/video.svg", "Aperçu")
+
+        self.page = self.home_page.add_child(
+            instance=ContentPage(
+                title="Page illustrée",
+                slug="illustree",
+                preview_image=self.preview_image,
+                hero=[
+                    {
+                        "type": "hero_text_image",
+                        "value": {"image": {"image": self.hero_image.pk, "alt_text": "", "decorative": True}},
+                    }
+                ],
+                body=[
+                    {
+                        "type": "card",
+                        "value": {
+                            "title": "Carte",
+                            "image": {"image": self.card_image.pk, "alt_text": "", "decorative": True},
+                        },
+                    }
+                ],
+            )
+        )
+        self.page.save_revision().publish()
+
+    def warm(self, *args):
+        out = StringIO()
+        call_command("warm_renditions", "--workers", "1", *args, stdout=out, stderr=out)
+        return out.getvalue()
+
+    def test_filters_come_from_the_templates_and_api_fields(self):
+        image_filters = get_page_image_filters(ContentPage.objects.get(pk=self.page.pk))
+
+        self.assertIn("width-1200", image_filters[self.card_image.pk])
+        # The hero image is also the image of the cards of the listings
+        self.assertIn("fill-600x600", image_filters[self.hero_image.pk])
+        self.assertIn("width-1200", image_filters[self.hero_image.pk])
+        self.assertEqual(image_filters[self.preview_image.pk], {"fill-1200x630", "fill-800x418"})
+
+    def test_filters_come_from_the_template_of_the_block_of_each_image(self):
+        portrait = import_image("static/artwork/coding.svg", "Portrait")
+        person = Person.objects.create(name="Camille", role="Rédaction", image=portrait)
+        self.page.body = [
+            *self.page.body.raw_data,
+            {
+                "type": "multicolumns",
+                "value": {"columns": [{"type": "contact_card", "value": {"contact": person.pk}}]},
+            },
+        ]
+        self.page.save_revision().publish()
+
+        image_filters = get_page_image_filters(ContentPage.objects.get(pk=self.page.pk))
+
+        self.assertIn("fill-200x200", image_filters[portrait.pk])
+        self.assertNotIn("fill-200x200", image_filters[self.card_image.pk])
+
+    def test_settings_images_are_included(self):
+        logo = import_image("static/artwork/logo-republique.svg", "Logo")
+        CmsDsfrConfig.objects.update_or_create(site=get_default_site(), defaults={"operator_logo_file": logo})
+
+        self.assertIn("width-800", get_live_image_filters()[logo.pk])
+
+    def test_command_generates_the_missing_renditions(self):
+        output = self.warm()
+
+        self.assertIn("3 images used by the live pages and the settings.", output)
+        self.assertTrue(Rendition.objects.filter(image=self.card_image, filter_spec="width-1200").exists())
+        self.assertTrue(Rendition.objects.filter(image=self.preview_image, filter_spec="fill-1200x630").exists())
+
+        self.assertIn("0 renditions generated for 3 images, 0 failures.", self.warm())
+
+    def test_failures_are_reported(self):
+        self.card_image.file.storage.delete(self.card_image.file.name)
+
+        output = self.warm()
+
+        self.assertIn(f"Image {self.card_image.pk}: SourceImageIOError", output)
+        self.assertIn("1 failures.", output)
+        self.assertTrue(Rendition.objects.filter(image=self.preview_image).exists())
+
+    @override_settings(SF_RENDITIONS_QUEUE=True)
+    def test_published_pages_are_queued(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.page.save_revision().publish()
+
+        self.assertTrue(RenditionQueueEntry.objects.filter(image=self.card_image, filter_spec="width-1200").exists())
+
+        output = self.warm("--queue")
+
+        self.assertIn("0 pending entries", output)
+        self.assertTrue(Rendition.objects.filter(image=self.card_image, filter_spec="width-1200").exists())
+
+    @override_settings(SF_RENDITIONS_QUEUE=True)
+    def test_failed_renditions_stay_in_the_queue(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.page.save_revision().publish()
+        self.card_image.file.storage.delete(self.card_image.file.name)
+
+        self.warm("--queue")
+
+        self.assertTrue(RenditionQueueEntry.objects.filter(image=self.card_image).exists())
+        self.assertFalse(RenditionQueueEntry.objects.filter(image=self.preview_image).exists())
@@ -186,3 +186,30 @@ class SearchResultsTestCase(WagtailPageTestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Catalog Page")
+
+    def test_search_description_is_searchable(self):
+        self.public_content_page.search_description = "Résumé de la page zythophile"
+        self.public_content_page.save_revision().publish()
+
+        call_command("update_index")
+
+        response = self.client.get(f"{reverse('cms_search')}?q=zythophile")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Page de contenu publique")
+
+    def test_search_results_are_paginated(self):
+        for i in range(3):
+            page = self.home_page.add_child(instance=ContentPage(title=f"Page paginée {i}", slug=f"page-paginee-{i}"))
+            page.save_revision().publish()
+
+        call_command("update_index")
+
+        search_url = reverse("cms_search")
+        with self.settings(SF_SEARCH_RESULTS_PER_PAGE=2):
+            response = self.client.get(f"{search_url}?q=paginée")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["paginator"].count, 3)
+        self.assertEqual(len(response.context["object_list"]), 2)
+        self.assertContains(response, "3 résultats")
@@ -0,0 +1,67 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from wagtail.models import Page
+from wagtail.search.backends import get_search_backend
+from wagtail.test.utils import WagtailPageTestCase
+
+from blog.models import Category
+from content_manager.models import ContentPage, SearchIndexQueueEntry
+from content_manager.services.search_queue import get_queue_status, process_search_queue
+
+
+@override_settings(SF_SEARCH_QUEUE=True)
+class SearchQueueTestCase(WagtailPageTestCase):
+    def setUp(self):
+        self.home_page = Page.objects.get(slug="home")
+        self.page = self.home_page.add_child(instance=ContentPage(title="Page zythologique", slug="zythologie"))
+        self.backend = get_search_backend()
+
+    def search(self, query):
+        return list(ContentPage.objects.live().search(query))
+
+    def test_changed_objects_are_queued_once(self):
+        self.page.save_revision().publish()
+        self.page.save_revision().publish()
+        Category.objects.create(name="Bières", slug="bieres")
+
+        self.assertEqual(
+            sorted(SearchIndexQueueEntry.objects.values_list("content_type__model", "action")),
+            [("category", "update"), ("contentpage", "update")],
+        )
+
+    def test_queue_is_processed_in_batches(self):
+        self.page.save_revision().publish()
+        self.backend.delete(self.page)
+        self.assertEqual(self.search("zythologique"), [])
+
+        self.assertEqual(process_search_queue(batch_size=10), 1)
+
+        self.assertEqual(self.search("zythologique"), [self.page])
+        self.assertEqual(get_queue_status()["pending"], 0)
+
+    def test_deleted_pages_are_removed_from_the_index(self):
+        self.page.save_revision().publish()
+        process_search_queue()
+        self.assertEqual(self.search("zythologique"), [self.page])
+
+        self.page.delete()
+        self.assertEqual(
+            list(SearchIndexQueueEntry.objects.values_list("action", flat=True)), [SearchIndexQueueEntry.ACTION_DELETE]
+        )
+
+        process_search_queue()
+        self.assertEqual(self.search("zythologique"), [])
+
+    def test_command_reports_the_lag(self):
+        self.page.save_revision().publish()
+
+        out = StringIO()
+        call_command("process_search_queue", "--status", stdout=out)
+        self.assertIn("1 pending entries", out.getvalue())
+
+        out = StringIO()
+        call_command("process_search_queue", stdout=out)
+        self.assertIn("1 objects indexed.", out.getvalue())
+        self.assertIn("0 pending entries, indexing lag: none", out.getvalue())
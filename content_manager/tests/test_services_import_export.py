@@ -1,7 +1,18 @@
+import json
+import tempfile
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
 from django.core.management import call_command
+from django.test import TestCase
+from wagtail.images.models import Image
 from wagtail.test.utils import WagtailPageTestCase
 
 from content_manager.models import ContentPage
+from content_manager.services.import_export import ExportPages, ImageDownloadError, ImportExportImages, ImportPages
 
 
 class ImportPagesTestCase(WagtailPageTestCase):
@@ -22,3 +33,259 @@ class ImportPagesTestCase(WagtailPageTestCase):
             ContentPage.objects.child_of(self.templates_index).filter(source_url=template.source_url).first()
         )
         self.assertEqual(template.id, find_template.id)
+
+    def test_imported_templates_are_unchanged_on_a_new_import(self):
+        image_count = Image.objects.count()
+
+        result = ImportPages().import_pages()
+
+        self.assertEqual(len(result.unchanged), ContentPage.objects.child_of(self.templates_index).count())
+        self.assertEqual((result.created, result.updated, result.failures), ([], {}, {}))
+        self.assertEqual((result.images_created, Image.objects.count()), (0, image_count))
+
+    def test_dry_run_reports_the_changes_without_saving_them(self):
+        first_template, second_template = ContentPage.objects.child_of(self.templates_index)[:2]
+        first_template.title = "Changed title"
+        first_template.save()
+        second_template.delete()
+        page_count = ContentPage.objects.count()
+
+        importer = ImportPages(dry_run=True)
+        result = importer.import_pages()
+
+        source_ids = {importer.pages[page_id]["meta"]["html_url"]: page_id for page_id in importer.pages}
+        self.assertEqual(result.updated, {source_ids[first_template.source_url]: ["title"]})
+        self.assertEqual(result.created, [source_ids[second_template.source_url]])
+        self.assertEqual(ContentPage.objects.count(), page_count)
+        first_template.refresh_from_db()
+        self.assertEqual(first_template.title, "Changed title")
+
+    def test_dry_run_ignores_the_references_to_the_images_to_create(self):
+        Image.objects.all().delete()
+
+        result = ImportPages(dry_run=True).import_pages()
+
+        self.assertGreater(result.images_created, 0)
+        self.assertEqual(result.updated, {})
+        self.assertEqual(Image.objects.count(), 0)
+
+
+class SourceSiteHandler(BaseHTTPRequestHandler):
+    """
+    Serves the pages and images API and the image files of a source site
+    """
+
+    def do_GET(self):
+        server = self.server
+        server.requests[self.path] += 1
+
+        error_count = server.errors.get(self.path, 0)
+        if error_count:
+            server.errors[self.path] = error_count - 1
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        image_id = self.path.removeprefix("/api/v2/images/").rstrip("/")
+        if self.path.startswith("/api/v2/pages/"):
+            body = self.get_pages_body()
+        elif image_id in server.images:
+            filename = server.images[image_id][0]
+            body = json.dumps(
+                {
+                    "id": int(image_id),
+                    "title": f"Image {image_id}",
+                    "meta": {"type": "wagtailimages.Image", "download_url": f"/media/{filename}", "tags": []},
+                }
+            ).encode()
+        else:
+            files = dict(server.images.values())
+            body = files.get(self.path.removeprefix("/media/"))
+
+        if body == b"":
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def get_pages_body(self) -> bytes | None:
+        """
+        Returns the detail of a page, or a listing of pages filtered like the wagtail API does
+        """
+        server = self.server
+        url = urlsplit(self.path)
+        page_id = url.path.removeprefix("/api/v2/pages/").rstrip("/")
+        if page_id:
+            page = server.pages.get(page_id)
+            return json.dumps(page["content"]).encode() if page else None
+
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        page_ids = sorted(server.pages, key=int)
+        if "id" in query:
+            if "," in query["id"] and not server.accepts_id_list:
+                return b""
+            page_ids = [i for i in page_ids if i in query["id"].split(",")]
+        if "child_of" in query:
+            page_ids = [i for i in page_ids if server.pages[i]["parent"] == query["child_of"]]
+        if "descendant_of" in query:
+            page_ids = [i for i in page_ids if query["descendant_of"] in self.get_ancestors(i)]
+
+        offset, limit = int(query.get("offset", 0)), int(query["limit"])
+        items = [server.pages[i]["content"] for i in page_ids[offset : offset + limit]]
+        return json.dumps({"meta": {"total_count": len(page_ids)}, "items": items}).encode()
+
+    def get_ancestors(self, page_id: str) -> list:
+        ancestors = []
+        while page_id := self.server.pages[page_id]["parent"]:
+            ancestors.append(page_id)
+        return ancestors
+
+    def log_message(self, *args):
+        pass
+
+
+class SourceSiteTestCase(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), SourceSiteHandler)
+        self.server.requests = Counter()
+        self.server.errors = {}
+        self.server.pages = {}
+        self.server.accepts_id_list = True
+        self.server.images = {
+            "1": ("cms.png", b"cms"),
+            "2": ("coding.svg", Path("static/artwork/coding.svg").read_bytes()),
+            "3": ("Pictogrammes_DSFR__Leisure_Book.svg", b"book"),
+        }
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.source_site = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.image_folder = Path(folder.name)
+
+
+class DownloadImagesTestCase(SourceSiteTestCase):
+    def download(self):
+        exporter = ImportExportImages(["1", "2", "3"], self.source_site, image_folder=self.image_folder, workers=2)
+        exporter.download_images()
+        return exporter
+
+    def get_saved_image_data(self):
+        return json.loads((self.image_folder / "image_data.json").read_text())
+
+    def test_images_are_downloaded(self):
+        self.download()
+
+        image_data = self.get_saved_image_data()
+        self.assertEqual((self.image_folder / "cms.png").read_bytes(), b"cms")
+        self.assertEqual(image_data["1"]["filename"], "cms.png")
+        self.assertEqual(image_data["1"]["title"], "Image 1")
+        self.assertNotIn("download_url", image_data["1"]["meta"])
+        self.assertEqual(image_data["3"], image_data["3"] | {"filename": "Pictogrammes DSFR — Leisure Book.svg"})
+        self.assertTrue(image_data["3"]["is_pictogram"])
+        self.assertFalse((self.image_folder / "Pictogrammes_DSFR__Leisure_Book.svg").exists())
+
+    def test_downloaded_images_are_skipped(self):
+        self.download()
+        (self.image_folder / "coding.svg").write_bytes(b"corrupted")
+        self.server.requests.clear()
+
+        self.download()
+
+        self.assertEqual(set(self.server.requests), {"/api/v2/images/2/", "/media/coding.svg"})
+        self.assertEqual((self.image_folder / "coding.svg").read_bytes(), self.server.images["2"][1])
+
+    def test_interrupted_download_is_resumed(self):
+        self.server.errors = {"/media/coding.svg": 10}
+
+        with self.assertRaises(ImageDownloadError) as context:
+            self.download()
+
+        self.assertEqual(set(context.exception.failures), {"2"})
+        self.assertEqual(set(self.get_saved_image_data()), {"1", "3"})
+        self.assertFalse((self.image_folder / "coding.svg").exists())
+
+        self.server.errors = {}
+        self.server.requests.clear()
+        self.download()
+
+        self.assertEqual(set(self.server.requests), {"/api/v2/images/2/", "/media/coding.svg"})
+        self.assertEqual(set(self.get_saved_image_data()), {"1", "2", "3"})
+
+    def test_failed_requests_are_retried(self):
+        self.server.errors = {"/api/v2/images/1/": 1, "/media/cms.png": 2}
+
+        self.download()
+
+        self.assertEqual(self.server.requests["/media/cms.png"], 3)
+        self.assertEqual(self.get_saved_image_data()["1"]["filename"], "cms.png")
+
+
+class ExportPagesTestCase(SourceSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        # Page 10 is the parent of the pages 11 to 15, and 12 is the parent of the page 16
+        parents = {"10": None, "11": "10", "12": "10", "13": "10", "14": "10", "15": "10", "16": "12"}
+        for page_id, parent_id in parents.items():
+            self.server.pages[page_id] = {"parent": parent_id, "content": self.get_page_content(page_id)}
+
+    def get_page_content(self, page_id: str) -> dict:
+        return {
+            "id": int(page_id),
+            "meta": {
+                "type": "content_manager.ContentPage",
+                "html_url": f"https://source.test/page-{page_id}/",
+                "slug": f"page-{page_id}",
+                "seo_title": "",
+            },
+            "title": f"Page {page_id}",
+            "body": [{"type": "image", "value": {"image": int(page_id) + 100, "alt": ""}, "id": f"block-{page_id}"}],
+            "header_image": None,
+        }
+
+    def get_listing_requests(self) -> list:
+        return [path for path in self.server.requests if path.startswith("/api/v2/pages/?")]
+
+    def test_pages_are_exported_in_batches(self):
+        exporter = ExportPages(self.source_site, batch_size=3)
+        export = exporter.export_pages([11, 12, 13, 14, 15])
+
+        self.assertEqual(list(export["pages"]), ["11", "12", "13", "14", "15"])
+        self.assertEqual(sorted(export["image_ids"]), [111, 112, 113, 114, 115])
+        self.assertEqual(export["pages"]["11"]["body"], [{"type": "image", "value": {"image": 111, "alt": ""}}])
+        self.assertNotIn("seo_title", export["pages"]["11"]["meta"])
+        self.assertEqual(len(self.get_listing_requests()), 2)
+        self.assertIn("fields=body%2Cheader_image", self.get_listing_requests()[0])
+
+    def test_pages_are_exported_one_by_one_from_older_sites(self):
+        self.server.accepts_id_list = False
+
+        export = ExportPages(self.source_site).export_pages([11, 12])
+
+        self.assertEqual(list(export["pages"]), ["11", "12"])
+        self.assertEqual(self.server.requests["/api/v2/pages/11/"], 1)
+        self.assertEqual(self.server.requests["/api/v2/pages/12/"], 1)
+
+    def test_subtree_is_exported_with_pagination(self):
+        export = ExportPages(self.source_site, batch_size=2).export_subtree(10)
+
+        self.assertEqual(list(export["pages"]), ["11", "12", "13", "14", "15", "16"])
+        self.assertEqual(len(self.get_listing_requests()), 3)
+
+    def test_children_are_exported(self):
+        export = ExportPages(self.source_site).export_subtree(10, descendants=False)
+
+        self.assertEqual(list(export["pages"]), ["11", "12", "13", "14", "15"])
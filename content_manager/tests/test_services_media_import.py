@@ -0,0 +1,58 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase
+from wagtail.images.models import Image
+from wagtail.utils.file import hash_filelike
+
+from content_manager.services.accessors import get_or_create_collection
+from content_manager.services.media_import import MediaFile, import_media_files
+
+
+class ImportMediaFilesTestCase(TestCase):
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.folder = Path(folder.name)
+
+        for filename in ["coding.svg", "video.svg", "technical-error.svg"]:
+            shutil.copy(Path("static/artwork") / filename, self.folder / filename)
+
+        self.media_files = [
+            MediaFile(path=str(self.folder / "coding.svg"), title="Coding", tags=["DSFR", "Digital"]),
+            MediaFile(path=str(self.folder / "video.svg"), title="Video", tags=["DSFR"]),
+        ]
+        self.collection = get_or_create_collection("Imported medias")
+
+    def test_images_are_created_with_their_tags(self):
+        result = import_media_files(self.media_files, self.collection, batch_size=1)
+
+        self.assertEqual(result.created, ["Coding", "Video"])
+        image = Image.objects.get(title="Coding")
+        self.assertEqual(image.collection, self.collection)
+        self.assertEqual(sorted(image.tags.names()), ["DSFR", "Digital"])
+        with open(self.folder / "coding.svg", "rb") as image_file:
+            self.assertEqual(image.file_hash, hash_filelike(image_file))
+        self.assertEqual(image.file_size, (self.folder / "coding.svg").stat().st_size)
+
+    def test_existing_images_are_skipped_in_a_single_query(self):
+        import_media_files(self.media_files, self.collection)
+
+        with self.assertNumQueries(1):
+            result = import_media_files(self.media_files, self.collection)
+
+        self.assertEqual(result.unchanged, ["Coding", "Video"])
+        self.assertEqual(Image.objects.filter(title="Coding").count(), 1)
+
+    def test_only_changed_files_are_overwritten_when_forced(self):
+        import_media_files(self.media_files, self.collection)
+        coding = Image.objects.get(title="Coding")
+        shutil.copy(Path("static/artwork/technical-error.svg"), self.folder / "coding.svg")
+
+        result = import_media_files(self.media_files, self.collection, force=True)
+
+        self.assertEqual((result.updated, result.unchanged), (["Coding"], ["Video"]))
+        updated_coding = Image.objects.get(pk=coding.pk)
+        self.assertNotEqual(updated_coding.file_hash, coding.file_hash)
+        self.assertEqual(updated_coding.file_size, (self.folder / "coding.svg").stat().st_size)
@@ -0,0 +1,129 @@
+from django.test import override_settings
+from django.urls import reverse
+from wagtail.models import Locale, Page, PageViewRestriction
+from wagtail.test.utils import WagtailPageTestCase
+
+from content_manager.models import ContentPage
+from content_manager.services.sitemap import build_sitemap_tree, get_sitemap_tree
+
+
+class SitemapTreeTestCase(WagtailPageTestCase):
+    def setUp(self):
+        self.home_page = Page.objects.get(slug="home")
+        self.site = self.home_page.get_site()
+
+        self.section = self.home_page.add_child(instance=ContentPage(title="Rubrique", slug="section"))
+        self.section.add_child(instance=ContentPage(title="Sous-page 1", slug="subpage-1"))
+        self.section.add_child(instance=ContentPage(title="Sous-page 2", slug="subpage-2"))
+
+        self.excluded = self.home_page.add_child(
+            instance=ContentPage(title="Page exclue", slug="excluded", exclude_from_sitemap=True)
+        )
+        self.excluded.add_child(instance=ContentPage(title="Enfant de page exclue", slug="excluded-child"))
+
+        self.private = self.home_page.add_child(instance=ContentPage(title="Page privée", slug="private"))
+        self.private.add_child(instance=ContentPage(title="Enfant de page privée", slug="private-child"))
+        PageViewRestriction.objects.create(page=self.private, restriction_type=PageViewRestriction.LOGIN)
+
+    def test_tree_is_nested_and_ordered(self):
+        tree = build_sitemap_tree(self.home_page)
+
+        self.assertEqual([node["title"] for node in tree], ["Rubrique"])
+        self.assertEqual([node["title"] for node in tree[0]["children"]], ["Sous-page 1", "Sous-page 2"])
+        self.assertEqual(tree[0]["children"][0]["url"], "/section/subpage-1/")
+
+    def test_restricted_pages_are_only_shown_on_demand(self):
+        tree = build_sitemap_tree(self.home_page, show_restricted=True)
+
+        private_node = tree[-1]
+        self.assertEqual(private_node["title"], "Page privée")
+        self.assertTrue(private_node["restricted"])
+        self.assertTrue(private_node["children"][0]["restricted"])
+
+    def test_tree_is_built_in_a_few_queries(self):
+        for i in range(10):
+            self.section.add_child(instance=ContentPage(title=f"Page {i}", slug=f"page-{i}"))
+
+        # Descendants, exclusions for ContentPage and view restrictions
+        with self.assertNumQueries(3):
+            build_sitemap_tree(self.home_page)
+
+    def test_tree_is_cached_until_a_page_changes(self):
+        get_sitemap_tree(self.site)
+        Page.objects.filter(pk=self.section.pk).update(title="Rubrique renommée")
+        self.assertEqual(get_sitemap_tree(self.site)[0]["title"], "Rubrique")
+
+        self.section.refresh_from_db()
+        self.section.save_revision().publish()
+        self.assertEqual(get_sitemap_tree(self.site)[0]["title"], "Rubrique renommée")
+
+
+@override_settings(SF_SITEMAP_LIMIT=2)
+class XmlSitemapTestCase(WagtailPageTestCase):
+    def setUp(self):
+        self.home_page = Page.objects.get(slug="home")
+        for i in range(3):
+            page = self.home_page.add_child(instance=ContentPage(title=f"Page {i}", slug=f"page-{i}"))
+            page.save_revision().publish()
+
+        self.section_url = reverse("xml_sitemap_section", kwargs={"section": "content_manager.contentpage.fr"})
+
+    def test_index_lists_a_paginated_sitemap_per_page_type_and_locale(self):
+        response = self.client.get(reverse("xml_sitemap"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Robots-Tag"], "noindex, noodp, noarchive")
+        self.assertContains(response, f"<loc>http://testserver{self.section_url}</loc>")
+        self.assertContains(response, f"<loc>http://testserver{self.section_url}?p=2</loc>")
+        self.assertNotContains(response, f"{self.section_url}?p=3")
+
+    def test_section_is_paginated(self):
+        response = self.client.get(self.section_url)
+        self.assertContains(response, "/page-0/")
+        self.assertContains(response, "/page-1/")
+        self.assertNotContains(response, "/page-2/")
+
+        response = self.client.get(self.section_url, {"p": 2})
+        self.assertContains(response, "/page-2/")
+
+        response = self.client.get(self.section_url, {"p": 3})
+        self.assertEqual(response.status_code, 404)
+
+    def test_translated_pages_have_their_own_section(self):
+        locale_en, _created = Locale.objects.get_or_create(language_code="en")
+        english_home_page = self.home_page.copy_for_translation(locale=locale_en)
+        english_home_page.save_revision().publish()
+        english_page = ContentPage.objects.get(slug="page-0").copy_for_translation(locale=locale_en)
+        english_page.save_revision().publish()
+        english_section_url = reverse("xml_sitemap_section", kwargs={"section": "content_manager.contentpage.en"})
+
+        response = self.client.get(reverse("xml_sitemap"))
+        self.assertContains(response, f"<loc>http://testserver{english_section_url}</loc>")
+
+        response = self.client.get(english_section_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, english_page.url)
+
+    def test_unknown_section_is_not_found(self):
+        response = self.client.get(reverse("xml_sitemap_section", kwargs={"section": "blog.blogentrypage.fr"}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_request_is_not_modified(self):
+        response = self.client.get(self.section_url)
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        response = self.client.get(self.section_url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_request_with_if_modified_since_is_not_modified(self):
+        response = self.client.get(self.section_url)
+
+        response = self.client.get(self.section_url, headers={"If-Modified-Since": response["Last-Modified"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_publication_updates_the_section(self):
+        self.client.get(self.section_url, {"p": 2})
+        self.home_page.add_child(instance=ContentPage(title="Nouvelle page", slug="new-page"))
+
+        response = self.client.get(self.section_url, {"p": 2})
+        self.assertContains(response, "/new-page/")
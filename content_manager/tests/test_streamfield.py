@@ -0,0 +1,52 @@
+from django.test import TestCase
+
+from content_manager.models import ContentPage
+from content_manager.streamfield import collect_references, remap_references, strip_block_ids, transform_raw_data
+
+
+class TransformRawDataTestCase(TestCase):
+    def setUp(self):
+        self.stream_block = ContentPage._meta.get_field("body").stream_block
+        self.raw_data = [
+            {
+                "type": "multicolumns",
+                "value": {
+                    "bg_image": 5,
+                    "title": "Columns",
+                    "columns": [{"type": "image", "value": {"image": 6, "alt": ""}, "id": "column-image"}],
+                },
+                "id": "multicolumns",
+            },
+            {"type": "link", "value": {"link_type": "document", "document": 7, "page": 8}, "id": "link"},
+            {"type": "tile", "value": {"title": "Tile", "image": None, "link": {"page": 8}}, "id": "tile"},
+            {"type": "paragraph", "value": "<p>The image 6</p>", "id": "paragraph"},
+        ]
+
+    def test_references_are_collected_from_the_block_definitions(self):
+        references = {}
+        transform_raw_data(self.stream_block, self.raw_data, [collect_references(references)])
+
+        self.assertEqual(references, {"image": [5, 6], "document": [7], "page": [8, 8]})
+
+    def test_block_ids_are_stripped_from_a_copy(self):
+        data = transform_raw_data(self.stream_block, self.raw_data, [strip_block_ids])
+
+        self.assertEqual(
+            data[0],
+            {
+                "type": "multicolumns",
+                "value": {
+                    **self.raw_data[0]["value"],
+                    "columns": [{"type": "image", "value": {"image": 6, "alt": ""}}],
+                },
+            },
+        )
+        self.assertEqual(self.raw_data[0]["id"], "multicolumns")
+
+    def test_references_are_remapped(self):
+        data = transform_raw_data(self.stream_block, self.raw_data, [remap_references({"5": 50, "6": 60, "8": 80})])
+
+        self.assertEqual(data[0]["value"]["bg_image"], 50)
+        self.assertEqual(data[0]["value"]["columns"][0]["value"]["image"], 60)
+        self.assertEqual(data[1]["value"], {"link_type": "document", "document": 7, "page": 8})
+        self.assertEqual(data[3]["value"], "<p>The image 6</p>")
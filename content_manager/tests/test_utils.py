@@ -1,7 +1,12 @@
+import json
+
 from wagtail.images.models import Image
+from wagtail.models import Page
+from wagtail.rich_text import RichText
 from wagtail.test.utils import WagtailPageTestCase
 
-from content_manager.utils import import_image
+from content_manager.models import ContentPage
+from content_manager.utils import get_streamfield_raw_text, import_image
 
 
 class UtilsTestCase(WagtailPageTestCase):
@@ -11,3 +16,56 @@ class UtilsTestCase(WagtailPageTestCase):
 
         assert isinstance(image, Image)
         assert image.title == "Sample image"
+
+
+class StreamfieldRawTextTestCase(WagtailPageTestCase):
+    def setUp(self):
+        self.home_page = Page.objects.get(slug="home")
+        self.page = self.home_page.add_child(
+            instance=ContentPage(
+                title="Page",
+                search_description="Description",
+                body=json.dumps(
+                    [
+                        {"type": "paragraph", "value": "<p>Premier&nbsp;<b>paragraphe</b></p><p>suite</p>"},
+                        {"type": "html", "value": "<p>Code HTML</p>"},
+                        {"type": "image", "value": {"image": 1, "decorative": True}},
+                        {
+                            "type": "multicolumns",
+                            "value": {
+                                "title": "Colonnes",
+                                "bg_image": 12,
+                                "columns": [
+                                    {"type": "text", "value": "<p>Texte de colonne</p>"},
+                                    {"type": "quote", "value": {"quote": "Citation", "author_name": "Autrice"}},
+                                ],
+                            },
+                        },
+                        {"type": "markdown", "value": "## Titre **gras** et [lien](https://example.com)"},
+                        {"type": "link", "value": {"page": self.home_page.pk, "text": "Lien", "anchor": "ancre"}},
+                    ]
+                ),
+            )
+        )
+
+    def test_text_is_extracted_from_the_raw_data(self):
+        page = ContentPage.objects.get(pk=self.page.pk)
+
+        # Neither the image nor the page are loaded
+        with self.assertNumQueries(0):
+            text = get_streamfield_raw_text(page.body)
+
+        self.assertEqual(
+            text,
+            "Premier paragraphe suite Colonnes Texte de colonne Citation Autrice Titre gras et lien Lien",
+        )
+
+    def test_extraction_stops_at_max_words(self):
+        self.assertEqual(get_streamfield_raw_text(self.page.body, max_words=3), "Premier paragraphe suite […]")
+
+    def test_search_description_is_prefilled(self):
+        page = self.home_page.add_child(
+            instance=ContentPage(title="Autre page", body=[("paragraph", RichText("<p>Un court texte</p>"))])
+        )
+
+        self.assertEqual(page.search_description, "Un court texte […]")
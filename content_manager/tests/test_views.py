@@ -122,7 +122,7 @@ class ContentPageTestCase(WagtailPageTestCase):
         )
         excluded_page.save()
 
-        url = reverse("xml_sitemap")
+        url = reverse("xml_sitemap_section", kwargs={"section": "content_manager.contentpage.fr"})
         response = self.client.get(url)
 
         self.assertNotContains(response, "/excluded-xml-page/")
@@ -161,6 +161,10 @@ class ContentPageTestCase(WagtailPageTestCase):
     def test_public_content_page_is_in_xml_sitemap(self):
         url = reverse("xml_sitemap")
         response = self.client.get(url)
+        self.assertContains(response, "/sitemap-content_manager.contentpage.fr.xml")
+
+        url = reverse("xml_sitemap_section", kwargs={"section": "content_manager.contentpage.fr"})
+        response = self.client.get(url)
         self.assertContains(response, "/public-content-page/")
 
     def test_exclude_from_sitemap_defaults_to_false(self):
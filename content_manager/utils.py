@@ -1,11 +1,16 @@
 import re
+from collections.abc import Iterator
 from html import unescape
 from io import BytesIO
+from itertools import islice
 
-from bs4 import BeautifulSoup
 from django.core.files.images import ImageFile
+from wagtail import blocks
 from wagtail.images import get_image_model
 from wagtail.models import Site
+from wagtailmarkdown.blocks import MarkdownBlock
+
+from content_manager.streamfield import walk_streamfield
 
 Image = get_image_model()
 
@@ -47,47 +52,67 @@ def get_default_site() -> Site:
     return site  # type: ignore
 
 
-def get_streamblock_raw_text(block) -> str:
-    """
-    Get the raw text of a streamblock.
-    """
+# Blocks left out of the text of a StreamField: medias, and blocks without text content
+TEXT_SKIPPED_BLOCKS = ["image", "alert", "video", "stepper", "separator", "html", "iframe"]
 
-    # Remove entirely some block types
-    removable_blocks = ["image", "alert", "video", "stepper", "separator", "html", "iframe"]
+# Text fields which are not displayed as text
+TEXT_SKIPPED_FIELDS = ["alt", "anchor", "anchor_id", "parameters", "query_string"]
 
-    raw_text = ""
-    if block.block.name == "imageandtext":
-        raw_text += block.value["text"].source
-    elif block.block.name == "multicolumns":
-        for column in block.value["columns"]:
-            raw_text += get_streamblock_raw_text(column)
-    elif block.block.name not in removable_blocks:
-        raw_text += block.render()
+HTML_TAG_RE = re.compile(r"<[^>]*>")
+MARKDOWN_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+MARKDOWN_MARKUP_RE = re.compile(r"[#*_`>|~]+")
 
-    return raw_text
 
+def html_to_text(html: str) -> str:
+    return unescape(HTML_TAG_RE.sub(" ", html))
 
-def get_streamfield_raw_text(streamfield, max_words: int | None = None) -> str:
+
+def markdown_to_text(markdown: str) -> str:
+    return MARKDOWN_MARKUP_RE.sub(" ", MARKDOWN_LINK_RE.sub(r"\1", markdown))
+
+
+# Extraction of the text of the blocks, by block type: the first matching type is used,
+# and the blocks of the other types (choosers, URLs, choices…) have no text
+TEXT_EXTRACTORS = [
+    (blocks.RichTextBlock, html_to_text),
+    (MarkdownBlock, markdown_to_text),
+    (blocks.TextBlock, str),
+    (blocks.CharBlock, str),
+]
+
+
+def get_text_extractor(block):
+    for block_class, extractor in TEXT_EXTRACTORS:
+        if isinstance(block, block_class):
+            return extractor
+    return None
+
+
+def is_text_skipped(raw_block) -> bool:
+    return raw_block.name in TEXT_SKIPPED_BLOCKS or raw_block.name in TEXT_SKIPPED_FIELDS
+
+
+def iter_streamfield_words(streamfield) -> Iterator[str]:
     """
-    Get the raw text of a streamfield. Used to pre-fill the search description field
+    Yields the words of a streamfield, from its raw data: the blocks are neither converted nor rendered.
     """
+    for raw_block in walk_streamfield(streamfield, skip=is_text_skipped):
+        extractor = get_text_extractor(raw_block.block)
+        if extractor is not None and isinstance(raw_block.value, str):
+            yield from extractor(raw_block.value).split()
 
-    raw_html = ""
-    raw_text = ""
-    for block in streamfield:
-        raw_html += get_streamblock_raw_text(block)
 
-    if not raw_html:
-        return ""
-
-    soup = BeautifulSoup(raw_html, "html.parser")
-    raw_text += soup.get_text(" ")
+def get_streamfield_raw_text(streamfield, max_words: int | None = None) -> str:
+    """
+    Get the raw text of a streamfield. Used to pre-fill the search description field,
+    and to index the body of the pages.
 
-    raw_text = unescape(raw_text)
-    raw_text = re.sub(r" +", " ", raw_text).strip()
+    With `max_words`, the extraction stops as soon as enough words are found.
+    """
+    words = iter_streamfield_words(streamfield)
 
     if max_words:
-        words = raw_text.split()
-        raw_text = " ".join(words[:max_words]) + " […]"
+        words = list(islice(words, max_words))
+        return " ".join(words) + " […]" if words else ""
 
-    return raw_text
+    return " ".join(words)
@@ -1,12 +1,19 @@
 from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.utils.translation import gettext_lazy as _
-from django.views.generic import ListView, TemplateView
+from django.views.generic import ListView, TemplateView, View
 from unidecode import unidecode
 from wagtail.models import Page, Site
 
 from content_manager.models import ContentPage, Tag
+from content_manager.pagination import paginate
+from content_manager.services.sitemap import get_sitemap_tree
+from content_manager.services.xml_sitemap import get_sitemap_index, get_sitemap_section
+from content_manager.utils import get_default_site
 
 
 class SearchResultsView(ListView):
@@ -22,6 +29,8 @@ class SearchResultsView(ListView):
     If user is anonymous, only public pages are returned.
 
     If there is no result, an empty page list is returned.
+
+    The results are ranked and paginated by the search backend.
     """
 
     model = Page
@@ -43,6 +52,9 @@ class SearchResultsView(ListView):
             object_list = Page.objects.none()
         return object_list
 
+    def get_paginate_by(self, queryset):
+        return settings.SF_SEARCH_RESULTS_PER_PAGE
+
     def get_context_data(self, **kwargs):
         context = super(SearchResultsView, self).get_context_data(**kwargs)
         context["query"] = self.request.GET.get("q")
@@ -55,7 +67,7 @@ class TagsListView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        tags = Tag.objects.tags_with_usecount(1)
+        tags = Tag.objects.tags_with_usecount(1, site=Site.find_for_request(self.request))
 
         tags_by_first_letter = {}
         for tag in tags:
@@ -87,7 +99,14 @@ class TagView(ListView):
 
     def get_queryset(self, **kwargs):
         tag_slug = self.kwargs.get("tag")
-        return ContentPage.objects.filter(tags__slug=tag_slug, live=True)
+        return ContentPage.objects.filter(tags__slug=tag_slug, live=True).defer_streamfields()
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.SF_KEYSET_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator, page = paginate(self.request, queryset, page_size, ordering=["path"])
+        return (paginator, page, page.object_list, page.has_other_pages())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -122,6 +141,9 @@ class SiteMapView(TemplateView):
         context = super().get_context_data(**kwargs)
         site = Site.find_for_request(self.request)
         context["home_page"] = site.root_page
+        context["sitemap_tree"] = get_sitemap_tree(
+            site, request=self.request, show_restricted=self.request.user.is_authenticated
+        )
 
         script_name = settings.FORCE_SCRIPT_NAME or ""
         root_dir = f"{script_name.rstrip('/')}/" if script_name else "/"
@@ -134,3 +156,56 @@ class SiteMapView(TemplateView):
             "root_dir": root_dir,
         }
         return context
+
+
+class XmlSitemapView(View):
+    """
+    Sitemap for search engines, served from the cache with support for conditional requests
+    (see content_manager/services/xml_sitemap.py).
+
+    `build_sitemap` returns the rendered sitemap of a site, or None if it does not exist:
+    it is the index of the sitemaps by default, with one sitemap per page type and locale.
+    """
+
+    build_sitemap = staticmethod(get_sitemap_index)
+
+    def get_site(self):
+        return Site.find_for_request(self.request) or get_default_site()
+
+    def get_sitemap_kwargs(self, **kwargs) -> dict:
+        return kwargs
+
+    def get(self, request, **kwargs):
+        sitemap = self.build_sitemap(self.get_site(), request, **self.get_sitemap_kwargs(**kwargs))
+        if sitemap is None:
+            raise Http404
+
+        etag = f'"{sitemap["etag"]}"'
+        last_modified = sitemap["last_modified"]
+
+        response = HttpResponse(sitemap["content"], content_type="application/xml")
+        response.headers["X-Robots-Tag"] = "noindex, noodp, noarchive"
+        response.headers["ETag"] = etag
+        if last_modified:
+            response.headers["Last-Modified"] = http_date(last_modified)
+
+        return get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
+
+
+class XmlSitemapSectionView(XmlSitemapView):
+    """
+    Sitemap of the pages of a given type and locale, paginated with the `p` parameter
+    """
+
+    build_sitemap = staticmethod(get_sitemap_section)
+
+    def get_sitemap_kwargs(self, section: str, **kwargs) -> dict:
+        try:
+            page_number = int(self.request.GET.get("p", 1))
+        except ValueError:
+            raise Http404
+
+        if page_number < 1:
+            raise Http404
+
+        return {"section": section, "page_number": page_number}
@@ -12,6 +12,8 @@ from wagtail.admin.rich_text.converters.html_to_contentstate import (
     BlockElementHandler,
 )
 
+from content_manager.page_cache import serve_with_page_cache
+
 
 @hooks.register("register_rich_text_features")
 def register_text_alignment_features(features):
@@ -134,3 +136,17 @@ def editor_js():
         '<script src="{}"></script>',
         static("content_manager/js/text-alignment.js"),
     )
+
+
+@hooks.register("on_serve_page", order=100)
+def page_cache(callback):
+    """
+    Serve the anonymous visits from the full-page cache, when enabled with SF_PAGE_CACHE.
+
+    Registered with a high order so that it runs inside the view restrictions checks.
+    """
+
+    def inner(page, request, serve_args, serve_kwargs):
+        return serve_with_page_cache(callback, page, request, serve_args, serve_kwargs)
+
+    return inner
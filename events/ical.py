@@ -0,0 +1,94 @@
+"""
+Cache of the iCalendar exports of the events index pages and of the event pages.
+
+The calendars are serialized one event at a time (see `iter_calendar`), cached per page and locale
+with their ETag and last modification date, so that the calendar clients can use conditional requests.
+The DTSTAMP of each event is its last modification date, so that the output is stable between two updates.
+
+They are invalidated when a page is saved under the calendar page, or when the site settings change
+(see events/signals.py).
+"""
+
+import hashlib
+from collections.abc import Iterable, Iterator
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.translation import get_language
+from icalendar import Calendar
+
+from content_manager.cache import FRAGMENTS_CACHE, bump_generation, cache_get_or_set, get_generations
+
+ALL_CALENDARS_NAMESPACE = "ical"
+
+CALENDAR_END = b"END:VCALENDAR\r\n"
+
+
+def calendar_namespace(page_id) -> str:
+    return f"ical-page-{page_id}"
+
+
+def iter_calendar(prodid: str, events: Iterable) -> Iterator[bytes]:
+    """
+    Serializes a calendar from an iterable of `Event` components, one component at a time.
+    """
+    cal = Calendar()
+    cal.add("prodid", prodid)
+    cal.add("version", "2.0")
+
+    yield cal.to_ical()[: -len(CALENDAR_END)]
+    for event in events:
+        yield event.to_ical()
+    yield CALENDAR_END
+
+
+def render_calendar(prodid: str, events: Iterable, filename: str, last_modified) -> dict:
+    """
+    Returns a calendar as a dict with its content, ETag, last modification timestamp and file name
+    """
+    content = b"".join(iter_calendar(str(prodid), events))
+
+    return {
+        "content": content,
+        "etag": hashlib.sha1(content, usedforsecurity=False).hexdigest(),
+        "last_modified": int(last_modified.timestamp()) if last_modified else None,
+        "filename": str(filename),
+    }
+
+
+def get_calendar(page, request: HttpRequest, key_parts: tuple = ()) -> dict:
+    """
+    Returns the calendar of a page (built by its `build_calendar` method), from the cache when possible.
+
+    `key_parts` are added to the cache key, for the parameters which change the events.
+    """
+    generations = get_generations(FRAGMENTS_CACHE, [ALL_CALENDARS_NAMESPACE, calendar_namespace(page.pk)])
+    key = ":".join(["ical", str(page.pk), get_language(), *map(str, key_parts), "-".join(map(str, generations))])
+
+    return cache_get_or_set(
+        FRAGMENTS_CACHE, key, lambda: page.build_calendar(request), timeout=settings.SF_CACHE_TIMEOUT
+    )
+
+
+def serve_calendar(request: HttpRequest, calendar: dict) -> HttpResponse:
+    etag = f'"{calendar["etag"]}"'
+    last_modified = calendar["last_modified"]
+
+    response = HttpResponse(calendar["content"], content_type="text/calendar")
+    response["Content-Disposition"] = f'attachment; filename="{calendar["filename"]}.ics"'
+    response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = http_date(last_modified)
+
+    return get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
+
+
+def invalidate_calendars(page_ids) -> None:
+    for page_id in page_ids:
+        bump_generation(FRAGMENTS_CACHE, calendar_namespace(page_id))
+
+
+def invalidate_all_calendars() -> None:
+    bump_generation(FRAGMENTS_CACHE, ALL_CALENDARS_NAMESPACE)
@@ -3,12 +3,13 @@ import datetime
 from django.core.paginator import Paginator
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Max
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.translation import get_language, gettext_lazy as _
-from icalendar import Calendar, Event, vText
+from icalendar import Event, vText
 from modelcluster.fields import ParentalKey, ParentalManyToManyField
 from modelcluster.tags import ClusterTaggableManager
 from taggit.models import TaggedItemBase
@@ -18,10 +19,17 @@ from wagtail.contrib.routable_page.models import RoutablePageMixin, path
 from wagtail.models.i18n import Locale
 from wagtail.search import index
 
+from blog.facets import Facet, get_facets
 from blog.models import Category, CategorySerializer, Organization, Person, PersonSerializer
 from content_manager.abstract import SitesFacilesBasePage
+from content_manager.managers import for_listing
 from content_manager.models import CmsDsfrConfig, Tag
+from content_manager.pagination import paginate
 from events.forms import EventSearchForm
+from events.ical import get_calendar, render_calendar, serve_calendar
+
+# Number of events loaded at a time when serializing a calendar
+ICAL_CHUNK_SIZE = 200
 
 
 class EventsIndexPage(RoutablePageMixin, SitesFacilesBasePage):
@@ -61,32 +69,33 @@ class EventsIndexPage(RoutablePageMixin, SitesFacilesBasePage):
     def posts(self):
         # Get list of event pages that are descendants of this page
         today = timezone.now().date()
-        entries = (
+        entries = for_listing(
             EventEntryPage.objects.descendant_of(self)
             .live()
             .filter(event_date_end__date__gte=today)
-            .order_by("event_date_start")
-            .select_related("owner")
-            .prefetch_related("tags", "event_categories", "date__year")
-        )
+            .order_by("event_date_start"),
+            "owner",
+            template_name="events/blocks/events_index_posts_list.html",
+        ).prefetch_related("tags", "event_categories")
         return entries
 
     @property
     def past_events(self):
         today = timezone.now().date()
-        entries = (
+        entries = for_listing(
             EventEntryPage.objects.descendant_of(self)
             .live()
             .filter(event_date_end__date__lte=today)
-            .order_by("-event_date_start")
-            .select_related("owner")
-            .prefetch_related("tags", "event_categories", "date__year")
-        )
+            .order_by("-event_date_start"),
+            "owner",
+            template_name="events/blocks/events_index_posts_list.html",
+        ).prefetch_related("tags", "event_categories")
         return entries
 
     def get_context(self, request, *args, **kwargs):
         context = super(EventsIndexPage, self).get_context(request, *args, **kwargs)
         posts = self.posts
+        filters = {}
         locale = Locale.objects.get(language_code=get_language())
 
         extra_breadcrumbs = None
@@ -95,6 +104,7 @@ class EventsIndexPage(RoutablePageMixin, SitesFacilesBasePage):
         tag = request.GET.get("tag")
         if tag:
             tag = get_object_or_404(Tag, slug=tag)
+            filters["tag"] = {"tags": tag}
             posts = posts.filter(tags=tag)
             extra_title = _("Events tagged with %(tag)s") % {"tag": tag}
             extra_breadcrumbs = {
@@ -107,6 +117,7 @@ class EventsIndexPage(RoutablePageMixin, SitesFacilesBasePage):
         category = request.GET.get("category")
         if category:
             category = get_object_or_404(Category, slug=category, locale=locale)
+            filters["category"] = {"event_categories": category}
             posts = posts.filter(event_categories=category)
             extra_title = _("Events in category %(category)s") % {"category": category.name}
             extra_breadcrumbs = {
@@ -119,6 +130,7 @@ class EventsIndexPage(RoutablePageMixin, SitesFacilesBasePage):
         source = request.GET.get("source")
         if source:
             source = get_object_or_404(Organization, slug=source)
+            filters["source"] = {"authors__organization": source}
             posts = posts.filter(authors__organization=source)
             extra_title = _("Events created by") + f" {source.name}"
             extra_breadcrumbs = {
@@ -138,26 +150,25 @@ class EventsIndexPage(RoutablePageMixin, SitesFacilesBasePage):
                 ],
                 "current": extra_title,
             }
+            filters["author"] = {"authors": author}
             posts = posts.filter(authors=author)
 
         date_from = request.GET.get("date_from", "")
         if date_from:
+            filters["date_from"] = {"event_date_end__date__gte": date_from}
             posts = posts.filter(event_date_end__date__gte=date_from)
             context["current_date_from"] = datetime.datetime.strptime(date_from, "%Y-%m-%d").date()
 
         date_to = request.GET.get("date_to", "")
         if date_to:
+            filters["date_to"] = {"event_date_start__date__lte": date_to}
             posts = posts.filter(event_date_start__date__lte=date_to)
             context["current_date_to"] = datetime.datetime.strptime(date_to, "%Y-%m-%d").date()
 
         form = EventSearchForm(initial={"date_from": date_from, "date_to": date_to})
 
         # Pagination
-        page_number = request.GET.get("page")
-        page_size = self.posts_per_page
-
-        paginator = Paginator(posts, page_size)  # Show <page_size> posts per page
-        posts = paginator.get_page(page_number)
+        paginator, posts = paginate(request, posts, self.posts_per_page, ordering=["event_date_start", "pk"])
 
         context["posts"] = posts
         context["current_category"] = category
@@ -169,16 +180,37 @@ class EventsIndexPage(RoutablePageMixin, SitesFacilesBasePage):
 
         # Filters
         context["form"] = form
-        context["categories"] = self.get_categories()
-        context["authors"] = self.get_authors()
-        context["sources"] = self.get_sources()
-        context["tags"] = self.get_tags()
+        facets = self.get_facets(filters)
+        context["categories"] = facets.get("category", [])
+        context["authors"] = facets.get("author", [])
+        context["sources"] = facets.get("source", [])
+        context["tags"] = facets.get("tag", [])
+        context["years"] = facets["year"]
 
         if extra_breadcrumbs:
             context["extra_breadcrumbs"] = extra_breadcrumbs
 
         return context
 
+    def get_facets(self, filters: dict, names: list[str] | None = None) -> dict:
+        """
+        Returns the values of the enabled filters (or of the filters listed in `names`),
+        with their number of upcoming events
+        """
+        facets = [
+            facet
+            for facet, enabled in [
+                (Facet("category", "event_categories", Category), self.filter_by_category),
+                (Facet("tag", "tags", Tag), self.filter_by_tag),
+                (Facet("author", "authors", Person), self.filter_by_author),
+                (Facet("source", "authors__organization", Organization), self.filter_by_source),
+                (Facet("year", "event_date_start__year"), True),
+            ]
+            if (enabled if names is None else facet.name in names)
+        ]
+        # The upcoming events change every day
+        return get_facets(self, self.posts, facets, filters, key_parts=(timezone.now().date(),))
+
     def get_authors(self) -> models.QuerySet:
         ids = self.posts.specific().values_list("authors", flat=True)
         return Person.objects.filter(id__in=ids).order_by("name")
@@ -195,13 +227,10 @@ class EventsIndexPage(RoutablePageMixin, SitesFacilesBasePage):
         ids = self.posts.specific().values_list("tags", flat=True)
         return Tag.objects.filter(id__in=ids).order_by("name")
 
-    @path("ical/")
-    def ical_view(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+    def build_calendar(self, request: HttpRequest) -> dict:
         """
-        Render the full calendar as an iCal file
+        Returns the full calendar, serialized one event at a time
         """
-        cal = Calendar()
-
         cms_settings = CmsDsfrConfig.for_request(request=request)
         site_name = cms_settings.site_title
         language_code = get_language()
@@ -214,17 +243,21 @@ class EventsIndexPage(RoutablePageMixin, SitesFacilesBasePage):
             language_code.upper(),
         ]
 
-        cal.add("prodid", "//".join(prodid))
-        cal.add("version", "2.0")
+        entries = self.posts.select_related(None).prefetch_related(None).defer_streamfields()
+        last_published_at = entries.aggregate(last_published_at=Max("last_published_at"))["last_published_at"]
+        last_modified = max(filter(None, [self.last_published_at, last_published_at]), default=None)
 
-        dtstamp = timezone.now()
-        for entry in self.posts:
-            event = entry.ical_event(dtstamp)
-            cal.add_component(event)
+        events = (entry.ical_event() for entry in entries.iterator(chunk_size=ICAL_CHUNK_SIZE))
+        return render_calendar("//".join(prodid), events, slugify(site_name), last_modified)
 
-        response = HttpResponse(cal.to_ical(), content_type="text/calendar")
-        response["Content-Disposition"] = f'attachment; filename="{slugify(site_name)}.ics"'
-        return response
+    @path("ical/")
+    def ical_view(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        """
+        Render the full calendar as an iCal file
+        """
+        # The upcoming events change every day
+        calendar = get_calendar(self, request, key_parts=(timezone.now().date(),))
+        return serve_calendar(request, calendar)
 
     @path("archives/")
     def archives_view(self, request):
@@ -291,6 +324,15 @@ class EventEntryPage(RoutablePageMixin, SitesFacilesBasePage):
     authors = ParentalManyToManyField(
         "blog.Person", blank=True, help_text=_("Author entries can be created in Snippets > Persons")
     )
+    card_category = models.ForeignKey(
+        "blog.Category",
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        verbose_name=_("Card category"),
+    )
 
     parent_page_types = ["events.EventsIndexPage"]
     subpage_types = []
@@ -345,6 +387,7 @@ class EventEntryPage(RoutablePageMixin, SitesFacilesBasePage):
     api_fields = SitesFacilesBasePage.api_fields + [
         APIField("tags"),
         APIField("event_categories", serializer=CategorySerializer(many=True)),
+        APIField("card_category", serializer=CategorySerializer()),
         APIField("authors", serializer=PersonSerializer(many=True)),
         APIField("event_date_start"),
         APIField("event_date_end"),
@@ -357,12 +400,17 @@ class EventEntryPage(RoutablePageMixin, SitesFacilesBasePage):
     def get_absolute_url(self):
         return self.url
 
+    def update_card_fields(self) -> None:
+        super().update_card_fields()
+        self.card_category = next(iter(self.event_categories.all()), None)
+
     def ical_event(self, dtstamp=None):
         """
         Formats the event as an iCalendar event
         """
         if not dtstamp:
-            dtstamp = timezone.now()
+            # The last modification date, so that the output is stable between two updates
+            dtstamp = self.last_published_at or self.latest_revision_created_at or timezone.now()
 
         event = Event()
         event.add("summary", self.title)
@@ -374,13 +422,10 @@ class EventEntryPage(RoutablePageMixin, SitesFacilesBasePage):
 
         return event
 
-    @path("ical/")
-    def ical_view(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+    def build_calendar(self, request: HttpRequest) -> dict:
         """
-        Render the event as an iCal file
+        Returns the event as a calendar
         """
-        cal = Calendar()
-
         cms_settings = CmsDsfrConfig.for_request(request=request)
         site_name = cms_settings.site_title
         language_code = get_language()
@@ -395,15 +440,14 @@ class EventEntryPage(RoutablePageMixin, SitesFacilesBasePage):
             language_code.upper(),
         ]
 
-        cal.add("prodid", "//".join(prodid))
-        cal.add("version", "2.0")
+        return render_calendar("//".join(prodid), [self.ical_event()], slugify(title), self.last_published_at)
 
-        event = self.ical_event()
-        cal.add_component(event)
-
-        response = HttpResponse(cal.to_ical(), content_type="text/calendar")
-        response["Content-Disposition"] = f'attachment; filename="{slugify(title)}.ics"'
-        return response
+    @path("ical/")
+    def ical_view(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        """
+        Render the event as an iCal file
+        """
+        return serve_calendar(request, get_calendar(self, request))
 
     class Meta:
         verbose_name = _("Event page")
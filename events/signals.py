@@ -0,0 +1,29 @@
+"""
+Invalidation of the calendars cache (see events/ical.py)
+
+Connected in EventsConfig.ready()
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from wagtail.models import Page
+from wagtail.signals import post_page_move
+
+from content_manager.models import CmsDsfrConfig
+from events.ical import invalidate_all_calendars, invalidate_calendars
+
+
+@receiver(post_page_move)
+def invalidate_moved_page_calendars(sender, instance, **kwargs):
+    invalidate_all_calendars()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_object_calendars(sender, instance, created=False, **kwargs):
+    if isinstance(instance, Page):
+        # Saved on publication and unpublication: the calendars of the page and of its ancestors are invalidated
+        invalidate_calendars(Page.objects.ancestor_of(instance, inclusive=True).values_list("pk", flat=True))
+    elif isinstance(instance, CmsDsfrConfig) and not created:
+        # The site title is in the calendars. The settings are created on the first page rendering
+        invalidate_all_calendars()
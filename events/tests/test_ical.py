@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.test import RequestFactory
+from django.utils import timezone
+from icalendar import Calendar
+from wagtail.models import Page
+from wagtail.test.utils import WagtailPageTestCase
+
+from events.ical import get_calendar, iter_calendar
+from events.models import EventEntryPage, EventsIndexPage
+
+
+class EventsCalendarTestCase(WagtailPageTestCase):
+    def setUp(self):
+        home = Page.objects.get(slug="home")
+        self.events_index_page = home.add_child(instance=EventsIndexPage(title="Agenda", slug="agenda"))
+        self.events_index_page.save_revision().publish()
+
+        self.events = []
+        for i in range(3):
+            event = self.events_index_page.add_child(
+                instance=EventEntryPage(
+                    title=f"Événement {i}",
+                    date=timezone.now(),
+                    event_date_start=timezone.now() + timedelta(days=i),
+                    event_date_end=timezone.now() + timedelta(days=i + 1),
+                )
+            )
+            event.save_revision().publish()
+            self.events.append(event)
+
+        self.ical_url = self.events_index_page.url + "ical/"
+
+    def test_streamed_calendar_is_valid(self):
+        events = [event.ical_event() for event in self.events]
+        content = b"".join(iter_calendar("-//Site//Sites Conformes//FR", events))
+
+        cal = Calendar()
+        cal.add("prodid", "-//Site//Sites Conformes//FR")
+        cal.add("version", "2.0")
+        for event in events:
+            cal.add_component(event)
+        self.assertEqual(content, cal.to_ical())
+
+    def test_calendar_is_stable(self):
+        first = self.client.get(self.ical_url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("ETag", first.headers)
+        self.assertIn("Last-Modified", first.headers)
+        self.assertEqual(len(Calendar.from_ical(first.content).walk("VEVENT")), 3)
+
+        # The output does not depend on the time of the request
+        calendar = self.events_index_page.build_calendar(RequestFactory().get(self.ical_url))
+        self.assertEqual(calendar["content"], first.content)
+
+    def test_calendar_is_cached(self):
+        request = RequestFactory().get(self.ical_url)
+        get_calendar(self.events_index_page, request)
+
+        with self.assertNumQueries(0):
+            get_calendar(self.events_index_page, request)
+
+    def test_calendar_returns_not_modified(self):
+        for url in [self.ical_url, self.events[0].url + "ical/"]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+            response = self.client.get(url, headers={"if-none-match": response.headers["ETag"]})
+            self.assertEqual(response.status_code, 304)
+
+            response = self.client.get(url, headers={"if-modified-since": response.headers["Last-Modified"]})
+            self.assertEqual(response.status_code, 304)
+
+    def test_calendars_are_invalidated_on_publication(self):
+        index_etag = self.client.get(self.ical_url).headers["ETag"]
+        event_url = self.events[0].url + "ical/"
+        event_etag = self.client.get(event_url).headers["ETag"]
+
+        event = self.events[0]
+        event.title = "Événement modifié"
+        event.save_revision().publish()
+
+        response = self.client.get(self.ical_url, headers={"if-none-match": index_etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Événement modifié")
+
+        response = self.client.get(event_url, headers={"if-none-match": event_etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Événement modifié")
@@ -5,6 +5,7 @@ from django.utils import timezone
 from wagtail.models import Page
 from wagtail.test.utils import WagtailPageTestCase
 
+from content_manager.utils import import_image
 from events.models import EventEntryPage, EventsIndexPage
 
 User = get_user_model()
@@ -104,6 +105,14 @@ class EventsTestCase(WagtailPageTestCase):
             "Événement futur",
         )
 
+    def test_past_events_have_prefetched_renditions(self):
+        image = import_image("static/artwork/technical-error.svg", "Couverture")
+        EventEntryPage.objects.filter(pk=self.past_event.pk).update(card_image=image)
+
+        past_event = self.events_index_page.past_events.get(pk=self.past_event.pk)
+
+        self.assertEqual(past_event.card_image.prefetched_renditions, [])
+
     def test_event_is_renderable(self):
         self.assertPageIsRenderable(self.current_event)
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MenusConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"  # type: ignore
     name = "menus"
+
+    def ready(self):
+        from menus import signals  # noqa: F401
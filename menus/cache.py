@@ -0,0 +1,87 @@
+"""
+Cache of the rendered menus, by site, locale and host.
+
+The menus are rendered once without any reference to the current page: the links
+carry `data-sf-current-*` markers, which are replaced on each request by
+the `aria-current` attributes matching the current page (see `mark_current_items`).
+
+Enabled with the SF_MENU_CACHE setting, and invalidated by the signal handlers in menus/signals.py
+"""
+
+import re
+from html import unescape
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+from wagtail.models import Site
+
+from content_manager.cache import FRAGMENTS_CACHE, bump_generation, cache_get, cache_set, get_generation, site_key
+
+ALL_MENUS_NAMESPACE = "menus"
+
+CURRENT_MARKER_RE = re.compile(r'( ?)data-sf-current-(page|urls)="([^"]*)"')
+
+
+def get_cache_key(request, site: Site, menu_name: str) -> str:
+    site_id = site.pk if site else 0
+    generation = get_generation(FRAGMENTS_CACHE, ALL_MENUS_NAMESPACE)
+    host = request.get_host() if request else ""
+
+    return site_key(site_id, "menu", menu_name, get_language(), host, generation)
+
+
+def mark_current_items(html: str, current_page) -> str:
+    """
+    Replaces the markers of a rendered menu with the `aria-current` attributes for the current page.
+
+    - `data-sf-current-page="<id>"` is set on the links to a page
+    - `data-sf-current-urls="<url> <url>…"` is set on the submenus and mega menus
+    """
+    current_page_id = str(getattr(current_page, "pk", ""))
+    current_page_url = None
+
+    def replace(match) -> str:
+        nonlocal current_page_url
+        space, kind, value = match.groups()
+
+        if current_page is None:
+            return ""
+
+        if kind == "page":
+            return f'{space}aria-current="page"' if value == current_page_id else ""
+
+        if current_page_url is None:
+            current_page_url = current_page.url
+        return f'{space}aria-current="true"' if current_page_url in unescape(value).split(" ") else ""
+
+    return CURRENT_MARKER_RE.sub(replace, html)
+
+
+def render_menu(context, template_name: str, menu_model, menu_name: str) -> str:
+    """
+    Renders the menu of a site, from the cache when possible.
+    """
+    request = context.get("request", None)
+    site = Site.find_for_request(request)
+
+    html = None
+    key = None
+    if settings.SF_MENU_CACHE:
+        key = get_cache_key(request, site, menu_name)
+        html = cache_get(FRAGMENTS_CACHE, key)
+
+    if html is None:
+        menu = menu_model.objects.filter(site=site).first()
+        html = render_to_string(template_name, {"request": request, menu_name: menu})
+
+        if key:
+            cache_set(FRAGMENTS_CACHE, key, html, timeout=settings.SF_MENU_CACHE_TIMEOUT)
+
+    return mark_safe(mark_current_items(html, context.get("page", None)))
+
+
+def invalidate_all_menus() -> None:
+    if settings.SF_MENU_CACHE:
+        bump_generation(FRAGMENTS_CACHE, ALL_MENUS_NAMESPACE)
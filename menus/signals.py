@@ -0,0 +1,50 @@
+"""
+Invalidation of the menus cache (see menus/cache.py)
+
+Connected in MenusConfig.ready()
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from wagtail.documents import get_document_model
+from wagtail.models import Page, ReferenceIndex, Site
+from wagtail.signals import page_published, page_slug_changed, page_unpublished, post_page_move
+
+from menus.cache import invalidate_all_menus
+from menus.models import FooterBottomMenu, MainMenu, TopMenu
+
+MENU_MODELS = [TopMenu, MainMenu, FooterBottomMenu]
+
+
+def is_used_in_menus(obj) -> bool:
+    content_types = ContentType.objects.get_for_models(*MENU_MODELS).values()
+
+    return ReferenceIndex.get_references_to(obj).filter(base_content_type__in=content_types).exists()
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def invalidate_menus_for_page(sender, instance, **kwargs):
+    # The title of the page is used as the default label of the links
+    if is_used_in_menus(instance):
+        invalidate_all_menus()
+
+
+@receiver(post_page_move)
+@receiver(page_slug_changed)
+def invalidate_menus_for_urls(sender, instance, **kwargs):
+    # The URLs of the page and of all its descendants changed
+    invalidate_all_menus()
+
+
+@receiver(post_save)
+def invalidate_menus_for_saved_object(sender, instance, **kwargs):
+    if issubclass(sender, (*MENU_MODELS, Site, get_document_model())):
+        invalidate_all_menus()
+
+
+@receiver(post_delete)
+def invalidate_menus_for_deleted_object(sender, instance, **kwargs):
+    if issubclass(sender, (*MENU_MODELS, Site, get_document_model(), Page)):
+        invalidate_all_menus()
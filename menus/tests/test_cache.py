@@ -0,0 +1,77 @@
+from django.test import override_settings
+from wagtail.models import Page, Site
+from wagtail.test.utils import WagtailPageTestCase
+
+from content_manager.models import ContentPage
+from menus.cache import mark_current_items
+from menus.models import MainMenu
+
+
+@override_settings(SF_MENU_CACHE=True)
+class MenuCacheTestCase(WagtailPageTestCase):
+    def setUp(self):
+        self.home = Page.objects.get(slug="home")
+        self.site = Site.objects.get(is_default_site=True)
+        self.first_page = self.home.add_child(instance=ContentPage(title="Première page", slug="first-page"))
+        self.second_page = self.home.add_child(instance=ContentPage(title="Seconde page", slug="second-page"))
+        self.main_menu = MainMenu.objects.create(
+            site=self.site,
+            items=[
+                ("link", {"page": self.first_page, "link_type": "page"}),
+                (
+                    "submenu",
+                    {
+                        "label": "Sous-menu",
+                        "links": [("link", {"page": self.second_page, "link_type": "page"})],
+                    },
+                ),
+            ],
+        )
+
+    def test_current_page_is_marked_on_each_request(self):
+        response = self.client.get(self.first_page.url)
+        self.assertInHTML(
+            f'<a class="fr-nav__link" href="{self.first_page.url}" aria-current="page">Première page</a>',
+            response.content.decode(),
+        )
+        self.assertNotContains(response, "data-sf-current")
+
+        response = self.client.get(self.second_page.url)
+        self.assertInHTML(
+            f'<a class="fr-nav__link" href="{self.first_page.url}">Première page</a>', response.content.decode()
+        )
+        self.assertContains(response, 'aria-current="true"')
+        self.assertNotContains(response, "data-sf-current")
+
+    def test_menu_is_served_from_the_cache(self):
+        self.client.get(self.first_page.url)
+        Page.objects.filter(pk=self.first_page.pk).update(title="Titre modifié")
+
+        response = self.client.get(self.second_page.url)
+        self.assertContains(response, "Première page")
+
+    def test_publication_of_a_linked_page_invalidates_the_menus(self):
+        self.client.get(self.second_page.url)
+
+        self.first_page.title = "Titre publié"
+        self.first_page.save_revision().publish()
+
+        response = self.client.get(self.second_page.url)
+        self.assertContains(response, "Titre publié")
+
+    def test_menu_save_invalidates_the_menus(self):
+        self.client.get(self.first_page.url)
+
+        self.main_menu.items = [("link", {"text": "Nouveau lien", "page": self.second_page, "link_type": "page"})]
+        self.main_menu.save()
+
+        response = self.client.get(self.first_page.url)
+        self.assertContains(response, "Nouveau lien")
+        self.assertNotContains(response, "Sous-menu")
+
+
+class MarkCurrentItemsTestCase(WagtailPageTestCase):
+    def test_markers_are_removed_without_current_page(self):
+        html = '<a href="/" data-sf-current-page="3">Lien</a><button data-sf-current-urls="/a/ /b/">Menu</button>'
+
+        self.assertEqual(mark_current_items(html, None), '<a href="/">Lien</a><button>Menu</button>')
@@ -1,8 +1,8 @@
 import requests
 from django.conf import settings
-from django.core.management import call_command
 from django.core.management.base import BaseCommand
 
+from content_manager.services.search_queue import update_search_index
 from proconnect.models import WhitelistedEmailDomain
 
 
@@ -34,7 +34,8 @@ class Command(BaseCommand):
         if len(domains):
             self.stdout.write(f"{len(domains)} domains will be imported.")
             WhitelistedEmailDomain.objects.bulk_create(domains)
-            call_command("update_index")
+            # Only the new domains are indexed, as bulk_create does not send the model signals
+            update_search_index(WhitelistedEmailDomain, domains)
             self.stdout.write(self.style.SUCCESS("Import complete."))
         else:
             self.stdout.write(self.style.SUCCESS("No new domain to import."))